@@ -26,50 +26,12 @@ fi
 echo "Running benchmarks from r$START_NUM to r$RUN_NUM"
 echo "Results will be stored in results/r1/, results/r2/, etc."
 
-for i in $(seq $START_NUM $RUN_NUM); do
-  echo ""
-  echo "========================================="
-  echo "Starting run $i of $RUN_NUM (r$i)"
-  echo "========================================="
-  echo ""
-
-  # GPT-4 models
-  ./scripts/bench_laaj.sh gpt-4o-mini 0 "" r$i/gpt-4o-mini
-  ./scripts/bench_laaj.sh gpt-4o 0 "" r$i/gpt-4o
-  ./scripts/bench_laaj.sh gpt-4.1-nano 0 "" r$i/gpt-4.1-nano
-  ./scripts/bench_laaj.sh gpt-4.1-mini 0 "" r$i/gpt-4.1-mini
-  ./scripts/bench_laaj.sh gpt-4.1 0 "" r$i/gpt-4.1
-
-  # GPT-5 Nano (low/medium/high reasoning)
-  ./scripts/bench_laaj.sh gpt-5-nano 0 low r$i/gpt-5-nanolow
-  ./scripts/bench_laaj.sh gpt-5-nano 0 medium r$i/gpt-5-nanomedium
-  ./scripts/bench_laaj.sh gpt-5-nano 0 high r$i/gpt-5-nanohigh
-
-  # GPT-5 Mini (low/medium/high reasoning)
-  ./scripts/bench_laaj.sh gpt-5-mini 0 low r$i/gpt-5-minilow
-  ./scripts/bench_laaj.sh gpt-5-mini 0 medium r$i/gpt-5-minimedium
-  ./scripts/bench_laaj.sh gpt-5-mini 0 high r$i/gpt-5-minihigh
-
-  # GPT-5 (low/medium/high reasoning)
-  ./scripts/bench_laaj.sh gpt-5 0 low r$i/gpt-5low
-  ./scripts/bench_laaj.sh gpt-5 0 medium r$i/gpt-5medium
-  ./scripts/bench_laaj.sh gpt-5 0 high r$i/gpt-5high
-
-  # GPT-OSS models (via OpenRouter)
-  # Note: Uncomment and configure if you have OpenRouter access
-  # cp .env.openrouter .env
-  # ./scripts/bench_laaj.sh openai/gpt-oss-20b 0 low r$i/openai/gpt-oss-20blow
-  # ./scripts/bench_laaj.sh openai/gpt-oss-20b 0 medium r$i/openai/gpt-oss-20bmedium
-  # ./scripts/bench_laaj.sh openai/gpt-oss-20b 0 high r$i/openai/gpt-oss-20bhigh
-  # ./scripts/bench_laaj.sh openai/gpt-oss-120b 0 low r$i/openai/gpt-oss-120blow
-  # ./scripts/bench_laaj.sh openai/gpt-oss-120b 0 medium r$i/openai/gpt-oss-120bmedium
-  # ./scripts/bench_laaj.sh openai/gpt-oss-120b 0 high r$i/openai/gpt-oss-120bhigh
-  # cp .env.openai .env
-
-  echo ""
-  echo "Completed run $i of $RUN_NUM"
-  echo ""
-done
+# One process runs every (run, model, reasoning effort) configuration with a
+# shared concurrency budget (SWEEP_CONCURRENCY, SWEEP_PROVIDER_LIMITS).
+# Complete configurations are skipped. For the GPT-OSS models via OpenRouter,
+# configure .env.openrouter and add e.g.
+#   --models openai/gpt-oss-20b,openai/gpt-oss-120b
+python src/laj/sweep.py --runs "$RUN_NUM" --start-run "$START_NUM" || exit 1
 
 echo "========================================="
 echo "All benchmarks completed!"
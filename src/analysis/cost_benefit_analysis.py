@@ -23,6 +23,7 @@ Usage:
 
 import argparse
 import csv
+import json
 import math
 from collections import Counter, defaultdict
 from pathlib import Path
@@ -319,6 +320,52 @@ def calculate_reliability_metrics(table: CsvTable) -> dict:
     }
 
 
+def calculate_cascade_cost(
+    table: CsvTable, pricing_table: dict, pricing_info: Optional[dict] = None
+) -> Optional[tuple]:
+    """Blended cost of a run from its tier_usage column.
+
+    Each tier's tokens are priced at that model's rates, so a cascade (or a run
+    whose triaged files went to a cheaper model) can be scored like a single
+    model. Rows without tier_usage are priced with ``pricing_info``, the run
+    model's rates. Returns (total cost, calls per model), or None when the CSV
+    has no tier data.
+    """
+    if not table.has_column("tier_usage"):
+        return None
+
+    total_cost = 0.0
+    tier_calls: Counter = Counter()
+    found = False
+    for row in table.rows:
+        value = row.get("tier_usage")
+        tiers = None
+        if value:
+            try:
+                tiers = json.loads(value)
+            except (TypeError, ValueError):
+                tiers = None
+        if not tiers:
+            if pricing_info:
+                total_cost += ((to_float(row.get("prompt_tokens")) or 0) / TOKENS_PER_MILLION) * pricing_info["prompt_cost_per_1m"]
+                total_cost += ((to_float(row.get("completion_tokens")) or 0) / TOKENS_PER_MILLION) * pricing_info["completion_cost_per_1m"]
+            continue
+        found = True
+        for tier in tiers:
+            tier_model = normalize_model_name(tier["model"].replace("/", "_").replace(":", "-"))
+            tier_pricing = pricing_table.get(get_pricing_key(tier_model))
+            if tier_pricing is None:
+                print(f"  ⚠️  No pricing for cascade tier {tier['model']}; counted as free")
+                tier_pricing = {"prompt_cost_per_1m": 0.0, "completion_cost_per_1m": 0.0}
+            total_cost += (tier["prompt_tokens"] / TOKENS_PER_MILLION) * tier_pricing["prompt_cost_per_1m"]
+            total_cost += (tier["completion_tokens"] / TOKENS_PER_MILLION) * tier_pricing["completion_cost_per_1m"]
+            tier_calls[tier["model"]] += tier.get("calls", 0)
+
+    if not found:
+        return None
+    return total_cost, dict(tier_calls)
+
+
 def analyze_single_run(csv_path: str, model_name: str, ground_truth_lookup: Dict[Any, float], pricing_table: dict) -> Optional[dict]:
     """Analyze a single CSV file and return metrics including reliability metrics."""
     try:
@@ -364,16 +411,43 @@ def analyze_single_run(csv_path: str, model_name: str, ground_truth_lookup: Dict
             "completion_cost_per_1m": 0.0,
         })
 
-        # Calculate nominal costs
-        prompt_tokens_sum = table.sum_column("prompt_tokens")
-        completion_tokens_sum = table.sum_column("completion_tokens")
+        # Calculate nominal costs from rows with provider-reported usage; rows
+        # whose stream was cut before the usage chunk only hold estimates, and
+        # response cache hits repeat the usage of the call that was cached
         num_evals = len(table)
+        estimated_usage_rows = sum(
+            1 for row in table.rows if to_bool(row.get("usage_estimated"))
+        )
+        response_cache_rows = sum(
+            1 for row in table.rows if to_bool(row.get("response_cache_hit"))
+        )
+        priced_table = CsvTable(
+            [
+                row
+                for row in table.rows
+                if not to_bool(row.get("usage_estimated"))
+                and not to_bool(row.get("response_cache_hit"))
+            ],
+            table.columns,
+        )
+        if estimated_usage_rows:
+            print(f"  ⚠️  {estimated_usage_rows} rows with estimated usage excluded from cost")
+        if response_cache_rows:
+            print(f"  ⚠️  {response_cache_rows} response cache hits excluded from cost")
+        prompt_tokens_sum = priced_table.sum_column("prompt_tokens")
+        completion_tokens_sum = priced_table.sum_column("completion_tokens")
+
+        cascade_cost = calculate_cascade_cost(priced_table, pricing_table, pricing_info)
+        if cascade_cost:
+            # Cascade judge or down-tiered files: price every tier at its own model's rates
+            total_cost, tier_calls = cascade_cost
+        else:
+            prompt_cost_total = (prompt_tokens_sum / TOKENS_PER_MILLION) * pricing_info["prompt_cost_per_1m"]
+            completion_cost_total = (completion_tokens_sum / TOKENS_PER_MILLION) * pricing_info["completion_cost_per_1m"]
+            total_cost = prompt_cost_total + completion_cost_total
+            tier_calls = None
 
-        prompt_cost_total = (prompt_tokens_sum / TOKENS_PER_MILLION) * pricing_info["prompt_cost_per_1m"]
-        completion_cost_total = (completion_tokens_sum / TOKENS_PER_MILLION) * pricing_info["completion_cost_per_1m"]
-        total_cost = prompt_cost_total + completion_cost_total
-
-        avg_cost_per_eval = total_cost / num_evals if num_evals else 0.0
+        avg_cost_per_eval = total_cost / len(priced_table) if len(priced_table) else 0.0
         cost_per_1k_nominal = avg_cost_per_eval * 1000
 
         # NEW: Calculate adjusted costs accounting for reliability
@@ -409,8 +483,11 @@ def analyze_single_run(csv_path: str, model_name: str, ground_truth_lookup: Dict
             "cost_increase_pct": cost_increase_pct,
             # Additional info
             "num_evals": num_evals,
+            "estimated_usage_rows": estimated_usage_rows,
+            "response_cache_rows": response_cache_rows,
             "prompt_tokens": prompt_tokens_sum,
             "completion_tokens": completion_tokens_sum,
+            "tier_calls": tier_calls,
         }
 
         return result
@@ -445,6 +522,8 @@ def aggregate_multi_run_results(run_data: dict, ground_truth_path: str, pricing_
                 model_runs[model_name].append(result)
                 ecr1_str = f"ECR@1={result['ecr1']:.1f}%" if result['ecr1'] is not None else "ECR@1=N/A"
                 print(f"  ✓ {model_name}: MAE={result['maae']:.2f}, {ecr1_str}, Cost=${result['cost_per_1k_nominal']:.2f}/1K")
+                if result["tier_calls"]:
+                    print(f"    Cascade calls per tier: {result['tier_calls']}")
 
     print(f"\n📈 Computing statistics across runs...\n")
 
@@ -84,9 +84,12 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
     Logic for total_attempts:
     - Sort JSON files by filename (timestamp)
     - For each jira_id, start with total_attempts = 0
-    - For each file in order: total_attempts += 1
+    - For each file in order: total_attempts += attempts made in that run
+      (the result's own total_attempts from in-process retries, else 1)
     - If status is "completed", stop counting (exit loop)
     - If status is "failed", continue to next file
+    - Files skipped by static triage (``--static-triage skip``) hold a static
+      estimate rather than a judgment and are left out
     
     Returns DataFrame with columns:
     - jira_id
@@ -96,6 +99,17 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
     - eval_time
     - prompt_tokens
     - completion_tokens
+    - cached_tokens (prompt tokens served from the provider's prompt cache)
+    - tier_usage (cascade runs: JSON list of per-model calls and tokens; the
+      token columns then hold the totals over all tiers. Files down-tiered by
+      static triage list the triage model)
+    - repair_attempts, repair_prompt_tokens, repair_completion_tokens (JSON
+      repair of unparseable answers; repair model tokens are not part of the
+      judge token columns)
+    - usage_estimated (True when a streamed call was cut before the provider
+      reported usage, so the token columns are estimates)
+    - response_cache_hit (True when every judge answer came from the local
+      response cache, so the token columns were not spent by this run)
     """
     # Group results by jira_id across all attempts
     jira_attempts = defaultdict(list)
@@ -105,6 +119,10 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
         base_folder = os.path.dirname(json_path)
         
         for result in json_data["results"]:
+            # Files skipped by static triage hold the static estimate, not a
+            # judgment of the run's model
+            if (result.get("triage") or {}).get("action") == "skip":
+                continue
             jira_id = result["jira_id"]
             
             # Extract metadata
@@ -116,12 +134,57 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
                 usage = coverage_details[0]["usage"]
                 prompt_tokens = usage.get("prompt_tokens", 0) if usage else 0
                 completion_tokens = usage.get("completion_tokens", 0) if usage else 0
+                prompt_details = (usage.get("prompt_tokens_details") if usage else None) or {}
+                cached_tokens = prompt_details.get("cached_tokens") or 0
             else:
                 prompt_tokens = 0
                 completion_tokens = 0
+                cached_tokens = 0
+
+            # Streams cut before the usage chunk only have estimated tokens
+            usage_estimated = any(
+                ((detail or {}).get("timing") or {}).get("usage_estimated")
+                for detail in coverage_details
+            )
+
+            # Answers replayed from the response cache keep the original usage
+            response_cache_hit = bool(coverage_details) and all(
+                (detail or {}).get("response_cache_hit") for detail in coverage_details
+            )
+
+            # Cascade judges spend tokens on several models
+            cascade = result.get("cascade")
+            tier_usage = None
+            if cascade and cascade.get("tiers"):
+                tiers = cascade["tiers"]
+                tier_usage = json.dumps(tiers)
+                prompt_tokens = sum(tier["prompt_tokens"] for tier in tiers)
+                completion_tokens = sum(tier["completion_tokens"] for tier in tiers)
+                cached_tokens = sum(tier.get("cached_tokens") or 0 for tier in tiers)
+
+            # Files down-tiered by static triage were judged by a cheaper model
+            triage = result.get("triage") or {}
+            if triage.get("action") == "downtier" and tier_usage is None:
+                tier_usage = json.dumps(
+                    [
+                        {
+                            "model": triage["model"],
+                            "calls": result.get("total_attempts") or 1,
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "cached_tokens": cached_tokens,
+                        }
+                    ]
+                )
+
+            # JSON repair is tracked apart from the judge call
+            repair_tokens = result.get("repair_tokens") or {}
             
             # Normalize status
             status = "failed" if result.get("status") == "failed" else "completed"
+
+            # Attempts made inside this run (in-process retries)
+            run_attempts = result.get("total_attempts") or 1
             
             jira_attempts[jira_id].append({
                 "attempt_number": attempt_num,
@@ -132,6 +195,14 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
                 "eval_time": eval_time,
                 "prompt_tokens": prompt_tokens,
                 "completion_tokens": completion_tokens,
+                "cached_tokens": cached_tokens,
+                "tier_usage": tier_usage,
+                "usage_estimated": usage_estimated,
+                "response_cache_hit": response_cache_hit,
+                "repair_attempts": result.get("repair_attempts") or 0,
+                "repair_prompt_tokens": repair_tokens.get("prompt_tokens", 0),
+                "repair_completion_tokens": repair_tokens.get("completion_tokens", 0),
+                "run_attempts": run_attempts,
             })
     
     # For each jira_id, count attempts until success
@@ -146,7 +217,7 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
         final_attempt = None
         
         for attempt in attempts:
-            total_attempts += 1
+            total_attempts += attempt["run_attempts"]
             final_attempt = attempt
             
             # If completed, stop counting
@@ -160,11 +231,14 @@ def consolidate_results_with_attempts(json_paths_with_timestamps: List[Tuple[str
         # Remove columns we don't want in the output
         result.pop("attempt_number", None)
         result.pop("timestamp", None)
+        result.pop("run_attempts", None)
         
         consolidated_results.append(result)
     
     # Convert to DataFrame
     df = pd.DataFrame(consolidated_results)
+    if df.empty:
+        return df
     
     # Sort by jira_id
     df["jira_id"] = df["jira_id"].astype(int)
@@ -10,20 +10,35 @@ files to evaluate test coverage comprehensively.
 import os
 import json
 import glob
+import hashlib
 import argparse
 import datetime
 import logging
 import asyncio
-import copy
-from typing import List, Dict, Optional
+import functools
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 
 # Import from the existing coverage module
 from coverage import (
-    load_text_file,
     get_jira_story_by_id,
-    analyze_coverage,
-    is_valid_gherkin,
+    analyze_coverage_samples,
+    analyze_coverage_batch,
+    analyze_coverage_cascade,
+    benchmark_from_response,
+    build_judge_request,
+    generate_messages,
+    gherkin_prompt_text,
+    llm_response,
+    SAMPLING_MODES,
+    SAMPLE_REDUCERS,
     benchmark_data,
+    benchmark_output,
+    coverage_analysis,
     benchmark_config,
     test_config,
     llm_config,
@@ -34,6 +49,57 @@ from coverage_config import (
     OPENAI_TEMPERATURE,
     OPENAI_MAX_TOKEN,
     COVERAGE_REPORT_BASE_PATH,
+    ANALYSIS_CONCURRENCY,
+    MAX_ATTEMPTS,
+    PROMPT_LAYOUT,
+    LLM_CACHE_MODE,
+    STRUCTURED_OUTPUT,
+    STREAM_RESPONSES,
+    TOTAL_COVERAGE_REPORT_RUN,
+    SAMPLING_MODE,
+    COVERAGE_SAMPLE_REDUCER,
+    ANALYSIS_BATCH_SIZE,
+    ANALYSIS_MODE,
+    BATCH_BACKEND,
+    BATCH_POLL_INTERVAL,
+    CASCADE_MODELS,
+    CASCADE_SAMPLES,
+    CASCADE_DISAGREEMENT,
+    TRUNCATION_STRATEGY,
+    JSON_REPAIR,
+    JSON_REPAIR_MODEL,
+    STATIC_TRIAGE,
+    STATIC_TRIAGE_THRESHOLD,
+    STATIC_TRIAGE_MODEL,
+    STATIC_DISAGREEMENT,
+    SCENARIO_BUDGET,
+    SCENARIO_COMPARE,
+    ANALYSIS_SHARD,
+)
+from llm_client import get_pool_stats
+from rate_limiter import get_rate_limit_stats
+from response_cache import CACHE_MODES, can_write, compute_cache_key, get_cache_stats
+from judge_stats import get_judge_stats
+from gherkin_parser import get_gherkin_cache_stats, load_gherkin_file
+from coverage_context import get_context
+from bm25_index import INDEX_FILE_NAME, index_gherkin_files, select_scenarios
+from run_manifest import config_key, get_run_manifest, input_hash, verdict_settings
+from progress_journal import journal_path, progress_journal
+from static_scorer import (
+    TRIAGE_MODES,
+    score_document,
+    summarize_static_agreement,
+    triage_action,
+)
+from batch_jobs import (
+    BATCH_BACKENDS,
+    TERMINAL_STATUSES,
+    collect_batch_results,
+    get_batch_backend,
+    load_job,
+    render_batch_file,
+    save_job,
+    wait_for_batch,
 )
 
 logging.basicConfig(
@@ -91,23 +157,23 @@ def save_analysis_cache(
         logger.warning(f"Unable to write analysis cache {cache_path}: {exc}")
 
 
-def bootstrap_cache_from_reports(
-    gherkin_files: List[str], output_dir: str, model_name: str
-) -> Dict[str, Dict]:
-    """Reconstruct cache entries from existing benchmark reports when possible."""
+def iter_report_results(gherkin_files: List[str], output_dir: str):
+    """Yield ``(file_path, llm_config, summary_result)`` for each completed report
+
+    Reports are matched to the given Gherkin files by file name and Jira ID.
+    """
 
     if not output_dir or not gherkin_files:
-        return {}
+        return
 
     gherkin_by_name = {
         os.path.basename(path): path for path in gherkin_files if os.path.exists(path)
     }
 
     if not gherkin_by_name:
-        return {}
+        return
 
     report_pattern = os.path.join(output_dir, "benchmark_result_*.json")
-    reconstructed: Dict[str, Dict] = {}
 
     for report_path in glob.glob(report_pattern):
         try:
@@ -124,9 +190,8 @@ def bootstrap_cache_from_reports(
         if benchmark_cfg.get("benchmark_status") != "completed":
             continue
 
-        llm_cfg = test_cfg.get("llm_config") or {}
-        if llm_cfg.get("model") != model_name:
-            continue
+        # Judge settings beyond llm_config (absent in older reports: defaults)
+        llm_cfg = dict(test_cfg.get("llm_config") or {}, **(test_cfg.get("judge_settings") or {}))
 
         benchmark_outputs = results_block.get("benchmark_output") or []
         if not benchmark_outputs:
@@ -138,16 +203,9 @@ def bootstrap_cache_from_reports(
                 continue
 
             file_path = gherkin_by_name.get(gherkin_id)
-            # logger.debug(f"Mapping Gherkin ID {gherkin_id} to file path {file_path}")
-            # logger.debug(f"output_dir: {output_dir}")
             if not file_path:
                 continue
 
-            try:
-                file_mod_time = os.path.getmtime(file_path)
-            except OSError:
-                continue
-
             jira_id = str(benchmark_cfg.get("jira_id"))
             expected_jira_id = extract_jira_id_from_filename(file_path)
             if expected_jira_id and jira_id and jira_id != expected_jira_id:
@@ -163,16 +221,49 @@ def bootstrap_cache_from_reports(
                 ),
                 "analysis_time": test_cfg.get("benchmark_end_time"),
                 "benchmark_report_path": report_path,
-                "model_used": model_name,
+                "model_used": llm_cfg.get("model"),
+                "attempt_number": coverage_entry.get("attempt_number"),
+                "total_attempts": coverage_entry.get("total_attempts"),
+                "batch_size": coverage_entry.get("batch_size"),
+                "cascade": coverage_entry.get("cascade"),
+                "repair_attempts": coverage_entry.get("repair_attempts"),
+                "repair_tokens": coverage_entry.get("repair_tokens"),
                 "coverage_details": coverage_entry.get("coverage_analysis", []),
             }
+            if coverage_entry.get("triage"):
+                summary_result["triage"] = coverage_entry["triage"]
 
-            reconstructed[file_path] = {
-                "status": "completed",
-                "jira_id": jira_id,
-                "file_mod_time": file_mod_time,
-                "result": summary_result,
-            }
+            entry_cfg = llm_cfg
+            if "batch_size" not in entry_cfg and (coverage_entry.get("batch_size") or 1) > 1:
+                # Reports from before batch_size was a judge setting
+                entry_cfg = dict(llm_cfg, batch_size=coverage_entry["batch_size"])
+            yield file_path, entry_cfg, summary_result
+
+
+def bootstrap_cache_from_reports(
+    gherkin_files: List[str], output_dir: str, model_name: str
+) -> Dict[str, Dict]:
+    """Reconstruct cache entries from existing benchmark reports when possible.
+
+    Rescans every report; ``analyze_folder`` uses the run manifest instead.
+    """
+    reconstructed: Dict[str, Dict] = {}
+
+    for file_path, llm_cfg, summary_result in iter_report_results(
+        gherkin_files, output_dir
+    ):
+        if llm_cfg.get("model") != model_name:
+            continue
+        try:
+            file_mod_time = os.path.getmtime(file_path)
+        except OSError:
+            continue
+        reconstructed[file_path] = {
+            "status": "completed",
+            "jira_id": summary_result["jira_id"],
+            "file_mod_time": file_mod_time,
+            "result": summary_result,
+        }
 
     if reconstructed:
         logger.info(
@@ -182,6 +273,79 @@ def bootstrap_cache_from_reports(
     return reconstructed
 
 
+def judgment_input_hash(file_path: str, jira_story: Optional[Dict], context=None) -> str:
+    """Input hash of a file's judgment: normalized Gherkin, story and prompt version"""
+    return input_hash(
+        load_gherkin_file(file_path).normalized_hash,
+        jira_story,
+        get_context(context).prompt_version,
+    )
+
+
+def mark_cached(result: Dict, file_path: str, jira_id: str, model_config: Dict) -> Dict:
+    """A judgment from the run manifest as this run's summary entry"""
+    result["status"] = "cached"
+    result["cache_hit"] = True
+    result["file_path"] = file_path
+    result.setdefault("jira_id", jira_id)
+    result.setdefault("model_used", model_config["model"])
+    return result
+
+
+def judge_config_of(model_config: Dict, triage: Optional[Dict] = None) -> Dict:
+    """Settings a file was judged with: a down-tiered file by the triage model alone"""
+    if (triage or {}).get("action") == "downtier":
+        return dict(model_config, model=triage["model"], cascade_models=[], batch_size=1)
+    return model_config
+
+
+def is_static_estimate(result: Dict) -> bool:
+    """A result of static triage's skip action, which holds no judge call
+
+    Completed reports written before the triage decision was stored in them
+    are told apart by having no token usage at all.
+    """
+    triage = result.get("triage")
+    if triage:
+        return triage.get("action") == "skip"
+    return not any((detail or {}).get("usage") for detail in result.get("coverage_details") or [])
+
+
+def rebuild_manifest(gherkin_files: List[str], output_dir: str, context=None) -> int:
+    """Record the reports of a folder written before the run manifest existed
+
+    Reports already in the manifest are left alone, so running it twice is
+    harmless. Static triage estimates are not judgments and are left out. Each report is recorded under the current content of its
+    Gherkin file, story and prompts, as the report rescan used to assume.
+    Returns the number of judgments recorded.
+    """
+    manifest = get_run_manifest(output_dir)
+    known = manifest.report_paths()
+    recorded = 0
+    for file_path, llm_cfg, summary_result in sorted(
+        iter_report_results(gherkin_files, output_dir),
+        key=lambda entry: entry[2]["benchmark_report_path"],
+    ):
+        report_path = summary_result["benchmark_report_path"]
+        if os.path.abspath(report_path) in known or is_static_estimate(summary_result):
+            continue
+        jira_id = summary_result["jira_id"]
+        manifest.record(
+            judgment_input_hash(file_path, get_jira_story_by_id(jira_id, context), context),
+            jira_id,
+            config_key(judge_config_of(llm_cfg, summary_result.get("triage"))),
+            file_path,
+            "completed",
+            report_path,
+            summary_result,
+        )
+        recorded += 1
+
+    if recorded:
+        logger.info(f"Recorded {recorded} existing reports in the run manifest {manifest.path}")
+    return recorded
+
+
 def get_folder_configuration():
     """Get folder configuration from command line args and environment variables"""
     parser = argparse.ArgumentParser(
@@ -226,6 +390,164 @@ def get_folder_configuration():
     parser.add_argument(
         "--max-tokens", type=int, help="Maximum tokens for model responses"
     )
+    parser.add_argument(
+        "--concurrency",
+        "-c",
+        type=int,
+        default=ANALYSIS_CONCURRENCY,
+        help="Number of files analyzed in parallel (default: ANALYSIS_CONCURRENCY env var or 1)",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_ATTEMPTS,
+        help="Maximum judge calls per file, retrying parse failures, timeouts and 5xx/429 (default: MAX_ATTEMPTS env var or 1)",
+    )
+    parser.add_argument(
+        "--prompt-layout",
+        choices=["legacy", "static_first"],
+        default=PROMPT_LAYOUT,
+        help="Prompt layout; static_first puts guidelines and example output first for prompt caching (default: PROMPT_LAYOUT env var or legacy)",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=LLM_CACHE_MODE,
+        help="LLM response cache mode (default: LLM_CACHE_MODE env var or off)",
+    )
+    parser.add_argument(
+        "--structured-output",
+        action="store_true",
+        default=STRUCTURED_OUTPUT,
+        help="Request schema-enforced JSON output where the backend supports it (default: STRUCTURED_OUTPUT env var)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=STREAM_RESPONSES,
+        help="Stream responses, recording time to first token and stopping once the JSON object is complete (default: STREAM_RESPONSES env var)",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=TOTAL_COVERAGE_REPORT_RUN,
+        help="Judge samples per file, combined with --reducer (default: TOTAL_COVERAGE_REPORT_RUN env var or 1)",
+    )
+    parser.add_argument(
+        "--sampling-mode",
+        choices=SAMPLING_MODES,
+        default=SAMPLING_MODE,
+        help="How samples are requested; packed sends one call with n=samples (default: SAMPLING_MODE env var or sequential)",
+    )
+    parser.add_argument(
+        "--reducer",
+        choices=SAMPLE_REDUCERS,
+        default=COVERAGE_SAMPLE_REDUCER,
+        help="How sampled coverage percentages are combined (default: COVERAGE_SAMPLE_REDUCER env var or mean)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=ANALYSIS_BATCH_SIZE,
+        help="Judge up to K files per request, sharing the guidelines and example output; unparsed entries fall back to single-file calls (default: ANALYSIS_BATCH_SIZE env var or 1)",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["sync", "batch"],
+        default=ANALYSIS_MODE,
+        help="sync sends one request per file; batch submits all requests as one Batch API job and resumes it on re-run (default: ANALYSIS_MODE env var or sync)",
+    )
+    parser.add_argument(
+        "--batch-backend",
+        choices=BATCH_BACKENDS,
+        default=BATCH_BACKEND,
+        help="Backend for --mode batch; local is a file-based stand-in (default: BATCH_BACKEND env var or openai)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=BATCH_POLL_INTERVAL,
+        help="Seconds between batch job status polls (default: BATCH_POLL_INTERVAL env var or 30)",
+    )
+    parser.add_argument(
+        "--cascade",
+        type=str,
+        default=",".join(CASCADE_MODELS),
+        help="Comma-separated judge models from cheapest to strongest; a file goes to the next model on parse failure, truncation or sample disagreement (default: CASCADE_MODELS env var)",
+    )
+    parser.add_argument(
+        "--cascade-samples",
+        type=int,
+        default=CASCADE_SAMPLES,
+        help="Samples taken on every cascade tier but the last, to detect disagreement (default: CASCADE_SAMPLES env var or 2)",
+    )
+    parser.add_argument(
+        "--cascade-disagreement",
+        type=float,
+        default=CASCADE_DISAGREEMENT,
+        help="Escalate when cheap samples differ by more than this many percentage points (default: CASCADE_DISAGREEMENT env var or 10)",
+    )
+    parser.add_argument(
+        "--truncation",
+        choices=["auto", "continue", "budget", "off"],
+        default=TRUNCATION_STRATEGY,
+        help="Recovery for answers cut off at the token budget: continue the answer, retry with a larger budget, auto picks one (default: TRUNCATION_STRATEGY env var or auto)",
+    )
+    parser.add_argument(
+        "--json-repair",
+        choices=["off", "local", "model", "auto"],
+        default=JSON_REPAIR,
+        help="Repair stage for answers that do not parse: local deterministic repairer, a cheap repair model, or auto for local then model (default: JSON_REPAIR env var or local)",
+    )
+    parser.add_argument(
+        "--repair-model",
+        default=JSON_REPAIR_MODEL,
+        help="Model used by --json-repair model/auto; it only sees the broken output and the schema (default: JSON_REPAIR_MODEL env var or gpt-4.1-nano)",
+    )
+    parser.add_argument(
+        "--static-triage",
+        choices=TRIAGE_MODES,
+        default=STATIC_TRIAGE,
+        help="Static pre-scorer: report its estimate next to the judge, skip the judge or use --triage-model for files at or above --triage-threshold (default: STATIC_TRIAGE env var or report)",
+    )
+    parser.add_argument(
+        "--triage-threshold",
+        type=float,
+        default=STATIC_TRIAGE_THRESHOLD,
+        help="Static coverage percentage at which --static-triage skip/downtier applies (default: STATIC_TRIAGE_THRESHOLD env var or 100)",
+    )
+    parser.add_argument(
+        "--triage-model",
+        default=STATIC_TRIAGE_MODEL,
+        help="Judge model for files down-tiered by --static-triage downtier (default: STATIC_TRIAGE_MODEL env var or gpt-4.1-nano)",
+    )
+    parser.add_argument(
+        "--scenario-budget",
+        type=int,
+        default=SCENARIO_BUDGET,
+        help="Send only the scenarios most relevant to the story (BM25) that fit in this many Gherkin tokens; 0 sends whole files (default: SCENARIO_BUDGET env var or 0)",
+    )
+    parser.add_argument(
+        "--scenario-compare",
+        action="store_true",
+        default=SCENARIO_COMPARE,
+        help="Also judge every trimmed file in full and report the coverage, token and latency differences (default: SCENARIO_COMPARE env var)",
+    )
+    parser.add_argument(
+        "--shard",
+        default=ANALYSIS_SHARD,
+        help="Analyze only shard i of N of the folder, e.g. 2/4, and write a partial summary for merge_shards.py (default: ANALYSIS_SHARD env var, whole folder)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the interrupted run of this folder and model from its progress journal",
+    )
+    parser.add_argument(
+        "--rebuild-manifest",
+        action="store_true",
+        help="Record the existing benchmark reports of --output in its run manifest and exit (folders written before the manifest existed)",
+    )
 
     args = parser.parse_args()
 
@@ -274,6 +596,35 @@ def get_folder_configuration():
         "model": args.model,
         "temperature": args.temperature,
         "max_tokens": args.max_tokens,
+        "concurrency": max(1, args.concurrency),
+        "max_attempts": max(1, args.max_attempts),
+        "prompt_layout": args.prompt_layout,
+        "cache_mode": args.cache_mode,
+        "structured_output": args.structured_output,
+        "stream": args.stream,
+        "samples": max(1, args.samples),
+        "sampling_mode": args.sampling_mode,
+        "sample_reducer": args.reducer,
+        "batch_size": max(1, args.batch_size),
+        "mode": args.mode,
+        "batch_backend": args.batch_backend,
+        "poll_interval": args.poll_interval,
+        "cascade_models": [
+            model.strip() for model in args.cascade.split(",") if model.strip()
+        ],
+        "cascade_samples": max(1, args.cascade_samples),
+        "cascade_disagreement": args.cascade_disagreement,
+        "truncation_strategy": args.truncation,
+        "json_repair": args.json_repair,
+        "json_repair_model": args.repair_model,
+        "static_triage": args.static_triage,
+        "triage_threshold": args.triage_threshold,
+        "triage_model": args.triage_model,
+        "scenario_budget": max(0, args.scenario_budget),
+        "scenario_compare": args.scenario_compare,
+        "rebuild_manifest": args.rebuild_manifest,
+        "shard": parse_shard(args.shard),
+        "resume": args.resume,
     }
 
 
@@ -297,6 +648,26 @@ def find_gherkin_files(
     return gherkin_files
 
 
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """``"i/N"`` (1-based) as ``(i, N)``; None when empty (the whole folder)"""
+    if not value:
+        return None
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard {value!r} (expected i/N, e.g. 2/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {value!r} (i must be between 1 and N)")
+    return index, count
+
+
+def shard_of(key: str, count: int) -> int:
+    """1-based shard of ``key``, the same on every host and Python version"""
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
 def extract_jira_id_from_filename(filename: str) -> Optional[str]:
     """Extract JIRA ticket ID from filename using common patterns"""
     import re
@@ -350,12 +721,59 @@ def get_jira_id_for_file(
     return extract_jira_id_from_filename(file_path)
 
 
+def cascade_label(models: List[str]) -> str:
+    """Model name under which cascade results are reported and cached"""
+    return "cascade-" + "+".join(models)
+
+
+def config_value(config: Dict, key: str, default):
+    """``config[key]`` unless unset, so an explicit 0 overrides the env default"""
+    value = config.get(key)
+    return default if value is None else value
+
+
 def get_model_config(config: Dict) -> Dict:
-    """Get model configuration with command line overrides"""
+    """Get model configuration with command line overrides
+
+    With a cascade the model is reported as the cascade label; the tier
+    models are used for the actual calls.
+    """
+    cascade_models = config.get("cascade_models") or CASCADE_MODELS
     return {
-        "model": config.get("model") or OPENAI_MODEL,
-        "temperature": config.get("temperature") or OPENAI_TEMPERATURE,
+        "model": (
+            cascade_label(cascade_models)
+            if cascade_models
+            else config.get("model") or OPENAI_MODEL
+        ),
+        "temperature": config_value(config, "temperature", OPENAI_TEMPERATURE),
         "max_tokens": config.get("max_tokens") or OPENAI_MAX_TOKEN,
+        "reasoning_effort": config.get("reasoning_effort") or os.getenv("REASONING_EFFORT"),
+        "max_attempts": config.get("max_attempts") or MAX_ATTEMPTS,
+        "prompt_layout": config.get("prompt_layout") or PROMPT_LAYOUT,
+        "cache_mode": config.get("cache_mode") or LLM_CACHE_MODE,
+        "structured_output": config.get("structured_output") or STRUCTURED_OUTPUT,
+        "stream": config.get("stream") or STREAM_RESPONSES,
+        "samples": config.get("samples") or TOTAL_COVERAGE_REPORT_RUN,
+        "sampling_mode": config.get("sampling_mode") or SAMPLING_MODE,
+        "sample_reducer": config.get("sample_reducer") or COVERAGE_SAMPLE_REDUCER,
+        "batch_size": config.get("batch_size") or ANALYSIS_BATCH_SIZE,
+        "mode": config.get("mode") or ANALYSIS_MODE,
+        "batch_backend": config.get("batch_backend") or BATCH_BACKEND,
+        "poll_interval": config.get("poll_interval") or BATCH_POLL_INTERVAL,
+        "cascade_models": cascade_models,
+        "cascade_samples": config.get("cascade_samples") or CASCADE_SAMPLES,
+        "cascade_disagreement": config.get("cascade_disagreement")
+        or CASCADE_DISAGREEMENT,
+        "truncation_strategy": config.get("truncation_strategy") or TRUNCATION_STRATEGY,
+        "json_repair": config.get("json_repair") or JSON_REPAIR,
+        "json_repair_model": config.get("json_repair_model") or JSON_REPAIR_MODEL,
+        "static_triage": config.get("static_triage") or STATIC_TRIAGE,
+        "triage_threshold": config_value(config, "triage_threshold", STATIC_TRIAGE_THRESHOLD),
+        "triage_model": config.get("triage_model") or STATIC_TRIAGE_MODEL,
+        "scenario_budget": config_value(config, "scenario_budget", SCENARIO_BUDGET),
+        "scenario_compare": config.get("scenario_compare") or SCENARIO_COMPARE,
+        # Registered coverage_context name (None: the default dataset and prompts)
+        "context": config.get("context"),
     }
 
 
@@ -393,6 +811,9 @@ def create_benchmark_report(
             temperature=model_config["temperature"],
             max_tokens=model_config["max_tokens"],
         ),
+        judge_settings=verdict_settings(
+            judge_config_of(model_config, analysis_result.triage)
+        ),
     )
 
     # Create benchmark results
@@ -433,10 +854,122 @@ def save_benchmark_report(
         raise
 
 
+def load_gherkin_inputs(file_path: str, jira_id: str, context=None):
+    """Validate a Gherkin file and look up its story
+
+    Returns ``(jira_story, None)``, or ``(None, failed_result)`` when the file
+    cannot be analyzed.
+    """
+    # Cached by path and content hash, so the judge call reuses this read
+    if not load_gherkin_file(file_path).is_valid:
+        logger.warning(f"Invalid Gherkin format in file: {file_path}")
+        return None, {
+            "file_path": file_path,
+            "jira_id": jira_id,
+            "status": "failed",
+            "error": "Invalid Gherkin format",
+        }
+
+    # Get JIRA story
+    jira_story = get_jira_story_by_id(jira_id, context)
+    if not jira_story:
+        logger.warning(f"JIRA story not found for ID: {jira_id}")
+        return None, {
+            "file_path": file_path,
+            "jira_id": jira_id,
+            "status": "failed",
+            "error": f"JIRA story not found for ID: {jira_id}",
+        }
+
+    return jira_story, None
+
+
+def build_file_result(
+    file_path: str,
+    jira_id: str,
+    jira_story: Dict,
+    analysis_result,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    model_config: Dict,
+    output_path: Optional[str] = None,
+) -> Dict:
+    """Save the benchmark report of one file and return its folder summary entry"""
+    benchmark_obj = create_benchmark_report(
+        jira_story, analysis_result, file_path, start_time, end_time, model_config
+    )
+    report_path = save_benchmark_report(benchmark_obj, output_path)
+
+    # Create summary result for folder analysis
+    result = {
+        "file_path": file_path,
+        "jira_id": jira_id,
+        "jira_title": jira_story.get("title", ""),
+        "status": analysis_result.status,
+        "coverage_percentage": analysis_result.average_coverage_percentage,
+        "analysis_time": end_time.isoformat(),
+        "benchmark_report_path": report_path,
+        "model_used": model_config["model"],
+        "attempt_number": analysis_result.attempt_number,
+        "total_attempts": analysis_result.total_attempts,
+        "batch_size": analysis_result.batch_size,
+        "cascade": analysis_result.cascade,
+        "repair_attempts": analysis_result.repair_attempts,
+        "repair_tokens": analysis_result.repair_tokens,
+        "coverage_details": [],
+    }
+    if analysis_result.triage:
+        result["triage"] = analysis_result.triage
+
+    # Add detailed coverage analysis
+    if analysis_result.coverage_analysis:
+        for coverage in analysis_result.coverage_analysis:
+            result["coverage_details"].append(
+                {
+                    "coverage_percentage": coverage.coverage_percentage,
+                    "covered_items": coverage.covered,
+                    "gaps": coverage.gaps,
+                    "recommendations": coverage.recommendations,
+                    "usage": coverage.usage,
+                    "cached_tokens": coverage.cached_tokens,
+                    "response_cache_hit": coverage.response_cache_hit,
+                    "timing": coverage.timing,
+                }
+            )
+
+    # Index the report right away, so an interrupted run still knows it. A
+    # static estimate is no judgment; a down-tiered file is keyed by its judge.
+    if (analysis_result.triage or {}).get("action") == "skip":
+        return result
+    get_run_manifest(output_path or COVERAGE_REPORT_BASE_PATH).record(
+        judgment_input_hash(file_path, jira_story, model_config.get("context")),
+        jira_id,
+        config_key(judge_config_of(model_config, analysis_result.triage)),
+        file_path,
+        analysis_result.status,
+        report_path,
+        result,
+    )
+
+    return result
+
+
 async def analyze_gherkin_file(
-    file_path: str, jira_id: str, model_config: Dict, output_path: Optional[str] = None
+    file_path: str,
+    jira_id: str,
+    model_config: Dict,
+    output_path: Optional[str] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    judge_model: Optional[str] = None,
 ) -> Optional[Dict]:
-    """Analyze a single Gherkin file for coverage and generate benchmark report"""
+    """Analyze a single Gherkin file for coverage and generate benchmark report
+
+    The blocking LLM call runs on ``executor`` (or the loop's default executor)
+    so several files can be analyzed concurrently from one event loop. With
+    ``judge_model`` (static triage) that model judges the file, while the
+    report stays under the run's model name. With ``scenario_compare`` a file
+    trimmed to the scenario budget is judged a second time in full.
+    """
     logger.info(f"Analyzing Gherkin file: {file_path} for JIRA ticket: {jira_id}")
     logger.info(
         f"Using model: {model_config['model']} (temp: {model_config['temperature']}, max_tokens: {model_config['max_tokens']})"
@@ -445,71 +978,84 @@ async def analyze_gherkin_file(
     start_time = datetime.datetime.now()
 
     try:
-        # Load and validate Gherkin content
-        gherkin_content = load_text_file(file_path)
-
-        if not is_valid_gherkin(gherkin_content):
-            logger.warning(f"Invalid Gherkin format in file: {file_path}")
-            return {
-                "file_path": file_path,
-                "jira_id": jira_id,
-                "status": "failed",
-                "error": "Invalid Gherkin format",
-            }
-
-        # Get JIRA story
-        jira_story = get_jira_story_by_id(jira_id)
-        if not jira_story:
-            logger.warning(f"JIRA story not found for ID: {jira_id}")
-            return {
-                "file_path": file_path,
-                "jira_id": jira_id,
-                "status": "failed",
-                "error": f"JIRA story not found for ID: {jira_id}",
-            }
+        jira_story, failed_result = load_gherkin_inputs(
+            file_path, jira_id, model_config.get("context")
+        )
+        if failed_result:
+            return failed_result
 
         # Analyze coverage
         filename = os.path.basename(file_path)
-        analysis_result = analyze_coverage(
-            jira_story,
-            filename,
-            model_config=model_config,
-            gherkin_base_path=os.path.dirname(file_path),
-        )
+
+        def build_judge(config: Dict):
+            if judge_model:
+                return functools.partial(
+                    analyze_coverage_samples,
+                    jira_story,
+                    filename,
+                    samples=config["samples"],
+                    model_config=dict(config, model=judge_model),
+                    gherkin_base_path=os.path.dirname(file_path),
+                )
+            if config["cascade_models"]:
+                return functools.partial(
+                    analyze_coverage_cascade,
+                    jira_story,
+                    filename,
+                    config["cascade_models"],
+                    samples=config["samples"],
+                    model_config=config,
+                    gherkin_base_path=os.path.dirname(file_path),
+                )
+            return functools.partial(
+                analyze_coverage_samples,
+                jira_story,
+                filename,
+                samples=config["samples"],
+                model_config=config,
+                gherkin_base_path=os.path.dirname(file_path),
+            )
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        analysis_result = await loop.run_in_executor(executor, build_judge(model_config))
+        judge_seconds = time.perf_counter() - started
+        if judge_model:
+            analysis_result.triage = {"action": "downtier", "model": judge_model}
 
         end_time = datetime.datetime.now()
 
-        # Create and save benchmark report
-        benchmark_obj = create_benchmark_report(
-            jira_story, analysis_result, file_path, start_time, end_time, model_config
+        result = build_file_result(
+            file_path,
+            jira_id,
+            jira_story,
+            analysis_result,
+            start_time,
+            end_time,
+            model_config,
+            output_path,
         )
-        report_path = save_benchmark_report(benchmark_obj, output_path)
 
-        # Create summary result for folder analysis
-        result = {
-            "file_path": file_path,
-            "jira_id": jira_id,
-            "jira_title": jira_story.get("title", ""),
-            "status": analysis_result.status,
-            "coverage_percentage": analysis_result.average_coverage_percentage,
-            "analysis_time": end_time.isoformat(),
-            "benchmark_report_path": report_path,
-            "model_used": model_config["model"],
-            "coverage_details": [],
-        }
-
-        # Add detailed coverage analysis
-        if analysis_result.coverage_analysis:
-            for coverage in analysis_result.coverage_analysis:
-                result["coverage_details"].append(
-                    {
-                        "coverage_percentage": coverage.coverage_percentage,
-                        "covered_items": coverage.covered,
-                        "gaps": coverage.gaps,
-                        "recommendations": coverage.recommendations,
-                        "usage": coverage.usage,
-                    }
+        if model_config["scenario_budget"] and model_config["scenario_compare"]:
+            selection = select_scenarios(
+                jira_story, load_gherkin_file(file_path), model_config["scenario_budget"]
+            )
+            if selection.trimmed:
+                started = time.perf_counter()
+                full_result = await loop.run_in_executor(
+                    executor, build_judge(dict(model_config, scenario_budget=0))
                 )
+                result["retrieval"] = {
+                    "comparison": {
+                        "status": full_result.status,
+                        "coverage_percentage": analysis_result.average_coverage_percentage,
+                        "full_coverage_percentage": full_result.average_coverage_percentage,
+                        "prompt_tokens": prompt_tokens_of(analysis_result),
+                        "full_prompt_tokens": prompt_tokens_of(full_result),
+                        "seconds": judge_seconds,
+                        "full_seconds": time.perf_counter() - started,
+                    }
+                }
 
         return result
 
@@ -523,13 +1069,524 @@ async def analyze_gherkin_file(
         }
 
 
-async def analyze_folder(config: Dict) -> Dict:
-    """Analyze all Gherkin files in the specified folder"""
+def prompt_tokens_of(analysis_result) -> int:
+    return sum(
+        (coverage.usage or {}).get("prompt_tokens") or 0
+        for coverage in analysis_result.coverage_analysis or []
+    )
+
+
+async def analyze_gherkin_batch(
+    batch: List[tuple],
+    model_config: Dict,
+    output_path: Optional[str] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> List[Dict]:
+    """Analyze several (file_path, jira_id) pairs with one multi-ticket prompt
+
+    Each file still gets its own benchmark report and summary entry, returned
+    in the order of ``batch``.
+    """
+    logger.info(
+        f"Analyzing batch of {len(batch)} Gherkin files: {[jira_id for _, jira_id in batch]}"
+    )
+
+    start_time = datetime.datetime.now()
+    results: List[Optional[Dict]] = [None] * len(batch)
+    batch_items = []
+
+    for index, (file_path, jira_id) in enumerate(batch):
+        try:
+            jira_story, failed_result = load_gherkin_inputs(
+                file_path, jira_id, model_config.get("context")
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing file {file_path}: {str(e)}")
+            failed_result = {
+                "file_path": file_path,
+                "jira_id": jira_id,
+                "status": "failed",
+                "error": str(e),
+            }
+        if failed_result:
+            results[index] = failed_result
+        else:
+            batch_items.append((index, jira_story))
+
+    if batch_items:
+        loop = asyncio.get_running_loop()
+        analysis_results = await loop.run_in_executor(
+            executor,
+            functools.partial(
+                analyze_coverage_batch,
+                [
+                    (
+                        jira_story,
+                        os.path.basename(batch[index][0]),
+                        os.path.dirname(batch[index][0]),
+                    )
+                    for index, jira_story in batch_items
+                ],
+                samples=model_config["samples"],
+                model_config=model_config,
+            ),
+        )
+
+        end_time = datetime.datetime.now()
+
+        for (index, jira_story), analysis_result in zip(batch_items, analysis_results):
+            file_path, jira_id = batch[index]
+            try:
+                results[index] = build_file_result(
+                    file_path,
+                    jira_id,
+                    jira_story,
+                    analysis_result,
+                    start_time,
+                    end_time,
+                    model_config,
+                    output_path,
+                )
+            except Exception as e:
+                logger.error(f"Error analyzing file {file_path}: {str(e)}")
+                results[index] = {
+                    "file_path": file_path,
+                    "jira_id": jira_id,
+                    "status": "failed",
+                    "error": str(e),
+                }
+
+    return results
+
+
+def make_batches(entries: List[tuple], batch_size: int) -> List[List[tuple]]:
+    """Group (index, file_path, jira_id) entries into batches of up to batch_size
+
+    Batch answers are keyed by jira_id, so a batch never holds the same ticket
+    twice; a repeated ticket starts the next batch.
+    """
+    batches = []
+    current = []
+    for entry in entries:
+        if len(current) >= batch_size or any(entry[2] == item[2] for item in current):
+            batches.append(current)
+            current = []
+        current.append(entry)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def run_batch_job(
+    batch: List[tuple],
+    model_config: Dict,
+    output_path: str,
+    backend_name: str,
+    poll_interval: float,
+    should_stop=None,
+) -> tuple:
+    """Judge (file_path, jira_id, jira_story) entries as one Batch API job
+
+    The rendered requests are hashed; a job file in ``output_path`` holding an
+    unfinished job for the same requests is resumed instead of resubmitted.
+    Returns ``{custom_id: (benchmark_output, error)}``, the final job status
+    and the request bodies keyed by custom_id. When ``should_stop()`` ends the
+    polling early, no results are returned and the job file stays unfinished.
+    The caller marks the job ingested once the results are written.
+    """
+    from openai.types import CompletionUsage
+
+    request_config = dict(model_config)
+    if model_config["samples"] > 1:
+        request_config["n"] = model_config["samples"]
+
+    requests = {}
+    for index, (file_path, jira_id, jira_story) in enumerate(batch):
+        messages = generate_messages(
+            jira_story,
+            gherkin_prompt_text(jira_story, load_gherkin_file(file_path), model_config),
+            model_config["prompt_layout"],
+            model_config.get("context"),
+        )
+        request_kwargs, _ = build_judge_request(messages, request_config)
+        requests[f"{index}-{jira_id}"] = request_kwargs
+
+    input_path = os.path.join(output_path, "batch_input.jsonl")
+    input_sha256 = render_batch_file(requests, input_path)
+    backend = get_batch_backend(
+        backend_name,
+        example_output=get_context(model_config.get("context")).coverage_example_output,
+    )
+
+    job = load_job(output_path)
+    if (
+        job
+        and job.get("input_sha256") == input_sha256
+        and job.get("backend") == backend_name
+        and job.get("status") != "ingested"
+    ):
+        logger.info(f"Resuming batch job {job['batch_id']} ({job['status']})")
+    else:
+        batch_id = backend.submit(
+            input_path, metadata={"model": model_config["model"]}
+        )
+        job = {
+            "batch_id": batch_id,
+            "backend": backend_name,
+            "input_sha256": input_sha256,
+            "model": model_config["model"],
+            "submitted_at": datetime.datetime.now().isoformat(),
+            "status": "submitted",
+            "requests": {
+                custom_id: {"file_path": file_path, "jira_id": jira_id}
+                for custom_id, (file_path, jira_id, _) in zip(requests, batch)
+            },
+        }
+        save_job(output_path, job)
+        logger.info(f"Submitted batch job {batch_id} with {len(requests)} requests")
+
+    def record_status(status: Dict) -> None:
+        job["status"] = status["status"]
+        job["request_counts"] = status.get("request_counts")
+        save_job(output_path, job)
+
+    status = wait_for_batch(
+        backend, job["batch_id"], poll_interval, record_status, should_stop
+    )
+    if status["status"] not in TERMINAL_STATUSES:
+        logger.warning(
+            f"Stopped waiting for batch job {job['batch_id']} ({status['status']}); "
+            "rerun to resume it"
+        )
+        return {}, status, requests
+    outputs, errors = collect_batch_results(backend, status)
+
+    analysis_results = {}
+    for custom_id, body in requests.items():
+        entry = outputs.get(custom_id) or errors.get(custom_id) or {}
+        response = entry.get("response") or {}
+        if entry.get("error") or response.get("status_code") != 200:
+            error = entry.get("error") or (response.get("body") or {}).get("error")
+            analysis_results[custom_id] = (
+                None,
+                error or f"No result in batch {status['status']}",
+            )
+            continue
+
+        completion = response["body"]
+        usage = completion.get("usage")
+        cache_mode = model_config["cache_mode"]
+        analysis_result, _ = benchmark_from_response(
+            os.path.basename(job["requests"][custom_id]["file_path"]),
+            llm_response(
+                content=completion["choices"][0]["message"]["content"] or "",
+                choices=[
+                    (choice["message"]["content"] or "").strip()
+                    for choice in completion["choices"]
+                ],
+                usage=CompletionUsage.model_validate(usage) if usage else None,
+                # Seed the response cache so later sync runs reuse batch answers
+                cache_key=compute_cache_key(body) if can_write(cache_mode) else None,
+                structured="response_format" in body,
+                finish_reasons=[
+                    choice.get("finish_reason") for choice in completion["choices"]
+                ],
+            ),
+            model_config,
+        )
+        analysis_result.attempt_number = 1
+        analysis_result.total_attempts = 1
+        analysis_results[custom_id] = (analysis_result, None)
+
+    return analysis_results, status, requests
+
+
+async def analyze_files_batch_api(
+    entries: List[tuple], model_config: Dict, output_path: str
+) -> tuple:
+    """Analyze (file_path, jira_id) entries through a batch job
+
+    Returns the folder summary results in the order of ``entries`` (None for
+    files of a job left running by a stop request) and the final job status.
+    """
+    start_time = datetime.datetime.now()
+    results: List[Optional[Dict]] = [None] * len(entries)
+    batch = []
+    positions = []
+
+    for position, (file_path, jira_id) in enumerate(entries):
+        try:
+            jira_story, failed_result = load_gherkin_inputs(
+                file_path, jira_id, model_config.get("context")
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing file {file_path}: {str(e)}")
+            failed_result = {
+                "file_path": file_path,
+                "jira_id": jira_id,
+                "status": "failed",
+                "error": str(e),
+            }
+        if failed_result:
+            results[position] = failed_result
+        else:
+            batch.append((file_path, jira_id, jira_story))
+            positions.append(position)
+
+    if not batch:
+        return results, None
+
+    loop = asyncio.get_running_loop()
+    analysis_results, status, requests = await loop.run_in_executor(
+        None,
+        functools.partial(
+            run_batch_job,
+            batch,
+            model_config,
+            output_path,
+            model_config["batch_backend"],
+            model_config["poll_interval"],
+            stop_requested,
+        ),
+    )
+    if status["status"] not in TERMINAL_STATUSES:
+        return results, status
+    end_time = datetime.datetime.now()
+
+    for position, custom_id, (file_path, jira_id, jira_story) in zip(
+        positions, requests, batch
+    ):
+        analysis_result, error = analysis_results[custom_id]
+        if error:
+            results[position] = {
+                "file_path": file_path,
+                "jira_id": jira_id,
+                "status": "failed",
+                "error": str(error),
+            }
+            continue
+        try:
+            results[position] = build_file_result(
+                file_path,
+                jira_id,
+                jira_story,
+                analysis_result,
+                start_time,
+                end_time,
+                model_config,
+                output_path,
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing file {file_path}: {str(e)}")
+            results[position] = {
+                "file_path": file_path,
+                "jira_id": jira_id,
+                "status": "failed",
+                "error": str(e),
+            }
+
+    # Only now are the reports and manifest rows written: a crash before this
+    # point resumes the finished job instead of submitting it again
+    job = load_job(output_path)
+    if job:
+        job["status"] = "ingested"
+        save_job(output_path, job)
+    return results, status
+
+
+def build_static_result(
+    file_path: str,
+    jira_id: str,
+    jira_story: Dict,
+    score,
+    model_config: Dict,
+    output_path: Optional[str] = None,
+) -> Dict:
+    """Report a file skipped by static triage with the static estimate as its result"""
+    now = datetime.datetime.now()
+    analysis_result = benchmark_output(
+        gherkin_id=os.path.basename(file_path),
+        average_coverage_percentage=score.coverage_percentage,
+        generation_time_seconds=0.0,
+        generated_output_count=1,
+        coverage_analysis=[
+            coverage_analysis(
+                coverage_percentage=score.coverage_percentage,
+                covered=score.covered,
+                gaps=score.uncovered,
+                recommendations=[],
+            )
+        ],
+        status="completed",
+        attempt_number=1,
+        total_attempts=1,
+        triage={"action": "skip"},
+    )
+    return build_file_result(
+        file_path, jira_id, jira_story, analysis_result, now, now, model_config, output_path
+    )
+
+
+def summarize_static_triage(results: List[Dict], model_config: Dict) -> Optional[Dict]:
+    """Triage counts and agreement between static estimates and the judge"""
+    if model_config["static_triage"] == "off":
+        return None
+    actions = [
+        (result.get("triage") or {}).get("action") for result in results if result
+    ]
+    return {
+        "mode": model_config["static_triage"],
+        "threshold": model_config["triage_threshold"],
+        "triage_model": model_config["triage_model"],
+        "scored_files": len([result for result in results if result and result.get("static_score")]),
+        "skipped": actions.count("skip"),
+        "downtiered": actions.count("downtier"),
+        "agreement": summarize_static_agreement(results, STATIC_DISAGREEMENT),
+    }
+
+
+def summarize_scenario_retrieval(
+    results: List[Dict], model_config: Dict, index_stats: Optional[Dict]
+) -> Optional[Dict]:
+    """Gherkin token savings, unmatched criteria and the full-file comparison"""
+    if not model_config["scenario_budget"]:
+        return None
+    retrievals = [result["retrieval"] for result in results if result and result.get("retrieval")]
+    trimmed = [retrieval for retrieval in retrievals if retrieval["trimmed"]]
+    comparisons = [
+        retrieval["comparison"]
+        for retrieval in trimmed
+        if retrieval.get("comparison", {}).get("status") == "completed"
+    ]
+
+    summary = {
+        "budget": model_config["scenario_budget"],
+        "index": index_stats,
+        "files": len(retrievals),
+        "trimmed_files": len(trimmed),
+        "gherkin_tokens": sum(retrieval["selected_tokens"] for retrieval in retrievals),
+        "full_gherkin_tokens": sum(retrieval["full_tokens"] for retrieval in retrievals),
+        "files_with_unmatched_criteria": len(
+            [retrieval for retrieval in retrievals if retrieval["unmatched_criteria"]]
+        ),
+        "comparison": None,
+    }
+    if comparisons:
+        differences = [
+            abs(comparison["coverage_percentage"] - comparison["full_coverage_percentage"])
+            for comparison in comparisons
+        ]
+        summary["comparison"] = {
+            "files": len(comparisons),
+            "mean_absolute_difference": sum(differences) / len(differences),
+            "max_difference": max(differences),
+            **{
+                key: sum(comparison[key] for comparison in comparisons)
+                for key in ("prompt_tokens", "full_prompt_tokens", "seconds", "full_seconds")
+            },
+        }
+    return summary
+
+
+def summarize_cascade(results: List[Dict], models: List[str]) -> Optional[Dict]:
+    """Per-tier calls, tokens and escalations of a cascade run"""
+    if not models:
+        return None
+
+    counted = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens")
+    tiers = {
+        model: dict(model=model, files_judged=0, files_final=0, **dict.fromkeys(counted, 0))
+        for model in models
+    }
+    escalations: Dict[str, int] = {}
+
+    for result in results:
+        cascade = result.get("cascade") if result else None
+        if not cascade:
+            continue
+        for tier_usage in cascade["tiers"]:
+            tier = tiers[tier_usage["model"]]
+            tier["files_judged"] += 1
+            for key in counted:
+                tier[key] += tier_usage[key]
+        tiers[cascade["final_model"]]["files_final"] += 1
+        for escalation in cascade["escalations"]:
+            key = f"{escalation['from']}:{escalation['reason']}"
+            escalations[key] = escalations.get(key, 0) + 1
+
+    return {"tiers": list(tiers.values()), "escalations": escalations}
+
+
+# Set by SIGINT/SIGTERM: judge calls in flight finish, no new ones start
+_stop_requested = threading.Event()
+_stop_signal: Optional[int] = None
+
+
+def stop_requested() -> bool:
+    return _stop_requested.is_set()
+
+
+def install_stop_handlers(loop: asyncio.AbstractEventLoop) -> None:
+    """Drain on the first SIGINT/SIGTERM; a second one aborts as usual"""
+
+    def handle(signum: int) -> None:
+        global _stop_signal
+        _stop_signal = signum
+        _stop_requested.set()
+        loop.remove_signal_handler(signum)
+        logger.warning(
+            f"{signal.Signals(signum).name} received: finishing the judge calls in flight, "
+            "then exiting (send it again to abort)"
+        )
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, handle, signum)
+        except (NotImplementedError, RuntimeError):
+            # Not supported on this platform or outside the main thread
+            pass
+
+
+def save_folder_summary(
+    summary: Dict,
+    output_path: Optional[str] = None,
+    prefix: str = "folder_coverage_summary",
+) -> str:
+    """Write a folder summary as ``<prefix>_<timestamp>.json``"""
+    output_dir = output_path or COVERAGE_REPORT_BASE_PATH
+    # Directory should already exist from configuration setup
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_file = os.path.join(output_dir, f"{prefix}_{timestamp}.json")
+
+    try:
+        with open(summary_file, "w") as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Saved summary report to: {summary_file}")
+        return summary_file
+    except PermissionError:
+        logger.error(f"Permission denied writing summary to {summary_file}")
+        raise
+    except OSError as e:
+        logger.error(f"Error writing summary report to {summary_file}: {str(e)}")
+        raise
+
+
+async def analyze_folder(
+    config: Dict, slot=None, executor: Optional[ThreadPoolExecutor] = None
+) -> Dict:
+    """Analyze all Gherkin files in the specified folder
+
+    ``slot`` (an async context manager, by default a semaphore of
+    ``concurrency``) is held around each judge call, and blocking calls run on
+    ``executor``; the sweep passes shared ones so several folders share one
+    concurrency budget.
+    """
     folder_path = config["folder_path"]
     output_path = config["output_path"]
     file_pattern = config["file_pattern"]
     recursive = config["recursive"]
     jira_mapping_file = config["jira_mapping_file"]
+    concurrency = max(1, config.get("concurrency") or 1)
 
     # Get model configuration
     model_config = get_model_config(config)
@@ -537,6 +1594,7 @@ async def analyze_folder(config: Dict) -> Dict:
     logger.info(f"Starting folder analysis for: {folder_path}")
     logger.info(f"Output directory: {output_path}")
     logger.info(f"Model configuration: {model_config}")
+    logger.info(f"Concurrency: {concurrency}")
 
     # Load JIRA mapping if provided
     jira_mapping = {}
@@ -556,33 +1614,83 @@ async def analyze_folder(config: Dict) -> Dict:
             "results": [],
         }
 
-    # Build cache directly from existing benchmark reports (ignore .analysis_cache files)
-    # This is simpler and more reliable - we just check all benchmark_result_*.json files
-    cache = bootstrap_cache_from_reports(
-        gherkin_files, output_path, model_config["model"]
-    )
-
-    if cache:
-        logger.info(
-            f"Loaded {len(cache)} completed analyses from existing reports"
-        )
+    # Sharding: keep this host's part of the folder. Files are assigned by
+    # Jira ID (the file name without one), so a story's files stay together.
+    shard = config.get("shard")
+    if shard:
+        shard_index, shard_count = shard
+        gherkin_files = [
+            file_path
+            for file_path in gherkin_files
+            if shard_of(
+                get_jira_id_for_file(file_path, jira_mapping)
+                or os.path.basename(file_path),
+                shard_count,
+            )
+            == shard_index
+        ]
+        logger.info(f"Shard {shard_index}/{shard_count}: {len(gherkin_files)} files")
+
+    # Completed judgments come from the run manifest: one indexed lookup per
+    # file instead of reading every benchmark report in the output folder
+    manifest = get_run_manifest(output_path)
+    if not len(manifest) and glob.glob(os.path.join(output_path, "benchmark_result_*.json")):
+        logger.info(f"Building the run manifest from the existing reports in {output_path}")
+        rebuild_manifest(gherkin_files, output_path, model_config.get("context"))
+    # Cascades and the Batch API judge one file per prompt; the batch size is
+    # part of the judge settings, so it must be the one actually used
+    if model_config["cascade_models"] and (
+        model_config["batch_size"] > 1 or model_config["mode"] == "batch"
+    ):
+        logger.warning("--batch-size and --mode batch are ignored with --cascade")
+        model_config = dict(model_config, batch_size=1)
+    elif model_config["mode"] == "batch" and model_config["batch_size"] > 1:
+        logger.warning("--batch-size is ignored in batch mode")
+        model_config = dict(model_config, batch_size=1)
+    judge_config_key = config_key(model_config)
+    # Files whose inputs were judged before, changed since, or never judged
+    input_changes = {"reused": 0, "changed": 0, "new": 0}
+    input_change_of: Dict[str, str] = {}
+
+    # Progress journal: every finished file is appended as it completes, so
+    # --resume can continue an interrupted run from the journal alone
+    journal = progress_journal(journal_path(output_path, shard))
+    run_key = {
+        "folder_path": os.path.abspath(folder_path),
+        "file_pattern": file_pattern,
+        "model": model_config["model"],
+        "config_key": judge_config_key,
+        "shard": list(shard) if shard else None,
+    }
+    if config.get("resume"):
+        replayed = journal.resume(run_key)
+    else:
+        journal.start(run_key)
+        replayed = {}
 
     cache_hits = 0
 
-    # Analyze each file
-    results = []
+    # Analyze each file. Results keep the order of gherkin_files: files that
+    # need an LLM call reserve a slot and are filled in once the pool drains.
+    results: List[Optional[Dict]] = []
+    pending: Dict[int, str] = {}
     analyzed_count = 0
 
     for file_path in gherkin_files:
-        # logger.debug(f"file_path: {file_path}")
-        try:
-            file_mod_time = os.path.getmtime(file_path)
-        except OSError as exc:
-            logger.warning(
-                f"Unable to read modified time for {file_path}; will re-analyze. Error: {exc}"
-            )
-            file_mod_time = None
+        # Finished before the interruption this run resumes
+        event = replayed.get(file_path)
+        if event is not None:
+            result = event["result"]
+            results.append(result)
+            if result["status"] != "skipped":
+                analyzed_count += 1
+            if result["status"] == "cached":
+                cache_hits += 1
+            if event.get("input_change") in input_changes:
+                input_changes[event["input_change"]] += 1
+            continue
 
+        # logger.debug(f"file_path: {file_path}")
         # Get JIRA ID for this file
         jira_id = get_jira_id_for_file(file_path, jira_mapping)
 
@@ -596,50 +1704,237 @@ async def analyze_folder(config: Dict) -> Dict:
                     "error": "Could not determine JIRA ID",
                 }
             )
+            journal.record(results[-1])
             continue
 
-        cache_entry = cache.get(file_path)
-
-        # Check if we already have a completed analysis from benchmark reports
-        # We trust the benchmark reports since they're the source of truth
-        can_use_cache = (
-            cache_entry
-            and cache_entry.get("status") == "completed"
-            and cache_entry.get("jira_id") == jira_id
+        # Latest completed judgment of these inputs with these judge settings
+        jira_story = get_jira_story_by_id(jira_id, model_config.get("context"))
+        manifest_result = manifest.lookup(
+            judgment_input_hash(file_path, jira_story, model_config.get("context")),
+            jira_id,
+            judge_config_key,
         )
 
-        if can_use_cache:
+        if manifest_result is not None:
             logger.info(f"Skipping already analyzed file (cache hit): {file_path}")
-            cached_result = copy.deepcopy(cache_entry.get("result", {}))
-            if not cached_result:
-                cached_result = {
-                    "file_path": file_path,
-                    "jira_id": jira_id,
-                    "status": "cached",
-                }
-            cached_result["status"] = "cached"
-            cached_result["cache_hit"] = True
-            cached_result.setdefault("file_path", file_path)
-            cached_result.setdefault("jira_id", jira_id)
-            cached_result.setdefault("model_used", model_config["model"])
+            cached_result = mark_cached(manifest_result, file_path, jira_id, model_config)
             results.append(cached_result)
             analyzed_count += 1
             cache_hits += 1
+            input_changes["reused"] += 1
+            journal.record(cached_result, "reused")
             continue
 
-        # Analyze the file
-        result = await analyze_gherkin_file(
-            file_path, jira_id, model_config, output_path
-        )
+        # An earlier judgment of this story means its file, story or prompts changed
+        change = "changed" if manifest.has_judgment(jira_id, judge_config_key) else "new"
+        input_changes[change] += 1
+        input_change_of[file_path] = change
+
+        pending[len(results)] = jira_id
+        results.append(None)
+
+    # Static triage: score every file that needs a judge; clearly complete
+    # files skip the judge or go to the cheaper triage model
+    static_scores = {}
+    triage = {}
+
+    def annotate(index: int, result: Optional[Dict], judged: bool = False) -> Optional[Dict]:
+        """Attach the static score, triage decision and scenario selection to
+        ``result`` before it is journalled, so a resumed run replays them too"""
+        if not result:
+            return result
+        if index in static_scores:
+            result["static_score"] = static_scores[index].to_dict()
+            if index in triage:
+                result["triage"] = {
+                    key: value for key, value in triage[index].items() if key != "jira_id"
+                }
+        if judged and model_config["scenario_budget"]:
+            jira_story = get_jira_story_by_id(result["jira_id"], model_config.get("context"))
+            document = load_gherkin_file(gherkin_files[index])
+            if jira_story and document.is_valid:
+                result["retrieval"] = dict(
+                    select_scenarios(
+                        jira_story, document, model_config["scenario_budget"]
+                    ).to_dict(),
+                    **result.get("retrieval", {}),
+                )
+        return result
 
-        if result:
-            results.append(result)
-            if result["status"] != "failed":
+    if model_config["static_triage"] != "off":
+        for index, jira_id in list(pending.items()):
+            jira_story = get_jira_story_by_id(jira_id, model_config.get("context"))
+            document = load_gherkin_file(gherkin_files[index])
+            if not jira_story or not document.is_valid:
+                continue
+            score = score_document(jira_story, document)
+            static_scores[index] = score
+            action = triage_action(
+                score, model_config["static_triage"], model_config["triage_threshold"]
+            )
+            if action == "skip":
+                del pending[index]
+                triage[index] = {"action": "skip"}
+                results[index] = build_static_result(
+                    gherkin_files[index],
+                    jira_id,
+                    jira_story,
+                    score,
+                    model_config,
+                    output_path,
+                )
+                annotate(index, results[index])
+                journal.record(results[index], input_change_of.get(gherkin_files[index]))
                 analyzed_count += 1
+            elif action == "downtier":
+                decision = {"action": "downtier", "model": model_config["triage_model"]}
+                # Judged by the triage model before: reuse that judgment
+                manifest_result = manifest.lookup(
+                    judgment_input_hash(
+                        gherkin_files[index], jira_story, model_config.get("context")
+                    ),
+                    jira_id,
+                    config_key(judge_config_of(model_config, decision)),
+                )
+                if manifest_result is not None:
+                    del pending[index]
+                    triage[index] = decision
+                    results[index] = mark_cached(
+                        manifest_result, gherkin_files[index], jira_id, model_config
+                    )
+                    analyzed_count += 1
+                    cache_hits += 1
+                    input_changes[input_change_of[gherkin_files[index]]] -= 1
+                    input_changes["reused"] += 1
+                    input_change_of[gherkin_files[index]] = "reused"
+                    annotate(index, results[index])
+                    journal.record(results[index], "reused")
+                    continue
+                triage[index] = dict(decision, jira_id=pending.pop(index))
+        if triage:
+            logger.info(
+                f"Static triage ({model_config['static_triage']}): {len(triage)} files at or above {model_config['triage_threshold']}%"
+            )
 
-        if os.getenv("DEBUG"):
-            logger.debug(f"Analysis result for {file_path}: {result}")
-            # break
+    downtiered = {
+        index: entry["jira_id"]
+        for index, entry in triage.items()
+        if entry["action"] == "downtier" and "jira_id" in entry
+    }
+
+    # Scenario retrieval: index the folder once (persisted next to the reports)
+    index_stats = None
+    if model_config["scenario_budget"] and (pending or downtiered):
+        index_stats = index_gherkin_files(
+            gherkin_files, os.path.join(output_path, INDEX_FILE_NAME)
+        )
+        logger.info(f"Scenario index: {index_stats}")
+
+    batch_job_status = None
+    not_started = 0
+    if pending or downtiered:
+        semaphore = slot or asyncio.Semaphore(concurrency)
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+        batch_size = model_config["batch_size"]
+
+        async def run_analysis(
+            index: int, jira_id: str, judge_model: Optional[str] = None
+        ) -> Optional[Dict]:
+            file_path = gherkin_files[index]
+            nonlocal not_started
+            async with semaphore:
+                if stop_requested():
+                    not_started += 1
+                    return None
+                result = await analyze_gherkin_file(
+                    file_path, jira_id, model_config, output_path, executor, judge_model
+                )
+            annotate(index, result, judged=True)
+            journal.record(result, input_change_of.get(file_path))
+            if os.getenv("DEBUG"):
+                logger.debug(f"Analysis result for {file_path}: {result}")
+            return result
+
+        async def run_batch(batch: List[tuple]) -> List[Optional[Dict]]:
+            nonlocal not_started
+            async with semaphore:
+                if stop_requested():
+                    not_started += len(batch)
+                    return [None] * len(batch)
+                batch_results = await analyze_gherkin_batch(
+                    [(gherkin_files[index], jira_id) for index, _, jira_id in batch],
+                    model_config,
+                    output_path,
+                    executor,
+                )
+            for (index, file_path, _), result in zip(batch, batch_results):
+                annotate(index, result, judged=True)
+                journal.record(result, input_change_of.get(file_path))
+            return batch_results
+
+        # Down-tiered files are judged alongside the pending ones
+        downtier_results = asyncio.gather(
+            *(
+                run_analysis(index, jira_id, model_config["triage_model"])
+                for index, jira_id in downtiered.items()
+            )
+        )
+        try:
+            if not pending:
+                analyzed = []
+            elif model_config["mode"] == "batch" and not model_config["cascade_models"]:
+                analyzed, batch_job_status = await analyze_files_batch_api(
+                    [(gherkin_files[index], jira_id) for index, jira_id in pending.items()],
+                    model_config,
+                    output_path,
+                )
+                for index, result in zip(pending, analyzed):
+                    if result is None:
+                        not_started += 1
+                        continue
+                    annotate(index, result, judged=True)
+                    journal.record(result, input_change_of.get(gherkin_files[index]))
+            elif batch_size > 1:
+                batches = make_batches(
+                    [
+                        (index, gherkin_files[index], jira_id)
+                        for index, jira_id in pending.items()
+                    ],
+                    batch_size,
+                )
+                logger.info(
+                    f"Judging {len(pending)} files in {len(batches)} batches of up to {batch_size}"
+                )
+                batch_results = await asyncio.gather(
+                    *(run_batch(batch) for batch in batches)
+                )
+                analyzed = [
+                    result for batch_result in batch_results for result in batch_result
+                ]
+            else:
+                analyzed = await asyncio.gather(
+                    *(
+                        run_analysis(index, jira_id)
+                        for index, jira_id in pending.items()
+                    )
+                )
+            analyzed = list(analyzed) + list(await downtier_results)
+        finally:
+            # When judging the pending files failed, stop the down-tiered ones
+            # and collect their outcome before the executor goes away
+            downtier_results.cancel()
+            await asyncio.gather(downtier_results, return_exceptions=True)
+            if own_executor:
+                executor.shutdown(wait=True)
+
+        for index, result in zip(list(pending) + list(downtiered), analyzed):
+            results[index] = result
+            if result and result["status"] != "failed":
+                analyzed_count += 1
+
+    results = [result for result in results if result]
 
     # Generate summary report
     summary = {
@@ -652,14 +1947,53 @@ async def analyze_folder(config: Dict) -> Dict:
         "failed_files": len([r for r in results if r["status"] == "failed"]),
         "skipped_files": len([r for r in results if r["status"] == "skipped"]),
         "cache_hits": cache_hits,
+        "input_changes": input_changes,
         "average_coverage": 0,
         "model_config": {
             "model": model_config["model"],
             "temperature": model_config["temperature"],
             "max_tokens": model_config["max_tokens"],
+            "reasoning_effort": model_config["reasoning_effort"],
+            "prompt_layout": model_config["prompt_layout"],
+            "structured_output": model_config["structured_output"],
+            "samples": model_config["samples"],
+            "sampling_mode": model_config["sampling_mode"],
+            "sample_reducer": model_config["sample_reducer"],
+            "batch_size": model_config["batch_size"],
+            "mode": model_config["mode"],
+            "truncation_strategy": model_config["truncation_strategy"],
+            "json_repair": model_config["json_repair"],
+            "json_repair_model": model_config["json_repair_model"],
+            "static_triage": model_config["static_triage"],
+            "triage_threshold": model_config["triage_threshold"],
+            "scenario_budget": model_config["scenario_budget"],
             "framework": "analyze_gherkin_folder",
             "device": os.getenv("DEVICE", "Unknown"),
         },
+        "http_pool": get_pool_stats(),
+        "rate_limits": get_rate_limit_stats(),
+        "response_cache": get_cache_stats(),
+        "judge_stats": get_judge_stats(),
+        "gherkin_cache": get_gherkin_cache_stats(),
+        "run_manifest": manifest.summary(),
+        "progress_journal": journal.summary(),
+        "batch_job": batch_job_status,
+        "cascade": summarize_cascade(results, model_config["cascade_models"]),
+        "static_triage": summarize_static_triage(results, model_config),
+        "scenario_retrieval": summarize_scenario_retrieval(
+            results, model_config, index_stats
+        ),
+        "shard": (
+            {
+                "index": shard[0],
+                "count": shard[1],
+                "files": len(gherkin_files),
+                # Full settings, so the merge can recompute the derived sections
+                "model_config": model_config,
+            }
+            if shard
+            else None
+        ),
         "results": results,
     }
 
@@ -673,29 +2007,33 @@ async def analyze_folder(config: Dict) -> Dict:
         total_coverage = sum(r["coverage_percentage"] for r in successful_results)
         summary["average_coverage"] = total_coverage / len(successful_results)
 
-    # Save summary report only if there were new analyses (not all cache hits)
-    new_analyses = analyzed_count - cache_hits
-    if new_analyses > 0:
-        output_dir = output_path or COVERAGE_REPORT_BASE_PATH
-        # Directory should already exist from configuration setup
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        summary_file = os.path.join(output_dir, f"folder_coverage_summary_{timestamp}.json")
+    # Interrupted: the journal holds what finished; no partial summary is
+    # written, so the next summary (after --resume) covers the whole run
+    if not_started:
+        journal.close()
+        logger.warning(
+            f"Interrupted with {not_started} files not judged; rerun with --resume to continue"
+        )
+        summary["interrupted"] = True
+        return summary
 
-        try:
-            with open(summary_file, "w") as f:
-                json.dump(summary, f, indent=2)
-            logger.info(f"Saved summary report to: {summary_file}")
-        except PermissionError:
-            logger.error(f"Permission denied writing summary to {summary_file}")
-            raise
-        except OSError as e:
-            logger.error(f"Error writing summary report to {summary_file}: {str(e)}")
-            raise
+    # Save summary report only if files were judged or failed (not all cache
+    # hits): a round where every file failed still counts as an attempt.
+    # A shard always writes its partial summary: the merge needs every shard.
+    new_analyses = analyzed_count - cache_hits
+    summary_file = None
+    if shard:
+        summary_file = save_folder_summary(
+            summary, output_path, f"shard_summary_{shard[0]}of{shard[1]}"
+        )
+    elif new_analyses > 0 or summary["failed_files"] > 0:
+        summary_file = save_folder_summary(summary, output_path)
     else:
         logger.info(f"All {cache_hits} files were cache hits - skipping summary file creation")
+    journal.finish(summary_file)
 
     # Note: We no longer maintain .analysis_cache files
-    # Instead, we always rebuild from benchmark_result_*.json files which is more reliable
+    # Completed judgments are indexed in the run manifest as reports are written
 
     return summary
 
@@ -710,8 +2048,22 @@ async def main():
 
         logger.info(f"Configuration: {config}")
 
-        # Analyze the folder
+        if config["rebuild_manifest"]:
+            gherkin_files = find_gherkin_files(
+                config["folder_path"], config["file_pattern"], config["recursive"]
+            )
+            recorded = rebuild_manifest(gherkin_files, config["output_path"])
+            logger.info(
+                f"Run manifest {get_run_manifest(config['output_path']).path}: "
+                f"{recorded} reports recorded"
+            )
+            return
+
+        # Analyze the folder; SIGINT/SIGTERM drain the judge calls in flight
+        install_stop_handlers(asyncio.get_running_loop())
         summary = await analyze_folder(config)
+        if summary.get("interrupted"):
+            sys.exit(128 + (_stop_signal or signal.SIGINT))
 
         # Print summary
         logger.info("=== Analysis Summary ===")
@@ -720,7 +2072,17 @@ async def main():
         logger.info(f"Failed files: {summary['failed_files']}")
         logger.info(f"Skipped files: {summary['skipped_files']}")
         logger.info(f"Cache hits: {summary['cache_hits']}")
+        if "input_changes" in summary:
+            logger.info(
+                "Inputs reused/changed/new: {reused}/{changed}/{new}".format(
+                    **summary["input_changes"]
+                )
+            )
         logger.info(f"Average coverage: {summary['average_coverage']:.2f}%")
+        logger.info(
+            f"HTTP connections opened/reused: {summary['http_pool']['connections_opened']}"
+            f"/{summary['http_pool']['connections_reused']}"
+        )
 
         if summary["analyzed_files"] > 0:
             logger.info("Coverage analysis completed successfully")
@@ -0,0 +1,318 @@
+"""
+Offline judging through the OpenAI Batch API.
+
+``analyze_gherkin_folder.py --mode batch`` renders every judge request into a
+JSONL file, submits it as one batch job and polls until the job finishes. The
+job ID and the mapping from request IDs to Gherkin files are kept in a job
+file in the output folder, so an interrupted run resumes polling the same job
+instead of submitting (and paying for) it again.
+
+Backends:
+
+- ``openai``: the provider's Files and Batches API
+- ``local``: a file-based stand-in that keeps jobs in a spool directory and
+  answers each request with the configured example output (``example``
+  responder, no network) or by sending it to the chat completions endpoint
+  one request at a time (``live`` responder)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+from coverage_config import BATCH_LOCAL_DIR, BATCH_LOCAL_RESPONDER
+from llm_client import get_openai_client
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+BATCH_BACKENDS = ("openai", "local")
+LOCAL_RESPONDERS = ("example", "live")
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+JOB_FILE_NAME = ".batch_job.json"
+
+
+def render_batch_file(requests: Dict[str, Dict], path: str) -> str:
+    """Write ``{custom_id: request body}`` as a batch input file; returns its SHA-256."""
+    digest = hashlib.sha256()
+    with open(path, "w", encoding="utf-8") as batch_file:
+        for custom_id, body in requests.items():
+            line = json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": COMPLETIONS_ENDPOINT,
+                    "body": body,
+                },
+                ensure_ascii=False,
+                sort_keys=True,
+            )
+            batch_file.write(line + "\n")
+            digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_batch_output(text: Optional[str]) -> Dict[str, Dict]:
+    """Index the lines of a batch output or error file by custom_id."""
+    lines = {}
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            logger.warning(f"Skipping malformed batch output line: {line[:120]}")
+            continue
+        lines[entry.get("custom_id")] = entry
+    return lines
+
+
+def job_file_path(output_path: str) -> str:
+    return os.path.join(output_path, JOB_FILE_NAME)
+
+
+def load_job(output_path: str) -> Optional[Dict]:
+    """The batch job recorded for ``output_path``, or None."""
+    path = job_file_path(output_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as job_file:
+            return json.load(job_file)
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Ignoring unreadable batch job file {path}: {exc}")
+        return None
+
+
+def save_job(output_path: str, job: Dict) -> None:
+    """Atomically write the job file so a crash never leaves it half written."""
+    path = job_file_path(output_path)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as job_file:
+        json.dump(job, job_file, indent=2)
+    os.replace(temp_path, path)
+
+
+class openai_batch_backend:
+    """Batch jobs on the provider's /v1/batches endpoint."""
+
+    name = "openai"
+
+    def __init__(self, client=None):
+        self.client = client or get_openai_client()
+
+    def submit(self, input_path: str, metadata: Optional[Dict] = None) -> str:
+        with open(input_path, "rb") as input_file:
+            uploaded = self.client.files.create(file=input_file, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=COMPLETIONS_ENDPOINT,
+            completion_window="24h",
+            metadata=metadata,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> Dict:
+        batch = self.client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        return {
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+            "request_counts": counts.to_dict() if counts else None,
+        }
+
+    def download(self, file_id: str) -> str:
+        return self.client.files.content(file_id).text
+
+
+def example_responder(example_output) -> Callable[[Dict], Dict]:
+    """Answer every request with the example judge output, without any network."""
+    content = json.dumps(example_output)
+
+    def respond(body: Dict) -> Dict:
+        prompt_tokens = sum(
+            len(message.get("content") or "") // 4 for message in body["messages"]
+        )
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-local-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [
+                {
+                    "index": index,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+                for index in range(body.get("n") or 1)
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return respond
+
+
+def live_responder(body: Dict) -> Dict:
+    """Send the request to the configured chat completions endpoint."""
+    return get_openai_client().chat.completions.create(**body).model_dump()
+
+
+class local_batch_backend:
+    """File-based stand-in for the Batch API.
+
+    Each job is a directory under ``spool_dir`` holding the input file, a
+    state file and, once processed, the output and error files. A job is
+    processed on the second status poll, so callers go through the same
+    submit/poll/download cycle as with the real endpoint.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        respond: Callable[[Dict], Dict],
+        spool_dir: str = BATCH_LOCAL_DIR,
+    ):
+        self.respond = respond
+        self.spool_dir = spool_dir
+
+    def _job_dir(self, batch_id: str) -> str:
+        return os.path.join(self.spool_dir, batch_id)
+
+    def _read_state(self, batch_id: str) -> Dict:
+        with open(os.path.join(self._job_dir(batch_id), "state.json"), "r") as f:
+            return json.load(f)
+
+    def _write_state(self, batch_id: str, state: Dict) -> None:
+        with open(os.path.join(self._job_dir(batch_id), "state.json"), "w") as f:
+            json.dump(state, f, indent=2)
+
+    def submit(self, input_path: str, metadata: Optional[Dict] = None) -> str:
+        batch_id = f"batch_local_{uuid.uuid4().hex}"
+        job_dir = self._job_dir(batch_id)
+        os.makedirs(job_dir, exist_ok=True)
+        with open(input_path, "r", encoding="utf-8") as source, open(
+            os.path.join(job_dir, "input.jsonl"), "w", encoding="utf-8"
+        ) as target:
+            target.write(source.read())
+        self._write_state(batch_id, {"status": "validating", "metadata": metadata})
+        return batch_id
+
+    def status(self, batch_id: str) -> Dict:
+        state = self._read_state(batch_id)
+        if state["status"] == "validating":
+            state["status"] = "in_progress"
+            self._write_state(batch_id, state)
+        elif state["status"] == "in_progress":
+            state.update(self._process(batch_id))
+            self._write_state(batch_id, state)
+        return state
+
+    def _process(self, batch_id: str) -> Dict:
+        job_dir = self._job_dir(batch_id)
+        completed = failed = 0
+        with open(os.path.join(job_dir, "input.jsonl"), "r", encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+
+        with open(
+            os.path.join(job_dir, "output.jsonl"), "w", encoding="utf-8"
+        ) as output_file, open(
+            os.path.join(job_dir, "errors.jsonl"), "w", encoding="utf-8"
+        ) as error_file:
+            for position, request in enumerate(requests):
+                line = {"id": f"batch_req_{position}", "custom_id": request["custom_id"]}
+                try:
+                    line["response"] = {
+                        "status_code": 200,
+                        "body": self.respond(request["body"]),
+                    }
+                    line["error"] = None
+                    output_file.write(json.dumps(line) + "\n")
+                    completed += 1
+                except Exception as exc:
+                    line["response"] = None
+                    line["error"] = {"code": type(exc).__name__, "message": str(exc)}
+                    error_file.write(json.dumps(line) + "\n")
+                    failed += 1
+
+        return {
+            "status": "completed",
+            "output_file_id": os.path.join(job_dir, "output.jsonl"),
+            "error_file_id": os.path.join(job_dir, "errors.jsonl") if failed else None,
+            "request_counts": {
+                "total": len(requests),
+                "completed": completed,
+                "failed": failed,
+            },
+        }
+
+    def download(self, file_id: str) -> str:
+        with open(file_id, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+def get_batch_backend(
+    name: str, example_output=None, responder: str = BATCH_LOCAL_RESPONDER
+):
+    """Create the batch backend ``name``; the local one needs a responder."""
+    if name == "openai":
+        return openai_batch_backend()
+    if name == "local":
+        if responder == "live":
+            return local_batch_backend(live_responder)
+        return local_batch_backend(example_responder(example_output))
+    raise ValueError(f"Unknown batch backend: {name} (expected one of {BATCH_BACKENDS})")
+
+
+def wait_for_batch(
+    backend,
+    batch_id: str,
+    poll_interval: float,
+    on_status=None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict:
+    """Poll ``batch_id`` until it reaches a terminal status.
+
+    Returns the last, non-terminal status as soon as ``should_stop()`` is
+    true; the job keeps running and its job file can be resumed later.
+    """
+    while True:
+        status = backend.status(batch_id)
+        if on_status:
+            on_status(status)
+        logger.info(
+            f"Batch {batch_id}: {status['status']} {status.get('request_counts') or ''}"
+        )
+        if status["status"] in TERMINAL_STATUSES:
+            return status
+        deadline = time.monotonic() + poll_interval
+        while True:
+            if should_stop and should_stop():
+                return status
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 1.0))
+
+
+def collect_batch_results(backend, status: Dict) -> Tuple[Dict, Dict]:
+    """Download the output and error files of a finished job, indexed by custom_id."""
+    outputs = {}
+    errors = {}
+    if status.get("output_file_id"):
+        outputs = parse_batch_output(backend.download(status["output_file_id"]))
+    if status.get("error_file_id"):
+        errors = parse_batch_output(backend.download(status["error_file_id"]))
+    return outputs, errors
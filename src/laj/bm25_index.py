@@ -0,0 +1,387 @@
+"""
+BM25 index linking acceptance criteria to Gherkin scenarios.
+
+Every scenario of a parsed feature file is one entry of an inverted index
+(term -> scenario -> term frequency). The index is built once per folder,
+kept next to the reports and reloaded on the next run; only files whose
+content hash is not indexed yet are added.
+
+For a long feature file, the criteria extracted from the story
+(``static_scorer.extract_criteria``) are used as BM25 queries against the
+file's scenarios. The best scenario of each criterion is taken first, then
+the rest by total relevance, until the token budget is used up. The judge gets
+the feature header and background plus the selected scenarios in file order.
+Criteria that match no scenario at all are reported as well.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from coverage_config import JIRA_STORY_PATH
+from gherkin_parser import gherkin_document, load_gherkin_file
+from rate_limiter import CHARS_PER_TOKEN
+from static_scorer import extract_criteria
+from story_store import memory_story_store
+
+INDEX_FILE_NAME = ".bm25_index.json"
+INDEX_VERSION = 1
+
+# Standard BM25 parameters: term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from given has have i in is it of on or "
+    "should that the then this to when with".split()
+)
+
+_CAMEL_CASE = re.compile(r"([a-z0-9])([A-Z])")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens, with camelCase split and stop words dropped"""
+    return [
+        token
+        for token in _TOKEN.findall(_CAMEL_CASE.sub(r"\1 \2", text or "").lower())
+        if token not in STOP_WORDS
+    ]
+
+
+def scenario_texts(document: gherkin_document) -> List[str]:
+    """Source text of each scenario, including its tags and examples"""
+    lines = document.text.splitlines()
+    return [
+        "\n".join(lines[scenario.start_line - 1 : scenario.end_line])
+        for scenario in document.scenarios
+    ]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+class bm25_index:
+    """Inverted index over the scenarios of many feature files.
+
+    Entries are keyed ``<content hash>:<scenario position>``, so a file is
+    indexed once per content and an edited file gets new entries.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.documents: Dict[str, int] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.documents
+
+    def _add_entries(self, content_hash: str, term_counts: List[Dict[str, int]]) -> None:
+        for position, counts in enumerate(term_counts):
+            key = f"{content_hash}:{position}"
+            for term, count in counts.items():
+                self.postings.setdefault(term, {})[key] = count
+            length = sum(counts.values())
+            self.lengths[key] = length
+            self.total_length += length
+        self.documents[content_hash] = len(term_counts)
+
+    def add_document(self, document: gherkin_document) -> bool:
+        """Index the scenarios of ``document``; False if already indexed."""
+        if document.content_hash in self.documents:
+            return False
+        term_counts = [dict(Counter(tokenize(text))) for text in scenario_texts(document)]
+        with self._lock:
+            if document.content_hash in self.documents:
+                return False
+            self._add_entries(document.content_hash, term_counts)
+        return True
+
+    def remove_document(self, content_hash: str) -> None:
+        with self._lock:
+            count = self.documents.pop(content_hash, 0)
+            for position in range(count):
+                key = f"{content_hash}:{position}"
+                self.total_length -= self.lengths.pop(key, 0)
+        if count:
+            # Postings of the removed entries; rare, so a full sweep is fine
+            prefix = content_hash + ":"
+            with self._lock:
+                for term in list(self.postings):
+                    entries = self.postings[term]
+                    for key in [key for key in entries if key.startswith(prefix)]:
+                        del entries[key]
+                    if not entries:
+                        del self.postings[term]
+
+    def idf(self, term: str) -> float:
+        document_frequency = len(self.postings.get(term, ()))
+        count = len(self.lengths)
+        return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def score_scenarios(self, content_hash: str, query: Iterable[str]) -> List[float]:
+        """BM25 score of every scenario of an indexed document for ``query``"""
+        count = self.documents.get(content_hash, 0)
+        keys = [f"{content_hash}:{position}" for position in range(count)]
+        average_length = self.total_length / max(len(self.lengths), 1)
+        scores = [0.0] * count
+        for term in set(query):
+            entries = self.postings.get(term)
+            if not entries:
+                continue
+            idf = self.idf(term)
+            for position, key in enumerate(keys):
+                frequency = entries.get(key)
+                if frequency:
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self.lengths[key] / max(average_length, 1)
+                    )
+                    scores[position] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def stats(self) -> Dict:
+        return {
+            "documents": len(self.documents),
+            "scenarios": len(self.lengths),
+            "terms": len(self.postings),
+        }
+
+    def save(self, path: str) -> None:
+        """Write the index as JSON, atomically."""
+        documents = {}
+        with self._lock:
+            for content_hash, count in self.documents.items():
+                documents[content_hash] = [{} for _ in range(count)]
+            for term, entries in self.postings.items():
+                for key, frequency in entries.items():
+                    content_hash, position = key.rsplit(":", 1)
+                    documents[content_hash][int(position)][term] = frequency
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "k1": self.k1, "b": self.b, "documents": documents},
+                f,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "bm25_index":
+        """Read an index written by ``save``; an unreadable file gives an empty index."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != INDEX_VERSION:
+            return cls()
+        index = cls(data.get("k1", BM25_K1), data.get("b", BM25_B))
+        for content_hash, term_counts in data.get("documents", {}).items():
+            index._add_entries(content_hash, term_counts)
+        return index
+
+
+@dataclass
+class scenario_selection:
+    text: str
+    trimmed: bool
+    selected_scenarios: int
+    total_scenarios: int
+    full_tokens: int
+    selected_tokens: int
+    unmatched_criteria: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict:
+        summary = asdict(self)
+        del summary["text"]
+        return summary
+
+
+_index = bm25_index()
+
+
+def get_scenario_index() -> bm25_index:
+    return _index
+
+
+def index_gherkin_files(file_paths: List[str], index_path: Optional[str] = None) -> Dict:
+    """Build the process-wide index over ``file_paths``.
+
+    With ``index_path`` the persisted index is loaded first, files whose
+    content is already indexed are not tokenized again, entries of files no
+    longer in the folder are dropped and the result is saved back.
+    """
+    global _index
+    loaded = bool(index_path and os.path.exists(index_path))
+    if loaded:
+        _index = bm25_index.load(index_path)
+
+    hashes = set()
+    added = 0
+    for path in file_paths:
+        document = load_gherkin_file(path)
+        hashes.add(document.content_hash)
+        added += _index.add_document(document)
+
+    stale = [content_hash for content_hash in _index.documents if content_hash not in hashes]
+    for content_hash in stale:
+        _index.remove_document(content_hash)
+
+    if index_path and (added or stale or not loaded):
+        _index.save(index_path)
+    return dict(_index.stats(), added=added, removed=len(stale), loaded=loaded)
+
+
+def criteria_queries(jira_story: Dict) -> List[tuple]:
+    """(label, query tokens) per acceptance criterion of the story"""
+    criteria = extract_criteria(jira_story.get("description") or "")
+    queries = [
+        (item.label, tokenize(" ".join((item.label,) + item.terms))) for item in criteria
+    ]
+    if not queries:
+        # No recognizable criteria: rank by the whole story
+        queries = [
+            (
+                "story",
+                tokenize(f"{jira_story.get('title', '')} {jira_story.get('description', '')}"),
+            )
+        ]
+    return queries
+
+
+def select_scenarios(
+    jira_story: Dict,
+    document: gherkin_document,
+    token_budget: int,
+    index: Optional[bm25_index] = None,
+) -> scenario_selection:
+    """The file, or its most relevant scenarios within ``token_budget`` tokens"""
+    index = index or _index
+    index.add_document(document)
+    texts = scenario_texts(document)
+    full_tokens = estimate_tokens(document.text)
+
+    queries = criteria_queries(jira_story)
+    scores = [index.score_scenarios(document.content_hash, query) for _, query in queries]
+    unmatched = [
+        label
+        for (label, _), criterion_scores in zip(queries, scores)
+        if label != "story" and not any(criterion_scores)
+    ]
+
+    if full_tokens <= token_budget or not texts:
+        return scenario_selection(
+            text=document.text,
+            trimmed=False,
+            selected_scenarios=len(texts),
+            total_scenarios=len(texts),
+            full_tokens=full_tokens,
+            selected_tokens=full_tokens,
+            unmatched_criteria=unmatched,
+        )
+
+    # Feature line, description and background: everything before the first scenario
+    first_line = min(scenario.start_line for scenario in document.scenarios)
+    header = "\n".join(document.text.splitlines()[: first_line - 1]).rstrip()
+    remaining = token_budget - estimate_tokens(header)
+    sizes = [estimate_tokens(text) + 1 for text in texts]
+
+    # The best scenarios of each criterion in turn, then the rest by total relevance
+    rankings = [
+        [
+            position
+            for position in sorted(range(len(texts)), key=lambda p: -criterion_scores[p])
+            if criterion_scores[position] > 0
+        ]
+        for criterion_scores in scores
+    ]
+    totals = [sum(column) for column in zip(*scores)]
+    order = []
+    for depth in range(len(texts)):
+        order.extend(ranking[depth] for ranking in rankings if depth < len(ranking))
+    order.extend(sorted(range(len(texts)), key=lambda p: -totals[p]))
+
+    selected = set()
+    for position in order:
+        if position not in selected and sizes[position] <= remaining:
+            selected.add(position)
+            remaining -= sizes[position]
+
+    parts = ([header] if header else []) + [texts[p] for p in sorted(selected)]
+    text = "\n\n".join(parts) + "\n"
+    return scenario_selection(
+        text=text,
+        trimmed=True,
+        selected_scenarios=len(selected),
+        total_scenarios=len(texts),
+        full_tokens=full_tokens,
+        selected_tokens=estimate_tokens(text),
+        unmatched_criteria=unmatched,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Index a folder of Gherkin files and show the scenarios selected per story"
+    )
+    parser.add_argument("--folder", required=True, help="Folder with *.feature files")
+    parser.add_argument(
+        "--stories",
+        default=JIRA_STORY_PATH,
+        help="Jira stories as JSON, JSON Lines or CSV (default: JIRA_STORY_PATH env var)",
+    )
+    parser.add_argument(
+        "--budget", type=int, default=1500, help="Gherkin token budget (default: 1500)"
+    )
+    parser.add_argument(
+        "--index", help=f"Persisted index file (default: <folder>/{INDEX_FILE_NAME})"
+    )
+    args = parser.parse_args()
+
+    stories = memory_story_store.from_file(args.stories)
+
+    entries = []
+    for name in sorted(os.listdir(args.folder)):
+        if name.endswith(".feature"):
+            jira_id = name.split("_")[0]
+            if jira_id in stories:
+                entries.append((jira_id, os.path.join(args.folder, name)))
+
+    started = time.perf_counter()
+    stats = index_gherkin_files(
+        [path for _, path in entries],
+        args.index or os.path.join(args.folder, INDEX_FILE_NAME),
+    )
+    print(f"Index: {stats} in {time.perf_counter() - started:.3f}s")
+
+    full = selected = 0
+    started = time.perf_counter()
+    for jira_id, path in entries:
+        selection = select_scenarios(stories.get(jira_id), load_gherkin_file(path), args.budget)
+        full += selection.full_tokens
+        selected += selection.selected_tokens
+        print(
+            f"{jira_id:>5} {selection.selected_scenarios:>3}/{selection.total_scenarios:<3} scenarios "
+            f"{selection.selected_tokens:>6}/{selection.full_tokens:<6} tokens"
+            + (f" unmatched: {', '.join(selection.unmatched_criteria)}" if selection.unmatched_criteria else "")
+        )
+    elapsed = time.perf_counter() - started
+    print(
+        f"\n{len(entries)} files selected in {elapsed:.3f}s; "
+        f"Gherkin tokens {selected}/{full} ({100 * selected / max(full, 1):.0f}%)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import os
-import yaml
 import json
 from dotenv import load_dotenv
 
@@ -7,11 +6,32 @@ load_dotenv()
 
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 
+
+def env_flag(name, default=False):
+    """Boolean env var: 1/true/yes/on enable it, anything else disables it"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # OpenAI settings
 OPENAI_API_KEY = os.getenv("OPEN_AI_API_KEY", "")
 OPENAI_MODEL = os.getenv("OPEN_AI_MODEL", "gpt-4")
 OPENAI_MAX_TOKEN = int(os.getenv("OPEN_AI_MAX_TOKEN", 500))
 OPENAI_TEMPERATURE = float(os.getenv("OPEN_AI_TEMPERATURE", 0.7))
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# HTTP connection pool shared by all OpenAI calls in the process
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 5.0))
+
+# Default per-model request/token budgets (0 = unlimited); RATE_LIMITS_PATH points
+# to an optional JSON file of {"<model>": {"rpm": ..., "tpm": ...}} overrides
+RATE_LIMIT_RPM = float(os.getenv("RATE_LIMIT_RPM", 0))
+RATE_LIMIT_TPM = float(os.getenv("RATE_LIMIT_TPM", 0))
+RATE_LIMITS_PATH = os.getenv("RATE_LIMITS_PATH", "")
 
 # Input file paths
 API_GUIDELINE_PATH = BASE_PATH + os.getenv("API_STANDARD_GUIDELINE_FILE_PATH", "")
@@ -23,6 +43,10 @@ COVERAGE_EXAMPLE_OUTPUT_FILE_PATH = BASE_PATH + os.getenv(
 
 LLM_PROMPTS_FILE_PATH = BASE_PATH + os.getenv("LLM_PROMPTS", "")
 
+# Prompt layout: "legacy" (paper prompt, ticket first) or "static_first"
+# (guidelines and example output first to benefit from provider prompt caching)
+PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "legacy")
+
 # Output
 COVERAGE_REPORT_BASE_PATH = BASE_PATH + os.getenv("COVERAGE_REPORT_BASE_PATH", "")
 
@@ -30,6 +54,117 @@ TOTAL_NUM_RUNS = int(os.getenv("TOTAL_NUM_RUNS", 1))
 
 TOTAL_COVERAGE_REPORT_RUN = int(os.getenv("TOTAL_COVERAGE_REPORT_RUN", 1))
 
+# In-process retries of failed judge calls (1 = single attempt, no retry).
+# Base delays are per failure class and grow exponentially with jitter.
+MAX_ATTEMPTS = int(os.getenv("MAX_ATTEMPTS", 1))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", 60))
+RETRY_BASE_DELAY_PARSE = float(os.getenv("RETRY_BASE_DELAY_PARSE", 0))
+RETRY_BASE_DELAY_TIMEOUT = float(os.getenv("RETRY_BASE_DELAY_TIMEOUT", 2))
+RETRY_BASE_DELAY_SERVER = float(os.getenv("RETRY_BASE_DELAY_SERVER", 5))
+
+# Request schema-enforced JSON via response_format (falls back to the free-form
+# prompt for backends that reject it)
+STRUCTURED_OUTPUT = env_flag("STRUCTURED_OUTPUT")
+
+# Stream judge responses to measure time to first token and stop reading as
+# soon as the top-level JSON object is complete
+STREAM_RESPONSES = env_flag("STREAM_RESPONSES")
+
+# Self-consistency sampling over TOTAL_COVERAGE_REPORT_RUN judge samples.
+# Mode: sequential, packed (one call with n, topping up missing samples
+# concurrently) or concurrent. Reducer: mean, median or trimmed_mean.
+SAMPLING_MODE = os.getenv("SAMPLING_MODE", "sequential")
+COVERAGE_SAMPLE_REDUCER = os.getenv("COVERAGE_SAMPLE_REDUCER", "mean")
+
+# Cascade judge: comma-separated models from cheapest to strongest. A ticket
+# moves to the next model when the output fails to parse, is truncated, or
+# CASCADE_SAMPLES cheap samples differ by more than CASCADE_DISAGREEMENT
+# percentage points. Empty disables the cascade.
+CASCADE_MODELS = [
+    model.strip() for model in os.getenv("CASCADE_MODELS", "").split(",") if model.strip()
+]
+CASCADE_SAMPLES = int(os.getenv("CASCADE_SAMPLES", 2))
+CASCADE_DISAGREEMENT = float(os.getenv("CASCADE_DISAGREEMENT", 10))
+
+# Recovery of answers cut off at the token budget (finish_reason=length):
+# continue (ask the model to carry on from the partial answer), budget (retry
+# with TRUNCATION_BUDGET_MULTIPLIER times the budget), auto (continue when
+# there is partial content, else budget; reasoning models often spend the
+# whole budget before answering) or off
+TRUNCATION_STRATEGY = os.getenv("TRUNCATION_STRATEGY", "auto")
+TRUNCATION_MAX_RETRIES = int(os.getenv("TRUNCATION_MAX_RETRIES", 1))
+TRUNCATION_BUDGET_MULTIPLIER = float(os.getenv("TRUNCATION_BUDGET_MULTIPLIER", 2))
+
+# Repair stage for judge output that does not parse: off, local (deterministic
+# repairer), model (send only the broken output and the schema to
+# JSON_REPAIR_MODEL) or auto (local first, then the model)
+JSON_REPAIR = os.getenv("JSON_REPAIR", "local")
+JSON_REPAIR_MODEL = os.getenv("JSON_REPAIR_MODEL", "gpt-4.1-nano")
+JSON_REPAIR_MAX_TOKENS = int(os.getenv("JSON_REPAIR_MAX_TOKENS", 2000))
+
+# Static pre-scorer (static_scorer.py): off, report (score every file next to
+# the judge), skip (files at or above the threshold are not sent to the judge)
+# or downtier (they are judged by STATIC_TRIAGE_MODEL instead). Static and
+# judge percentages further apart than STATIC_DISAGREEMENT are listed.
+STATIC_TRIAGE = os.getenv("STATIC_TRIAGE", "report")
+STATIC_TRIAGE_THRESHOLD = float(os.getenv("STATIC_TRIAGE_THRESHOLD", 100))
+STATIC_TRIAGE_MODEL = os.getenv("STATIC_TRIAGE_MODEL", "gpt-4.1-nano")
+STATIC_DISAGREEMENT = float(os.getenv("STATIC_DISAGREEMENT", 30))
+
+# Scenario retrieval (bm25_index.py): files whose Gherkin exceeds
+# SCENARIO_BUDGET tokens are judged on the scenarios most relevant to the
+# story's acceptance criteria that fit in the budget (0 sends whole files).
+# SCENARIO_COMPARE also judges trimmed files in full to measure the change.
+SCENARIO_BUDGET = int(os.getenv("SCENARIO_BUDGET", 0))
+SCENARIO_COMPARE = env_flag("SCENARIO_COMPARE")
+
+# Jira story lookup (story_store.py): memory (dict index) or sqlite (stories
+# streamed once into STORY_STORE_PATH, for large trackers exports)
+STORY_STORE = os.getenv("STORY_STORE", "memory")
+STORY_STORE_PATH = os.getenv("STORY_STORE_PATH") or os.path.join(
+    BASE_PATH, ".story_store.sqlite"
+)
+
+# Persistent LLM response cache: mode is off, read, write or readwrite.
+# Entries older than LLM_CACHE_MAX_AGE_DAYS (0 = never) or beyond
+# LLM_CACHE_MAX_MB in total are evicted, least recently used first.
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "off")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH") or os.path.join(
+    BASE_PATH, ".llm_response_cache.sqlite"
+)
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 512))
+LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", 30))
+
+# Number of Gherkin files analyzed in parallel by analyze_gherkin_folder
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", 1))
+
+# Shard of the folder analyzed by this host, as "i/N" (1-based; empty: all
+# files). Files are assigned by a hash of their Jira ID.
+ANALYSIS_SHARD = os.getenv("ANALYSIS_SHARD", "")
+
+# Progress journal of a folder analysis (progress_journal.py): fsync after
+# this many events or seconds, whichever comes first
+JOURNAL_FSYNC_EVERY = int(os.getenv("JOURNAL_FSYNC_EVERY", 16))
+JOURNAL_FSYNC_SECONDS = float(os.getenv("JOURNAL_FSYNC_SECONDS", 1.0))
+
+# Multi-model sweep (sweep.py): judge calls in flight across all
+# configurations, and optional per-provider caps as "openai=8,openrouter=4"
+SWEEP_CONCURRENCY = int(os.getenv("SWEEP_CONCURRENCY", 8))
+SWEEP_PROVIDER_LIMITS = os.getenv("SWEEP_PROVIDER_LIMITS", "")
+
+# Number of Gherkin files judged together in one multi-ticket prompt
+ANALYSIS_BATCH_SIZE = int(os.getenv("ANALYSIS_BATCH_SIZE", 1))
+
+# analyze_gherkin_folder execution mode: sync (one request per file) or batch
+# (OpenAI Batch API). BATCH_BACKEND is openai or local; the local stand-in
+# keeps jobs under BATCH_LOCAL_DIR and answers with the example output
+# (BATCH_LOCAL_RESPONDER=example) or the chat completions endpoint (live).
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "sync")
+BATCH_BACKEND = os.getenv("BATCH_BACKEND", "openai")
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", 30))
+BATCH_LOCAL_DIR = os.getenv("BATCH_LOCAL_DIR") or os.path.join(BASE_PATH, ".batch_jobs")
+BATCH_LOCAL_RESPONDER = os.getenv("BATCH_LOCAL_RESPONDER", "example")
+
 
 def load_json_file(path: str):
     try:
@@ -50,6 +185,9 @@ def load_text_file(path: str):
 
 
 def load_yaml_file(path: str):
+    # Imported here: only the prompt file is YAML
+    import yaml
+
     try:
         with open(path, "r") as file:
             return yaml.safe_load(file)
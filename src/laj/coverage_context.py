@@ -0,0 +1,251 @@
+"""
+Lazily loaded dataset and prompt context for the judge.
+
+The API guidelines, the Jira stories, the prompt YAML and the example output
+used to be read when ``coverage`` was imported, so every tool importing a
+helper paid for them and a process could only ever use one dataset. A
+``coverage_context`` holds one such configuration and reads each file on first
+use; ``reload()`` drops what was read so edited files are picked up.
+
+Contexts are registered by name, so one process can judge several datasets or
+prompt versions: pass ``context=<name>`` in the model config (or a context to
+the prompt builders). The default context uses the paths from the
+environment.
+
+``python src/laj/coverage_context.py --budget-ms 150`` measures the import
+time of ``coverage`` in fresh interpreters and fails when it is over budget.
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from typing import Dict, Optional, Union
+
+from coverage_config import (
+    API_GUIDELINE_PATH,
+    COVERAGE_EXAMPLE_OUTPUT_FILE_PATH,
+    JIRA_STORY_PATH,
+    LLM_PROMPTS_FILE_PATH,
+    STORY_STORE,
+    STORY_STORE_PATH,
+    load_json_file,
+    load_text_file,
+    load_yaml_file,
+)
+from story_store import open_story_store
+
+DEFAULT_CONTEXT = "default"
+
+# Budget for "import coverage" in a fresh interpreter, in milliseconds
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 150))
+
+# attribute -> (path attribute, loader)
+_FILES = {
+    "api_guidelines": ("guideline_path", load_text_file),
+    "llm_prompts": ("prompts_path", load_yaml_file),
+    "coverage_example_output": ("example_output_path", load_json_file),
+}
+
+
+class coverage_context:
+    """Guidelines, stories, prompts and example output of one configuration.
+
+    Each file is read on first access and kept until ``reload()``. Stories
+    are served by a story store (``story_store``: memory or sqlite).
+    """
+
+    def __init__(
+        self,
+        name: str = DEFAULT_CONTEXT,
+        guideline_path: Optional[str] = None,
+        jira_story_path: Optional[str] = None,
+        prompts_path: Optional[str] = None,
+        example_output_path: Optional[str] = None,
+        story_store: Optional[str] = None,
+        story_store_path: Optional[str] = None,
+    ):
+        self.name = name
+        self.guideline_path = guideline_path or API_GUIDELINE_PATH
+        self.jira_story_path = jira_story_path or JIRA_STORY_PATH
+        self.prompts_path = prompts_path or LLM_PROMPTS_FILE_PATH
+        self.example_output_path = example_output_path or COVERAGE_EXAMPLE_OUTPUT_FILE_PATH
+        self.story_store_kind = story_store or STORY_STORE
+        self.story_store_path = story_store_path or STORY_STORE_PATH
+        self._values: Dict[str, object] = {}
+        # Reentrant: loading jira_stories goes through the story_store attribute
+        self._lock = threading.RLock()
+        self.loads = 0
+
+    def _get(self, attribute: str):
+        value = self._values.get(attribute)
+        if value is None:
+            with self._lock:
+                value = self._values.get(attribute)
+                if value is None:
+                    value = self._load(attribute)
+                    self._values[attribute] = value
+                    self.loads += 1
+        return value
+
+    def _load(self, attribute: str):
+        if attribute == "story_store":
+            return open_story_store(
+                self.story_store_kind, self.jira_story_path, self.story_store_path
+            )
+        if attribute == "jira_stories":
+            return list(self.story_store)
+        if attribute == "prompt_version":
+            return self._hash_files(
+                self.prompts_path, self.guideline_path, self.example_output_path
+            )
+        path_attribute, loader = _FILES[attribute]
+        return loader(getattr(self, path_attribute))
+
+    @staticmethod
+    def _hash_files(*paths: str) -> str:
+        digest = hashlib.sha256()
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+            except OSError:
+                pass
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+
+    @property
+    def story_store(self):
+        return self._get("story_store")
+
+    def get_jira_story(self, jira_id) -> Optional[Dict]:
+        return self.story_store.get(jira_id)
+
+    @property
+    def api_guidelines(self) -> str:
+        return self._get("api_guidelines")
+
+    @property
+    def jira_stories(self) -> list:
+        """Every story as a list; prefer ``get_jira_story`` for lookups."""
+        return self._get("jira_stories")
+
+    @property
+    def llm_prompts(self) -> dict:
+        return self._get("llm_prompts")
+
+    @property
+    def coverage_example_output(self):
+        return self._get("coverage_example_output")
+
+    @property
+    def prompt_version(self) -> str:
+        """Hash of the prompts, guidelines and example output the judge is given"""
+        return self._get("prompt_version")
+
+    def reload(self) -> None:
+        """Forget the loaded files; they are read again on next use."""
+        with self._lock:
+            self._values.clear()
+
+    def describe(self) -> Dict:
+        return {
+            "name": self.name,
+            "guideline_path": self.guideline_path,
+            "jira_story_path": self.jira_story_path,
+            "prompts_path": self.prompts_path,
+            "example_output_path": self.example_output_path,
+            "story_store": self.story_store_kind,
+            "loaded": sorted(self._values),
+        }
+
+
+_contexts: Dict[str, coverage_context] = {}
+_contexts_lock = threading.Lock()
+
+
+def register_context(name: str, **paths) -> coverage_context:
+    """Create (or replace) the context ``name`` with the given file paths."""
+    context = coverage_context(name, **paths)
+    with _contexts_lock:
+        _contexts[name] = context
+    return context
+
+
+def get_context(context: Union[None, str, coverage_context] = None) -> coverage_context:
+    """The context given, the one registered under that name, or the default."""
+    if isinstance(context, coverage_context):
+        return context
+    name = context or DEFAULT_CONTEXT
+    found = _contexts.get(name)
+    if found is not None:
+        return found
+    if name != DEFAULT_CONTEXT:
+        raise KeyError(f"Unknown coverage context: {name}")
+    with _contexts_lock:
+        return _contexts.setdefault(DEFAULT_CONTEXT, coverage_context())
+
+
+def reload_contexts() -> None:
+    """Re-read every context's files on next use."""
+    with _contexts_lock:
+        contexts = list(_contexts.values())
+    for context in contexts:
+        context.reload()
+
+
+def measure_import_time(module: str = "coverage", runs: int = 5) -> Dict:
+    """Median wall time of ``import module`` in fresh interpreters, in milliseconds"""
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {module}; print((time.perf_counter() - started) * 1000)"
+    )
+    directory = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(max(1, runs)):
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=directory,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(completed.stdout.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "runs": len(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the import time of the judge module against a budget"
+    )
+    parser.add_argument("--module", default="coverage", help="Module to import (default: coverage)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time (default: 5)")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=IMPORT_TIME_BUDGET_MS,
+        help="Fail when the median import time exceeds this (default: IMPORT_TIME_BUDGET_MS env var or 150)",
+    )
+    args = parser.parse_args()
+
+    timing = measure_import_time(args.module, args.runs)
+    within = timing["median_ms"] <= args.budget_ms
+    print(
+        f"import {timing['module']}: median {timing['median_ms']:.1f} ms "
+        f"(min {timing['min_ms']:.1f}, max {timing['max_ms']:.1f}, {timing['runs']} runs); "
+        f"budget {args.budget_ms:.0f} ms: {'ok' if within else 'over budget'}"
+    )
+    sys.exit(0 if within else 1)
+
+
+if __name__ == "__main__":
+    main()
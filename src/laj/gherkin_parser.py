@@ -0,0 +1,399 @@
+"""
+Line-based Gherkin parser with a content-addressed cache.
+
+A feature file is read once and parsed in a single pass over its lines into
+a compact tree: the feature, its background, scenarios and scenario outlines
+with their steps, tags and examples tables. Parsed documents are memoized by
+the SHA-256 of the file content, and file paths map to content hashes while
+their size and modification time are unchanged, so validation, prompt
+building and the judge call all share one read and one parse per file.
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+STEP_KEYWORDS = ("Given", "When", "Then", "And", "But", "*")
+OUTLINE_KEYWORDS = ("Scenario Outline", "Scenario Template")
+SCENARIO_KEYWORDS = OUTLINE_KEYWORDS + ("Scenario", "Example")
+EXAMPLES_KEYWORDS = ("Examples", "Scenarios")
+DOC_STRING_DELIMITERS = ('"""', "```")
+
+# Parsed documents kept in memory, least recently used dropped first
+GHERKIN_CACHE_SIZE = 2048
+
+
+@dataclass
+class gherkin_step:
+    keyword: str
+    text: str
+    line: int
+    table: List[List[str]] = field(default_factory=list)
+    doc_string: Optional[str] = None
+
+
+@dataclass
+class gherkin_examples:
+    name: str
+    line: int
+    tags: List[str] = field(default_factory=list)
+    header: List[str] = field(default_factory=list)
+    rows: List[List[str]] = field(default_factory=list)
+
+
+@dataclass
+class gherkin_scenario:
+    keyword: str
+    name: str
+    line: int
+    # First line (its tags) and last line of the scenario in the file
+    start_line: int
+    end_line: int
+    tags: List[str] = field(default_factory=list)
+    steps: List[gherkin_step] = field(default_factory=list)
+    examples: List[gherkin_examples] = field(default_factory=list)
+    rule: Optional[str] = None
+
+    @property
+    def is_outline(self) -> bool:
+        return bool(self.examples) or self.keyword in OUTLINE_KEYWORDS
+
+
+@dataclass
+class gherkin_background:
+    name: str
+    line: int
+    steps: List[gherkin_step] = field(default_factory=list)
+
+
+@dataclass
+class gherkin_feature:
+    name: str
+    line: int
+    tags: List[str] = field(default_factory=list)
+    description: List[str] = field(default_factory=list)
+    background: Optional[gherkin_background] = None
+    scenarios: List[gherkin_scenario] = field(default_factory=list)
+
+
+@dataclass
+class gherkin_document:
+    text: str
+    content_hash: str
+    feature: Optional[gherkin_feature] = None
+    # A "Feature:" line was seen (scenarios may also appear without one)
+    has_feature_line: bool = False
+
+    @property
+    def scenarios(self) -> List[gherkin_scenario]:
+        return self.feature.scenarios if self.feature else []
+
+    @property
+    def step_count(self) -> int:
+        background = self.feature.background if self.feature else None
+        return sum(len(scenario.steps) for scenario in self.scenarios) + (
+            len(background.steps) if background else 0
+        )
+
+    @property
+    def is_valid(self) -> bool:
+        """At least one scenario, and at least one step in a scenario"""
+        return any(scenario.steps for scenario in self.scenarios)
+
+    @functools.cached_property
+    def normalized_hash(self) -> str:
+        """Hash of the content without comments, blank lines or layout whitespace"""
+        return content_hash(normalize_gherkin(self.text))
+
+    def scenario_text(self, scenario: gherkin_scenario) -> str:
+        """The source lines of ``scenario``, including its tags and examples"""
+        lines = self.text.splitlines()
+        return "\n".join(lines[scenario.start_line - 1 : scenario.end_line])
+
+
+def _match_keyword(line: str, keywords: Iterable[str]) -> Optional[Tuple[str, str]]:
+    """``(keyword, rest)`` if ``line`` starts with ``keyword:``"""
+    for keyword in keywords:
+        if line.startswith(keyword) and line[len(keyword) :].lstrip().startswith(":"):
+            return keyword, line[len(keyword) :].lstrip()[1:].strip()
+    return None
+
+
+def _match_step(line: str) -> Optional[Tuple[str, str]]:
+    for keyword in STEP_KEYWORDS:
+        if line.startswith(keyword) and (
+            len(line) == len(keyword) or line[len(keyword)].isspace()
+        ):
+            return keyword, line[len(keyword) :].strip()
+    return None
+
+
+def _table_row(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def parse_gherkin_lines(lines: Iterable[str], text: str = "", content_hash: str = ""):
+    """Parse Gherkin from an iterable of lines in one pass.
+
+    Unknown lines are kept as feature description before the first scenario
+    and ignored elsewhere, so loosely written files still parse. A ``` fence
+    opens a doc string only under a step, so a file wrapped in a Markdown code
+    fence parses like the unwrapped file.
+    """
+    document = gherkin_document(text=text, content_hash=content_hash)
+    feature: Optional[gherkin_feature] = None
+    scenario: Optional[gherkin_scenario] = None
+    background: Optional[gherkin_background] = None
+    examples: Optional[gherkin_examples] = None
+    step: Optional[gherkin_step] = None
+    pending_tags: List[str] = []
+    tags_line = 0
+    rule: Optional[str] = None
+    doc_string: Optional[List[str]] = None
+    doc_delimiter = ""
+    end_before_doc_string = 0
+    line_number = 0
+
+    def current_feature() -> gherkin_feature:
+        nonlocal feature
+        if feature is None:
+            feature = gherkin_feature(name="", line=line_number)
+            document.feature = feature
+        return feature
+
+    for line_number, raw_line in enumerate(lines, start=1):
+        line = raw_line.strip()
+
+        if doc_string is not None:
+            if scenario is not None:
+                scenario.end_line = line_number
+            if line.startswith(doc_delimiter):
+                if step is not None:
+                    step.doc_string = "\n".join(doc_string)
+                doc_string = None
+            else:
+                doc_string.append(line)
+            continue
+
+        if not line or line.startswith("#"):
+            continue
+
+        if line.startswith("@"):
+            if not pending_tags:
+                tags_line = line_number
+            pending_tags.extend(tag for tag in line.split() if tag.startswith("@"))
+            continue
+
+        if line.startswith(DOC_STRING_DELIMITERS):
+            if line.startswith("```") and step is None:
+                # Not under a step: the Markdown fence generated files are
+                # often wrapped in, e.g. ```gherkin
+                continue
+            if scenario is not None:
+                end_before_doc_string = scenario.end_line
+                scenario.end_line = line_number
+            doc_delimiter = line[:3]
+            doc_string = []
+            continue
+
+        if line.startswith("|"):
+            if scenario is not None:
+                scenario.end_line = line_number
+            row = _table_row(line)
+            if examples is not None:
+                if examples.header:
+                    examples.rows.append(row)
+                else:
+                    examples.header = row
+            elif step is not None:
+                step.table.append(row)
+            continue
+
+        matched = _match_step(line)
+        if matched:
+            step = gherkin_step(keyword=matched[0], text=matched[1], line=line_number)
+            if scenario is not None and examples is None:
+                scenario.steps.append(step)
+                scenario.end_line = line_number
+            elif background is not None and scenario is None:
+                background.steps.append(step)
+            else:
+                step = None
+            continue
+
+        matched = _match_keyword(line, SCENARIO_KEYWORDS)
+        if matched:
+            scenario = gherkin_scenario(
+                keyword=matched[0],
+                name=matched[1],
+                line=line_number,
+                start_line=tags_line if pending_tags else line_number,
+                end_line=line_number,
+                tags=pending_tags,
+                rule=rule,
+            )
+            current_feature().scenarios.append(scenario)
+            pending_tags, background, examples, step = [], None, None, None
+            continue
+
+        matched = _match_keyword(line, EXAMPLES_KEYWORDS)
+        if matched and scenario is not None:
+            examples = gherkin_examples(
+                name=matched[1], line=line_number, tags=pending_tags
+            )
+            scenario.examples.append(examples)
+            scenario.end_line = line_number
+            pending_tags, step = [], None
+            continue
+
+        matched = _match_keyword(line, ("Background",))
+        if matched:
+            background = gherkin_background(name=matched[1], line=line_number)
+            current_feature().background = background
+            scenario, examples, step = None, None, None
+            continue
+
+        matched = _match_keyword(line, ("Rule",))
+        if matched:
+            rule = matched[1]
+            scenario, background, examples, step = None, None, None, None
+            pending_tags = []
+            continue
+
+        matched = _match_keyword(line, ("Feature",))
+        if matched:
+            feature = gherkin_feature(name=matched[1], line=line_number, tags=pending_tags)
+            document.feature = feature
+            document.has_feature_line = True
+            pending_tags = []
+            continue
+
+        # Free text: the feature description until the first scenario
+        if feature is not None and scenario is None and background is None:
+            feature.description.append(line)
+
+    if doc_string is not None and scenario is not None:
+        # Never closed (e.g. a closing Markdown fence): not part of the scenario
+        scenario.end_line = end_before_doc_string
+    return document
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_gherkin(text: str) -> str:
+    """Gherkin text with comment and blank lines dropped and whitespace collapsed
+
+    Re-indenting, re-aligning tables or editing comments leaves the result
+    unchanged. Lines inside doc strings are content, so they are kept even
+    when they start with "#".
+    """
+    lines = []
+    doc_delimiter = ""
+    for raw_line in text.splitlines():
+        line = " ".join(raw_line.split())
+        if doc_delimiter:
+            if line.startswith(doc_delimiter):
+                doc_delimiter = ""
+        elif not line or line.startswith("#"):
+            continue
+        else:
+            for delimiter in DOC_STRING_DELIMITERS:
+                if line.startswith(delimiter):
+                    doc_delimiter = delimiter
+                    break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class gherkin_cache:
+    """Parsed documents by content hash, and file paths by (size, mtime)."""
+
+    def __init__(self, max_entries: int = GHERKIN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._documents: "OrderedDict[str, gherkin_document]" = OrderedDict()
+        self._paths: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"files_read": 0, "parses": 0, "path_hits": 0, "content_hits": 0}
+
+    def parse(self, text: str) -> gherkin_document:
+        """The parsed document for ``text``, parsing it only once per content hash."""
+        digest = content_hash(text)
+        with self._lock:
+            document = self._documents.get(digest)
+            if document is not None:
+                self._documents.move_to_end(digest)
+                self.stats["content_hits"] += 1
+                return document
+
+        document = parse_gherkin_lines(text.splitlines(), text, digest)
+        with self._lock:
+            self.stats["parses"] += 1
+            self._documents[digest] = document
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+        return document
+
+    def load(self, path: str) -> gherkin_document:
+        """Read and parse ``path``, reusing the last parse while the file is unchanged."""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            signature = None
+
+        with self._lock:
+            known = self._paths.get(path)
+            if signature and known and known[0] == signature:
+                document = self._documents.get(known[1])
+                if document is not None:
+                    self._documents.move_to_end(known[1])
+                    self.stats["path_hits"] += 1
+                    return document
+
+        try:
+            with open(path, "r") as file:
+                text = file.read()
+        except Exception as e:
+            logger.error(f"Error reading Gherkin file at {path}: {e}")
+            text = ""
+
+        with self._lock:
+            self.stats["files_read"] += 1
+        document = self.parse(text)
+        if signature:
+            with self._lock:
+                self._paths[path] = (signature, document.content_hash)
+        return document
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, documents=len(self._documents))
+
+
+_cache = gherkin_cache()
+
+
+def parse_gherkin(text: str) -> gherkin_document:
+    """Parse Gherkin text through the process-wide cache."""
+    return _cache.parse(text or "")
+
+
+def load_gherkin_file(path: str) -> gherkin_document:
+    """Read and parse a feature file through the process-wide cache."""
+    return _cache.load(path)
+
+
+def get_gherkin_cache_stats() -> Dict:
+    return _cache.summary()
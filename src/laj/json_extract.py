@@ -0,0 +1,340 @@
+"""
+Locate and decode JSON objects in raw judge output.
+
+The scanner walks the text once, skipping ``<think>`` blocks and any prose
+before the first ``{``, and reports where the first top-level object closes.
+It can be fed incrementally, which lets a streaming call stop as soon as the
+object is complete.
+
+``extract_json`` decodes a complete answer: it skips ``<think>`` blocks and
+prose up to the first ``{`` and lets the C JSON decoder read the object and
+stop at its end, so code fences and prose around the answer are ignored.
+Python-literal output (single quotes, True/False/None) and trailing commas
+are rewritten to JSON in one pass first. Raw newlines inside strings are
+accepted as they are.
+
+``repair_json_text`` is a deterministic last resort for output that does not
+parse: it closes unterminated strings and brackets, drops trailing commas and,
+if needed, cuts back to an earlier element boundary until the text decodes.
+"""
+
+import json
+import re
+from typing import Any, List, Optional
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# A complete string (either quote) or a single structural character
+_STRUCTURE = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*"'
+    r"|'[^'\\]*(?:\\.[^'\\]*)*'"
+    r"|[\"'{}\[\]]",
+    re.DOTALL,
+)
+_STRING_END = {'"': re.compile(r'[\\"]'), "'": re.compile(r"[\\']")}
+
+
+class balanced_json_scanner:
+    """Incremental scanner for the first balanced top-level JSON object.
+
+    Strings may be delimited by double or single quotes; brackets inside
+    strings are ignored. ``openers`` are the characters that may start the
+    top-level value, e.g. ``"[{"`` to accept an array.
+    """
+
+    def __init__(self, openers: str = "{"):
+        self.openers = openers
+        self._preamble = re.compile("[<" + re.escape(openers) + "]")
+        self.text = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self._pos = 0
+        self._depth = 0
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._in_think = False
+
+    def feed(self, chunk: str) -> Optional[int]:
+        """Append ``chunk``; return the end offset once the object has closed."""
+        self.text += chunk
+        if self.end is not None:
+            return self.end
+
+        # Jump between structural characters instead of stepping through
+        # every character of the strings and prose
+        text = self.text
+        length = len(text)
+        while self._pos < length:
+            if self.start is None:
+                if not self._skip_preamble(text):
+                    return None
+                continue
+
+            if self._quote:
+                if self._escape:
+                    self._escape = False
+                    self._pos += 1
+                    continue
+                match = _STRING_END[self._quote].search(text, self._pos)
+                if not match:
+                    self._pos = length
+                    return None
+                self._pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._quote = None
+                continue
+
+            match = _STRUCTURE.search(text, self._pos)
+            if not match:
+                self._pos = length
+                return None
+            ch = match.group()
+            self._pos = match.end()
+            if len(ch) > 1:
+                continue
+            if ch == '"' or ch == "'":
+                # The string does not close within the text seen so far
+                self._quote = ch
+            elif ch == "{" or ch == "[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = self._pos
+                    return self.end
+
+        return None
+
+    def _skip_preamble(self, text: str) -> bool:
+        """Advance through text before the object; False means wait for more input."""
+        if self._in_think:
+            close = text.find(THINK_CLOSE, self._pos)
+            if close < 0:
+                # Keep a possibly split closing tag in view for the next chunk
+                self._pos = max(self._pos, len(text) - len(THINK_CLOSE) + 1)
+                return False
+            self._pos = close + len(THINK_CLOSE)
+            self._in_think = False
+            return True
+
+        match = self._preamble.search(text, self._pos)
+        if not match:
+            self._pos = len(text)
+            return False
+        self._pos = match.start()
+        if match.group() == "<":
+            remainder = text[self._pos : self._pos + len(THINK_OPEN)]
+            if remainder == THINK_OPEN:
+                self._in_think = True
+                self._pos += len(THINK_OPEN)
+                return True
+            if THINK_OPEN.startswith(remainder):
+                # Partial "<think" at the end of the buffer
+                return False
+        else:
+            self.start = self._pos
+            self._depth = 1
+        self._pos += 1
+        return True
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def object_text(self) -> Optional[str]:
+        """The text of the completed object, or None if it has not closed yet."""
+        if self.start is None or self.end is None:
+            return None
+        return self.text[self.start : self.end]
+
+
+_THINK_BLOCK = re.compile(r"<think>.*?(</think>|$)", re.DOTALL)
+
+# Cut points tried when the closed text still does not decode
+MAX_REPAIR_CUTS = 20
+
+# Strings (either quote), trailing commas and Python constants, left to right
+_JSON_LIKE_TOKEN = re.compile(
+    r'"[^"\\]*(?:\\.[^"\\]*)*"'
+    r"|'[^'\\]*(?:\\.[^'\\]*)*'"
+    r"|,(?=\s*[}\]])"
+    r"|\b(?:True|False|None)\b",
+    re.DOTALL,
+)
+# Accepts raw newlines and other control characters inside strings
+_LENIENT_DECODER = json.JSONDecoder(strict=False)
+_PYTHON_CONSTANTS = {"True": "true", "False": "false", "None": "null"}
+_SINGLE_QUOTED_ESCAPE = re.compile(r'\\.|"', re.DOTALL)
+# In a single-quoted string \' is a plain quote and " needs escaping for JSON
+_SINGLE_QUOTED_REWRITES = {"\\'": "'", '"': '\\"'}
+
+
+def _rewrite_token(match) -> str:
+    token = match.group(0)
+    if token[0] == '"':
+        return token
+    if token[0] == "'":
+        body = token[1:-1]
+        if "\\" in body or '"' in body:
+            body = _SINGLE_QUOTED_ESCAPE.sub(
+                lambda m: _SINGLE_QUOTED_REWRITES.get(m.group(0), m.group(0)), body
+            )
+        return '"' + body + '"'
+    if token == ",":
+        return ""
+    return _PYTHON_CONSTANTS[token]
+
+
+def normalize_json_like(text: str) -> str:
+    """Rewrite Python-literal style text as JSON in one pass.
+
+    Single-quoted strings become double-quoted, True/False/None become their
+    JSON spellings and trailing commas are dropped; double-quoted strings are
+    copied unchanged.
+    """
+    return _JSON_LIKE_TOKEN.sub(_rewrite_token, text)
+
+
+def decode_json_like(text: str) -> Any:
+    """Decode JSON, tolerating raw control characters in strings and Python literals.
+
+    Raises ValueError if the text does not decode either way.
+    """
+    try:
+        return _LENIENT_DECODER.decode(text)
+    except ValueError:
+        return _LENIENT_DECODER.decode(normalize_json_like(text))
+
+
+def value_start(text: str, openers: str = "{") -> Optional[int]:
+    """Offset of the first opener outside ``<think>`` blocks, or None."""
+    pattern = re.compile(re.escape(THINK_OPEN) + "|[" + re.escape(openers) + "]")
+    pos = 0
+    while True:
+        match = pattern.search(text, pos)
+        if not match:
+            return None
+        if match.group() != THINK_OPEN:
+            return match.start()
+        close = text.find(THINK_CLOSE, match.end())
+        if close < 0:
+            return None
+        pos = close + len(THINK_CLOSE)
+
+
+def extract_json(text: str, openers: str = "{") -> Any:
+    """Decode the first top-level JSON value in raw model output.
+
+    ``<think>`` blocks, code fences and prose before or after the value are
+    skipped. Raises ValueError if there is no complete value or it does not
+    decode.
+    """
+    text = text or ""
+    start = value_start(text, openers)
+    if start is None:
+        raise ValueError("No JSON object in model output")
+
+    # The decoder finds the end of the value itself, so whatever follows it
+    # (closing code fence, prose) is never looked at
+    try:
+        return _LENIENT_DECODER.raw_decode(text, start)[0]
+    except ValueError:
+        return _LENIENT_DECODER.raw_decode(normalize_json_like(text[start:]))[0]
+
+
+def _close_structure(text: str) -> str:
+    """Close open strings and brackets, dropping stray closers and trailing commas."""
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    escape = False
+
+    for ch in text:
+        if quote:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == quote:
+                quote = None
+            continue
+
+        if ch == '"' or ch == "'":
+            quote = ch
+        elif ch == "{" or ch == "[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch == "}" or ch == "]":
+            if ch not in stack:
+                continue
+            while stack[-1] != ch:
+                _strip_trailing_separator(out)
+                out.append(stack.pop())
+            _strip_trailing_separator(out)
+            stack.pop()
+            out.append(ch)
+            if not stack:
+                break
+            continue
+        out.append(ch)
+
+    if quote:
+        if escape:
+            out.pop()
+        out.append(quote)
+    while stack:
+        _strip_trailing_separator(out)
+        out.append(stack.pop())
+    return "".join(out)
+
+
+def _strip_trailing_separator(out: List[str]) -> None:
+    """Remove whitespace, a dangling comma or a dangling colon before a closer."""
+    while out and (out[-1].isspace() or out[-1] in ",:"):
+        out.pop()
+
+
+def _cut_points(text: str) -> List[int]:
+    """Offsets of commas outside strings, last first: element boundaries to cut back to."""
+    points = []
+    quote = None
+    escape = False
+    for index, ch in enumerate(text):
+        if quote:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == quote:
+                quote = None
+        elif ch == '"' or ch == "'":
+            quote = ch
+        elif ch == ",":
+            points.append(index)
+    return points[::-1][:MAX_REPAIR_CUTS]
+
+
+def repair_json_text(text: str) -> Optional[Any]:
+    """Best-effort deterministic repair of a malformed or truncated JSON object.
+
+    Returns the decoded object, or None if no repair decodes.
+    """
+    text = _THINK_BLOCK.sub("", text or "")
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+
+    # The whole text first, then shorter prefixes ending before a comma, which
+    # drops a dangling key or a half-written element
+    for end in [len(text)] + _cut_points(text):
+        try:
+            repaired = decode_json_like(_close_structure(text[:end]))
+        except (ValueError, RecursionError):
+            continue
+        if isinstance(repaired, dict):
+            return repaired
+    return None
@@ -0,0 +1,285 @@
+"""
+Corpus, fuzz and timing benchmark for the judge output parser.
+
+The reports in ``results/r*`` keep the parsed analyses, not the raw answers,
+so the corpus re-renders every stored analysis in the shapes judge models
+actually answer with: compact and pretty JSON, Python literals (single
+quotes), ``<think>`` preambles, code fences, prose before or after the
+object, trailing commas and raw newlines inside strings. Each entry keeps
+the analysis it should decode to.
+
+The benchmark runs the previous ``ast.literal_eval`` based parser and
+``json_extract.extract_json`` over the corpus and over random mutations of
+it, and reports correct decodes, wrong decodes, failures, unexpected
+exception types and time per parse.
+
+Usage:
+    # Build the corpus from the stored results
+    python src/laj/json_extract_bench.py --results ./results --corpus ./results/json_corpus.jsonl
+
+    # Benchmark an existing corpus with 5000 fuzzed variants
+    python src/laj/json_extract_bench.py --corpus ./results/json_corpus.jsonl --fuzz 5000
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+
+from json_extract import extract_json
+
+ANALYSIS_KEYS = ("coverage_percentage", "covered", "gaps", "recommendations")
+# Exceptions a parser is allowed to raise on bad input
+EXPECTED_ERRORS = (ValueError, SyntaxError)
+
+
+def load_analyses(results_dir: str, limit: Optional[int] = None) -> List[Dict]:
+    """Parsed analyses of completed outputs in results_dir/r*/<model>/benchmark_result_*.json"""
+    paths = sorted(
+        glob.glob(os.path.join(results_dir, "r*", "*", "benchmark_result_*.json"))
+    )
+    analyses = []
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                report = json.load(f)
+        except (OSError, ValueError):
+            continue
+        outputs = report.get("benchmark_results", {}).get("benchmark_output") or []
+        for output in outputs:
+            if output.get("status") != "completed":
+                continue
+            for analysis in output.get("coverage_analysis") or []:
+                analyses.append(
+                    {
+                        "source": os.path.relpath(path, results_dir),
+                        "analysis": {key: analysis.get(key) for key in ANALYSIS_KEYS},
+                    }
+                )
+                if limit and len(analyses) >= limit:
+                    return analyses
+    return analyses
+
+
+def _with_raw_newline(analysis: Dict):
+    """Text with an unescaped newline inside a string, and what it decodes to"""
+    expected = json.loads(json.dumps(analysis))
+    if expected["covered"]:
+        expected["covered"][0] = expected["covered"][0] + "\nDetails follow."
+    else:
+        expected["covered"] = ["Line one\nline two"]
+    return json.dumps(expected, indent=2).replace("\\n", "\n"), expected
+
+
+# name -> analysis -> (raw text, expected decode)
+RENDERINGS: Dict[str, Callable] = {
+    "json": lambda a: (json.dumps(a), a),
+    "json_pretty": lambda a: (json.dumps(a, indent=2), a),
+    "python_literal": lambda a: (repr(a), a),
+    "think_block": lambda a: (
+        "<think>\nCheck each guideline {category} against the scenarios.\n</think>\n"
+        + json.dumps(a, indent=2),
+        a,
+    ),
+    "code_fence": lambda a: ("```json\n" + json.dumps(a, indent=2) + "\n```", a),
+    "leading_prose": lambda a: (
+        "Here is the coverage analysis:\n\n" + json.dumps(a, indent=2),
+        a,
+    ),
+    "trailing_prose": lambda a: (
+        json.dumps(a) + "\n\nLet me know if you want the gaps turned into {scenarios}.",
+        a,
+    ),
+    "trailing_comma": lambda a: (
+        json.dumps(a, indent=2).replace("\n  ]", ",\n  ]"),
+        a,
+    ),
+    "raw_newline": _with_raw_newline,
+}
+
+
+def build_corpus(analyses: Iterable[Dict]) -> List[Dict]:
+    corpus = []
+    for item in analyses:
+        for rendering, render in RENDERINGS.items():
+            text, expected = render(item["analysis"])
+            corpus.append(
+                {
+                    "source": item["source"],
+                    "rendering": rendering,
+                    "text": text,
+                    "expected": expected,
+                }
+            )
+    return corpus
+
+
+def load_corpus(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_corpus(corpus: List[Dict], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in corpus:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def legacy_parse(analysis: str):
+    """The parser used before json_extract, kept for comparison"""
+    try:
+        return ast.literal_eval(analysis)
+    except (ValueError, SyntaxError):
+        analysis = analysis.replace("<think>", "").replace("</think>", "")
+        analysis = analysis.replace("\n", "")
+        analysis = analysis.strip()
+        if analysis.startswith("{") and not analysis.endswith("}}"):
+            analysis = analysis + "}"
+        return ast.literal_eval(analysis)
+
+
+PARSERS: Dict[str, Callable] = {
+    "legacy": legacy_parse,
+    "json_extract": extract_json,
+}
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    """One random corruption of the kind seen in real answers"""
+    position = rng.randrange(len(text) + 1)
+    kind = rng.choice(
+        ("truncate", "insert", "delete", "swap_quote", "prose", "duplicate")
+    )
+    if kind == "truncate":
+        return text[:position]
+    if kind == "insert":
+        return text[:position] + rng.choice("{}[],:'\"\\\n") + text[position:]
+    if kind == "delete":
+        return text[:position] + text[position + 1 :]
+    if kind == "swap_quote":
+        return text.replace('"', "'", rng.randint(1, 4))
+    if kind == "prose":
+        return "Sure! " + text + "\nHope this helps."
+    return text[:position] + text[position : position + 20] + text[position:]
+
+
+def run_benchmark(corpus: List[Dict], parsers: Dict[str, Callable]) -> Dict[str, Dict]:
+    """Correct/wrong/failed counts, crashes and timing of each parser over corpus"""
+    report = {}
+    for name, parse in parsers.items():
+        counts = Counter()
+        failed_by_rendering = defaultdict(int)
+        crashes = Counter()
+        started = time.perf_counter()
+        for entry in corpus:
+            try:
+                decoded = parse(entry["text"])
+            except EXPECTED_ERRORS:
+                counts["failed"] += 1
+                failed_by_rendering[entry["rendering"]] += 1
+                continue
+            except Exception as exc:
+                counts["failed"] += 1
+                crashes[type(exc).__name__] += 1
+                failed_by_rendering[entry["rendering"]] += 1
+                continue
+            if decoded == entry["expected"]:
+                counts["correct"] += 1
+            else:
+                counts["wrong"] += 1
+                failed_by_rendering[entry["rendering"]] += 1
+        elapsed = time.perf_counter() - started
+        report[name] = {
+            "entries": len(corpus),
+            "correct": counts["correct"],
+            "wrong": counts["wrong"],
+            "failed": counts["failed"],
+            "crashes": dict(crashes),
+            "microseconds_per_parse": elapsed / max(len(corpus), 1) * 1e6,
+            "misses_by_rendering": dict(failed_by_rendering),
+        }
+    return report
+
+
+def print_report(title: str, report: Dict[str, Dict]) -> None:
+    print(f"\n{title}")
+    print(
+        f"{'parser':<14} {'entries':>8} {'correct':>8} {'wrong':>6} {'failed':>7} {'us/parse':>9}"
+    )
+    for name, stats in report.items():
+        print(
+            f"{name:<14} {stats['entries']:>8} {stats['correct']:>8} {stats['wrong']:>6} "
+            f"{stats['failed']:>7} {stats['microseconds_per_parse']:>9.1f}"
+        )
+        if stats["crashes"]:
+            print(f"  unexpected exceptions: {stats['crashes']}")
+        if stats["misses_by_rendering"]:
+            print(f"  misses by rendering: {stats['misses_by_rendering']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a judge output corpus from results/r* and benchmark the parsers on it"
+    )
+    parser.add_argument(
+        "--results",
+        help="Results folder with r*/<model>/benchmark_result_*.json; builds (and overwrites) the corpus",
+    )
+    parser.add_argument(
+        "--corpus",
+        default="./results/json_corpus.jsonl",
+        help="Corpus JSONL file (default: ./results/json_corpus.jsonl)",
+    )
+    parser.add_argument(
+        "--limit", type=int, help="Use at most this many stored analyses"
+    )
+    parser.add_argument(
+        "--fuzz",
+        type=int,
+        default=2000,
+        help="Number of mutated corpus entries to run (default: 2000, 0 to skip)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Fuzz seed (default: 0)")
+    parser.add_argument("--output", help="Also write the benchmark report as JSON")
+    args = parser.parse_args()
+
+    if args.results:
+        corpus = build_corpus(load_analyses(args.results, args.limit))
+        save_corpus(corpus, args.corpus)
+        print(f"Wrote {len(corpus)} corpus entries to {args.corpus}")
+    else:
+        corpus = load_corpus(args.corpus)
+
+    if not corpus:
+        print("Corpus is empty")
+        return
+
+    reports = {"corpus": run_benchmark(corpus, PARSERS)}
+    print_report("Corpus", reports["corpus"])
+
+    if args.fuzz > 0:
+        rng = random.Random(args.seed)
+        fuzzed = []
+        for _ in range(args.fuzz):
+            entry = rng.choice(corpus)
+            fuzzed.append(dict(entry, text=mutate(entry["text"], rng)))
+        reports["fuzz"] = run_benchmark(fuzzed, PARSERS)
+        # A mutation inside a string or number legitimately changes the
+        # decoded value, so "wrong" is expected here; crashes are not
+        print_report(f"Fuzz ({args.fuzz} mutations, seed {args.seed})", reports["fuzz"])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Per-model counters for judge call outcomes.
+
+Counts events such as completed calls and parse failures per model so failure
+rates can be reported in the folder summary alongside the accuracy metrics.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict
+
+_counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+_lock = threading.Lock()
+
+
+def record_event(model: str, event: str, count: int = 1) -> None:
+    """Increment the ``event`` counter for ``model``."""
+    with _lock:
+        _counters[model][event] += count
+
+
+def get_judge_stats() -> Dict[str, Dict]:
+    """Return the counters per model, with a parse failure rate where defined."""
+    with _lock:
+        snapshot = {model: dict(events) for model, events in _counters.items()}
+
+    for events in snapshot.values():
+        parsed = events.get("parsed", 0)
+        failures = events.get("parse_failures", 0)
+        if parsed + failures:
+            events["parse_failure_rate"] = failures / (parsed + failures)
+    return snapshot
+
+
+def reset_judge_stats() -> None:
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,186 @@
+"""
+Process-wide registry of pooled OpenAI clients.
+
+Creating an ``openai.OpenAI`` per evaluation builds a new httpx transport each
+time, so every request pays TCP+TLS setup again. Clients here are created lazily
+and cached per (base_url, api_key, ssl mode); all evaluations in the process
+share their connection pools. Each client counts requests sent and connections
+opened so the keep-alive win can be checked from the folder summary.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from coverage_config import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    env_flag,
+)
+
+# httpx and openai are imported on the first client, not with this module
+if TYPE_CHECKING:
+    import openai
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+
+@dataclass
+class pool_stats:
+    base_url: str
+    verify_ssl: bool
+    http2: bool
+    requests_sent: int = 0
+    connections_opened: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(0, self.requests_sent - self.connections_opened)
+
+    def to_dict(self):
+        data = asdict(self)
+        data["connections_reused"] = self.connections_reused
+        return data
+
+
+_ClientKey = Tuple[Optional[str], str, bool]
+
+_clients: Dict[_ClientKey, "openai.OpenAI"] = {}
+_stats: Dict[_ClientKey, pool_stats] = {}
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _make_trace(stats: pool_stats):
+    """Build an httpcore trace callback that counts new connections and requests."""
+
+    def trace(event_name: str, info: Dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            with _lock:
+                stats.connections_opened += 1
+        elif event_name in (
+            "http11.send_request_headers.started",
+            "http2.send_request_headers.started",
+        ):
+            with _lock:
+                stats.requests_sent += 1
+
+    return trace
+
+
+def _build_http_client(verify_ssl: bool, http2: bool, stats: pool_stats):
+    import httpx
+    import openai
+
+    keepalive_connections = (
+        0 if env_flag("HTTP_DISABLE_KEEPALIVE") else HTTP_MAX_KEEPALIVE_CONNECTIONS
+    )
+    trace = _make_trace(stats)
+
+    def attach_trace(request: "httpx.Request") -> None:
+        request.extensions["trace"] = trace
+
+    return openai.DefaultHttpxClient(
+        verify=verify_ssl,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=keepalive_connections,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks={"request": [attach_trace]},
+    )
+
+
+def get_openai_client(
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    verify_ssl: Optional[bool] = None,
+) -> "openai.OpenAI":
+    """Return the shared client for the given endpoint, creating it on first use."""
+
+    base_url = base_url if base_url is not None else OPENAI_BASE_URL
+    api_key = api_key if api_key is not None else OPENAI_API_KEY
+    if verify_ssl is None:
+        verify_ssl = not os.getenv("DISABLE_SSL_VERIFY")
+
+    key = (base_url, api_key, verify_ssl)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+
+        if not verify_ssl:
+            # Disable SSL warnings
+            import urllib3
+
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        http2 = env_flag("HTTP2")
+        if http2 and not _http2_available():
+            logger.warning("HTTP2 requested but the 'h2' package is not installed")
+            http2 = False
+
+        stats = pool_stats(
+            base_url=base_url or "default", verify_ssl=verify_ssl, http2=http2
+        )
+        import openai
+
+        client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=_build_http_client(verify_ssl, http2, stats),
+        )
+        _clients[key] = client
+        _stats[key] = stats
+        logger.debug(f"Created pooled OpenAI client for {stats.base_url}")
+
+    return client
+
+
+def get_pool_stats() -> Dict:
+    """Aggregate connection statistics across all pooled clients."""
+    with _lock:
+        per_client = [stats.to_dict() for stats in _stats.values()]
+
+    requests_sent = sum(stats["requests_sent"] for stats in per_client)
+    connections_opened = sum(stats["connections_opened"] for stats in per_client)
+    return {
+        "clients": len(per_client),
+        "requests_sent": requests_sent,
+        "connections_opened": connections_opened,
+        "connections_reused": max(0, requests_sent - connections_opened),
+        "per_client": per_client,
+    }
+
+
+def close_all_clients() -> None:
+    """Close every pooled client and forget it; the next call creates a fresh one."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _stats.clear()
+
+    for client in clients:
+        try:
+            client.close()
+        except Exception as exc:
+            logger.debug(f"Error closing OpenAI client: {exc}")
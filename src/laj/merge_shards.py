@@ -0,0 +1,338 @@
+"""
+Merge the partial summaries of a sharded folder analysis.
+
+Each host runs ``analyze_gherkin_folder.py --shard i/N`` and writes a
+``shard_summary_<i>of<N>_<timestamp>.json`` next to its reports. This command
+takes the latest partial summary of every shard from one or more folders and
+writes a single ``folder_coverage_summary_<timestamp>.json`` with the same
+schema as a single-host run, so ``eval_laj_run`` reads it unchanged:
+
+- results are de-duplicated by Jira ID (a completed judgment beats a failed
+  one, then the latest wins) and the file, failure, skip and cache-hit counts
+  are recomputed from them, so a story judged on two hosts counts once
+- earlier rounds of a shard (partial summaries older than the latest) that
+  no previous merge covered are carried into ``total_attempts``, as
+  ``eval_laj_run`` counts them for separate folder summaries: a file that
+  failed in round 1 and passed in round 2 counts 2 attempts whether or not
+  round 1 was merged on its own
+- the cascade, static triage and scenario retrieval sections are recomputed
+  from the merged results
+- per-process statistics (HTTP pool, rate limits, caches, judge stats) are
+  added up across shards; rates and means are averaged
+
+    python src/laj/merge_shards.py results/r1/gpt-4o
+    python src/laj/merge_shards.py host1/out host2/out --output results/r1/gpt-4o
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Set, Tuple
+
+from analyze_gherkin_folder import (
+    save_folder_summary,
+    summarize_cascade,
+    summarize_scenario_retrieval,
+    summarize_static_triage,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+SHARD_SUMMARY_PATTERN = "shard_summary_*of*_*.json"
+_SHARD_FILE = re.compile(r"shard_summary_(\d+)of(\d+)_")
+
+# Per-process sections, added up across shards
+PROCESS_SECTIONS = (
+    "http_pool",
+    "rate_limits",
+    "response_cache",
+    "judge_stats",
+    "gherkin_cache",
+    "run_manifest",
+    "progress_journal",
+    "batch_job",
+)
+SUCCESS_STATUSES = ("completed", "cached")
+
+
+def find_shard_summaries(folders: List[str]) -> Dict[int, List[Tuple[str, Dict]]]:
+    """Partial summaries of each shard index found in ``folders``, oldest first"""
+    rounds: Dict[int, List[Tuple[str, Dict]]] = {}
+    counts = set()
+    for folder in folders:
+        for path in glob.glob(os.path.join(folder, SHARD_SUMMARY_PATTERN)):
+            if not _SHARD_FILE.match(os.path.basename(path)):
+                continue
+            try:
+                with open(path, "r") as f:
+                    summary = json.load(f)
+            except (OSError, json.JSONDecodeError) as exc:
+                logger.warning(f"Skipping unreadable shard summary {path}: {exc}")
+                continue
+            shard = summary.get("shard") or {}
+            index = shard.get("index")
+            if index is None:
+                continue
+            counts.add(shard.get("count"))
+            rounds.setdefault(index, []).append((path, summary))
+
+    if len(counts) > 1:
+        raise ValueError(f"Shard summaries disagree on the shard count: {sorted(counts)}")
+    for found in rounds.values():
+        found.sort(key=lambda entry: entry[1].get("analysis_timestamp", ""))
+    return rounds
+
+
+def merged_shard_files(folder: str) -> Set[str]:
+    """Names of the partial summaries earlier merges in ``folder`` already used"""
+    merged = set()
+    for path in glob.glob(os.path.join(folder, "folder_coverage_summary_*.json")):
+        try:
+            with open(path, "r") as f:
+                shard = json.load(f).get("shard") or {}
+        except (OSError, json.JSONDecodeError):
+            continue
+        for entry in shard.get("merged") or []:
+            merged.add(os.path.basename(entry.get("summary_file") or ""))
+    return merged
+
+
+def carry_earlier_attempts(results: List[Dict], earlier: List[Dict]) -> int:
+    """Add the attempts of unmerged earlier rounds to ``total_attempts``
+
+    ``earlier`` are the partial summaries, oldest first. Per Jira ID the
+    failed attempts since the last earlier success are added, the way
+    ``eval_laj_run`` counts consecutive folder summaries. Returns the
+    attempts carried.
+    """
+    history: Dict[str, List[Dict]] = {}
+    for summary in earlier:
+        for result in summary.get("results", []):
+            history.setdefault(result_key(result), []).append(result)
+
+    carried = 0
+    for result in results:
+        previous = history.get(result_key(result))
+        if not previous:
+            continue
+        attempts = result.get("total_attempts") or 1
+        for attempt in reversed(previous):
+            if attempt.get("status") != "failed":
+                break
+            attempts += attempt.get("total_attempts") or 1
+        carried += attempts - (result.get("total_attempts") or 1)
+        result["total_attempts"] = attempts
+    return carried
+
+
+def combine_stats(values: List, key: str = ""):
+    """Add up per-process statistics: numbers summed (rates and means
+    averaged), lists concatenated, dicts combined key by key"""
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    if all(isinstance(value, list) for value in values):
+        return [item for value in values for item in value]
+    if all(isinstance(value, dict) for value in values):
+        keys = list(dict.fromkeys(name for value in values for name in value))
+        return {
+            name: combine_stats([value.get(name) for value in values], name)
+            for name in keys
+        }
+    if all(
+        isinstance(value, (int, float)) and not isinstance(value, bool) for value in values
+    ):
+        if "rate" in key or "mean" in key or "average" in key:
+            return sum(values) / len(values)
+        return sum(values)
+    return values[0]
+
+
+def result_key(result: Dict) -> str:
+    jira_id = result.get("jira_id")
+    return f"jira:{jira_id}" if jira_id is not None else f"file:{result.get('file_path')}"
+
+
+def result_rank(result: Dict) -> tuple:
+    """Completed judgments first, then anything but a skip, then the latest"""
+    status = result.get("status")
+    return (
+        status in SUCCESS_STATUSES,
+        status != "skipped",
+        result.get("analysis_time") or "",
+    )
+
+
+def dedupe_results(results: List[Dict]) -> List[Dict]:
+    chosen: Dict[str, Dict] = {}
+    for result in results:
+        key = result_key(result)
+        known = chosen.get(key)
+        if known is None or result_rank(result) > result_rank(known):
+            chosen[key] = result
+    return sorted(chosen.values(), key=lambda result: result.get("file_path") or "")
+
+
+def merge_shard_summaries(
+    summaries: List[Dict], shard_files: List[str], earlier: Tuple[Dict, ...] = ()
+) -> Dict:
+    """One folder summary from the latest partial summary of every shard
+
+    ``earlier`` holds older, not yet merged partial summaries (oldest first)
+    whose attempts are carried into the merged results.
+    """
+    first = summaries[0]
+    models = {summary["model_config"]["model"] for summary in summaries}
+    if len(models) > 1:
+        raise ValueError(f"Shard summaries were judged by different models: {sorted(models)}")
+
+    model_config = first["shard"]["model_config"]
+    results = dedupe_results(
+        [result for summary in summaries for result in summary.get("results", [])]
+    )
+    duplicates = sum(len(summary.get("results", [])) for summary in summaries) - len(results)
+    if duplicates:
+        logger.info(f"Dropped {duplicates} results judged on more than one shard")
+    carried = carry_earlier_attempts(results, list(earlier))
+    if carried:
+        logger.info(f"Carried {carried} attempts from {len(earlier)} earlier shard rounds")
+
+    statuses = [result.get("status") for result in results]
+    merged = {
+        "analysis_timestamp": datetime.datetime.now().isoformat(),
+        "folder_path": first.get("folder_path"),
+        "file_pattern": first.get("file_pattern"),
+        "recursive_search": first.get("recursive_search"),
+        "total_files": len(results),
+        "analyzed_files": len(
+            [status for status in statuses if status not in ("failed", "skipped")]
+        ),
+        "failed_files": statuses.count("failed"),
+        "skipped_files": statuses.count("skipped"),
+        "cache_hits": statuses.count("cached"),
+        "input_changes": combine_stats(
+            [summary.get("input_changes") for summary in summaries]
+        ),
+        "average_coverage": 0,
+        "model_config": first["model_config"],
+    }
+    for section in PROCESS_SECTIONS:
+        merged[section] = combine_stats([summary.get(section) for summary in summaries])
+
+    index_stats = combine_stats(
+        [(summary.get("scenario_retrieval") or {}).get("index") for summary in summaries]
+    )
+    merged.update(
+        {
+            "cascade": summarize_cascade(results, model_config["cascade_models"]),
+            "static_triage": summarize_static_triage(results, model_config),
+            "scenario_retrieval": summarize_scenario_retrieval(
+                results, model_config, index_stats
+            ),
+            "shard": {
+                "count": first["shard"]["count"],
+                "earlier_rounds": len(earlier),
+                "carried_attempts": carried,
+                "merged": [
+                    {
+                        "index": summary["shard"]["index"],
+                        "files": summary["shard"]["files"],
+                        "summary_file": path,
+                    }
+                    for summary, path in zip(summaries, shard_files)
+                ],
+            },
+            "results": results,
+        }
+    )
+
+    successful_results = [
+        result
+        for result in results
+        if result["status"] in SUCCESS_STATUSES and "coverage_percentage" in result
+    ]
+    if successful_results:
+        merged["average_coverage"] = sum(
+            result["coverage_percentage"] for result in successful_results
+        ) / len(successful_results)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge the partial summaries of a sharded folder analysis into one folder summary"
+    )
+    parser.add_argument(
+        "folders", nargs="+", help="Output folders holding shard_summary_*.json files"
+    )
+    parser.add_argument(
+        "--output", help="Folder for the merged summary (default: the first folder)"
+    )
+    parser.add_argument(
+        "--allow-missing",
+        action="store_true",
+        help="Merge even when some shards have no partial summary",
+    )
+    args = parser.parse_args()
+
+    try:
+        found = find_shard_summaries(args.folders)
+    except ValueError as exc:
+        logger.error(str(exc))
+        sys.exit(1)
+    if not found:
+        logger.error(f"No shard summaries found in {', '.join(args.folders)}")
+        sys.exit(1)
+
+    count = next(iter(found.values()))[-1][1]["shard"]["count"]
+    missing = [index for index in range(1, count + 1) if index not in found]
+    if missing and not args.allow_missing:
+        logger.error(
+            f"Missing shards {', '.join(f'{index}/{count}' for index in missing)} "
+            "(use --allow-missing to merge anyway)"
+        )
+        sys.exit(1)
+
+    output = args.output or args.folders[0]
+    already_merged = merged_shard_files(output)
+    ordered = [found[index][-1] for index in sorted(found)]
+    earlier = []
+    for index in found:
+        rounds = found[index][:-1]
+        # A merged round already carried everything before it
+        for position, (path, _) in enumerate(rounds):
+            if os.path.basename(path) in already_merged:
+                rounds = found[index][position + 1 : -1]
+        earlier.extend(rounds)
+    earlier.sort(key=lambda entry: entry[1].get("analysis_timestamp", ""))
+    try:
+        merged = merge_shard_summaries(
+            [summary for _, summary in ordered],
+            [path for path, _ in ordered],
+            tuple(summary for _, summary in earlier),
+        )
+    except ValueError as exc:
+        logger.error(str(exc))
+        sys.exit(1)
+
+    os.makedirs(output, exist_ok=True)
+    save_folder_summary(merged, output)
+    logger.info(
+        f"Merged {len(ordered)}/{count} shards: {merged['total_files']} files, "
+        f"{merged['analyzed_files']} analyzed, {merged['failed_files']} failed, "
+        f"average coverage {merged['average_coverage']:.2f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
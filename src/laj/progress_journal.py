@@ -0,0 +1,199 @@
+"""
+Crash-safe progress journal of a folder analysis.
+
+The folder summary is written once, at the end of a run. Until then the
+journal holds the run's progress in ``.progress_journal.jsonl`` in the output
+folder. It is append-only JSON Lines: a ``start`` event with the run's key
+(folder, judge settings, shard), one ``file`` event with the summary entry of
+each file as it completes, and an ``end`` event once the summary is written.
+
+Writes are flushed to the OS right away and fsynced in batches (every
+``JOURNAL_FSYNC_EVERY`` events or ``JOURNAL_FSYNC_SECONDS``), and on
+``flush()``/``close()``. A power loss can lose at most the last batch, and a
+torn last line is ignored on replay.
+
+``--resume`` replays the journal of an unfinished run with the same key:
+every file that completed is taken as done, reading only the journal, and the
+run continues in the same journal. A new run (or a finished or different
+one) starts a fresh journal; the run manifest keeps the long-term history.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from coverage_config import JOURNAL_FSYNC_EVERY, JOURNAL_FSYNC_SECONDS
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+JOURNAL_FILE_NAME = ".progress_journal.jsonl"
+
+# Results replayed on resume; failed files are judged again
+RESUMABLE_STATUSES = ("completed", "cached", "skipped")
+
+
+def journal_path(output_dir: str, shard=None) -> str:
+    """Journal of ``output_dir``; shards sharing a folder get one each"""
+    if shard:
+        name = f".progress_journal_{shard[0]}of{shard[1]}.jsonl"
+    else:
+        name = JOURNAL_FILE_NAME
+    return os.path.join(output_dir, name)
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def read_events(path: str):
+    """Events of a journal, skipping a torn or unreadable line"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring a torn line in {path}")
+    except FileNotFoundError:
+        return
+
+
+class progress_journal:
+    """Append-only JSON Lines journal with batched fsync."""
+
+    def __init__(
+        self,
+        path: str,
+        fsync_every: int = JOURNAL_FSYNC_EVERY,
+        fsync_seconds: float = JOURNAL_FSYNC_SECONDS,
+    ):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_seconds = fsync_seconds
+        self.run_id: Optional[str] = None
+        self._file = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.stats = {"events": 0, "fsyncs": 0, "replayed": 0}
+
+    def start(self, run_key: Dict) -> None:
+        """Begin a new run, replacing the journal of the previous one."""
+        self.run_id = uuid.uuid4().hex
+        self._open("w")
+        self._append({"event": "start", "run_id": self.run_id, "run_key": run_key})
+        self.flush()
+
+    def resume(self, run_key: Dict) -> Dict[str, Dict]:
+        """``file`` events by file path of the unfinished run with ``run_key``
+
+        Starts a new run (and returns nothing) when the journal is missing,
+        finished, or belongs to a different run key.
+        """
+        start = None
+        done: Dict[str, Dict] = {}
+        finished = False
+        for event in read_events(self.path):
+            kind = event.get("event")
+            if kind == "start":
+                start, done, finished = event, {}, False
+            elif kind == "file" and start:
+                result = event.get("result") or {}
+                if result.get("status") in RESUMABLE_STATUSES:
+                    done[result.get("file_path")] = event
+                else:
+                    done.pop(result.get("file_path"), None)
+            elif kind == "end":
+                finished = True
+
+        if not start or finished or start.get("run_key") != run_key:
+            reason = (
+                "no journal"
+                if not start
+                else "the last run finished" if finished else "the last run used other settings"
+            )
+            logger.info(f"Nothing to resume ({reason}); starting a new run")
+            self.start(run_key)
+            return {}
+
+        self.run_id = start["run_id"]
+        self._open("a")
+        if self._file.tell() and not _ends_with_newline(self.path):
+            # End the torn last line so the next event starts on its own
+            self._file.write("\n")
+        self._append({"event": "resume", "run_id": self.run_id, "done": len(done)})
+        self.flush()
+        self.stats["replayed"] = len(done)
+        logger.info(f"Resuming run {self.run_id}: {len(done)} files already done")
+        return done
+
+    def record(self, result: Dict, input_change: Optional[str] = None) -> None:
+        """Append the summary entry of a completed file."""
+        if result:
+            self._append(
+                {
+                    "event": "file",
+                    "run_id": self.run_id,
+                    "input_change": input_change,
+                    "result": result,
+                }
+            )
+
+    def finish(self, summary_file: Optional[str]) -> None:
+        self._append({"event": "end", "run_id": self.run_id, "summary_file": summary_file})
+        self.close()
+
+    def _open(self, mode: str) -> None:
+        self.close()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, mode, encoding="utf-8")
+
+    def _append(self, event: Dict) -> None:
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            self.stats["events"] += 1
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_seconds
+            ):
+                self._sync()
+
+    def _sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self.stats["fsyncs"] += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self) -> None:
+        """Write everything recorded so far to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+                self._file = None
+
+    def summary(self) -> Dict:
+        return dict(self.stats, path=self.path, run_id=self.run_id)
@@ -0,0 +1,289 @@
+"""
+Adaptive per-model rate limiting for LLM calls.
+
+Each model gets a pair of token buckets: one for requests per minute and one for
+tokens per minute. A call reserves one request and its estimated prompt tokens
+before it is sent, waiting if either bucket is in deficit. Responses feed back
+``x-ratelimit-*`` headers so the buckets track the provider's real budget, and
+``Retry-After`` on a 429 pauses every caller of that model until it expires.
+"""
+
+import email.utils
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Mapping, Optional
+
+from coverage_config import RATE_LIMIT_RPM, RATE_LIMIT_TPM, RATE_LIMITS_PATH
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+# Rough prompt size estimate used before the provider reports real usage
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def estimate_prompt_tokens(messages: List[Dict]) -> int:
+    """Estimate prompt tokens from message text without loading a tokenizer."""
+    total = 0
+    for message in messages:
+        content = message.get("content") or ""
+        total += len(content) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+    return total
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset durations such as '1s', '6m0s' or '20ms' into seconds."""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    seconds = 0.0
+    matched = False
+    for amount, unit in _DURATION_PART.findall(value):
+        matched = True
+        amount = float(amount)
+        if unit == "ms":
+            seconds += amount / 1000
+        elif unit == "s":
+            seconds += amount
+        elif unit == "m":
+            seconds += amount * 60
+        elif unit == "h":
+            seconds += amount * 3600
+    return seconds if matched else None
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Return the Retry-After delay in seconds, if the response carries one."""
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class token_bucket:
+    """Reservation-style token bucket; capacity <= 0 means unlimited."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self, now: float) -> None:
+        if self.unlimited:
+            return
+        rate = self.capacity / 60.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` tokens and return how long the caller must wait."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / (self.capacity / 60.0)
+
+    def adjust(self, amount: float, now: float) -> None:
+        """Give back (positive) or charge (negative) tokens after the fact."""
+        if self.unlimited:
+            return
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float], now: float):
+        """Align the bucket with the limit/remaining values reported by the provider."""
+        if limit is not None and limit > 0:
+            if self.unlimited or limit != self.capacity:
+                logger.debug(f"Adapting bucket capacity {self.capacity} -> {limit}")
+                if self.unlimited:
+                    self.tokens = limit
+                self.capacity = float(limit)
+                self.updated = now
+        if remaining is not None and not self.unlimited:
+            self._refill(now)
+            self.tokens = min(self.tokens, float(remaining))
+
+
+@dataclass
+class rate_limit_stats:
+    model: str
+    rpm: float
+    tpm: float
+    requests: int = 0
+    throttled_requests: int = 0
+    total_wait_seconds: float = 0.0
+    rate_limit_errors: int = 0
+
+
+class rate_limiter:
+    """Requests-per-minute and tokens-per-minute budget for a single model."""
+
+    def __init__(self, model: str, rpm: float = 0, tpm: float = 0):
+        self.model = model
+        self.requests = token_bucket(rpm)
+        self.tokens = token_bucket(tpm)
+        self.blocked_until = 0.0
+        self.stats = rate_limit_stats(model=model, rpm=rpm, tpm=tpm)
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until a request of ``estimated_tokens`` fits the budget."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self.requests.reserve(1, now),
+                self.tokens.reserve(estimated_tokens, now),
+                self.blocked_until - now,
+            )
+            self.stats.requests += 1
+            if wait > 0:
+                self.stats.throttled_requests += 1
+                self.stats.total_wait_seconds += wait
+
+        if wait > 0:
+            logger.debug(f"Rate limiting {self.model}: waiting {wait:.2f}s")
+            time.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the real usage is known."""
+        if actual_tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(estimated_tokens - actual_tokens, time.monotonic())
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Adapt to ``x-ratelimit-*`` and ``Retry-After`` response headers."""
+        if not headers:
+            return
+
+        def header_float(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        with self._lock:
+            now = time.monotonic()
+            self.requests.sync(
+                header_float("x-ratelimit-limit-requests"),
+                header_float("x-ratelimit-remaining-requests"),
+                now,
+            )
+            self.tokens.sync(
+                header_float("x-ratelimit-limit-tokens"),
+                header_float("x-ratelimit-remaining-tokens"),
+                now,
+            )
+            self.stats.rpm = self.requests.capacity
+            self.stats.tpm = self.tokens.capacity
+
+            retry_after = parse_retry_after(headers)
+            if retry_after is None:
+                # Nothing left in a bucket: hold off until the provider resets it
+                for remaining, reset in (
+                    ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+                    ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+                ):
+                    if header_float(remaining) == 0:
+                        retry_after = max(
+                            retry_after or 0.0,
+                            parse_reset_duration(headers.get(reset)) or 0.0,
+                        )
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def record_rate_limit_error(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Handle a 429: honour Retry-After, or back off for a second by default."""
+        with self._lock:
+            self.stats.rate_limit_errors += 1
+        self.update_from_headers(headers)
+        if not headers or parse_retry_after(headers) is None:
+            with self._lock:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + 1.0)
+
+
+_limiters: Dict[str, rate_limiter] = {}
+_registry_lock = threading.Lock()
+_model_limits: Optional[Dict[str, Dict]] = None
+
+
+def load_model_limits() -> Dict[str, Dict]:
+    """Load per-model {"rpm": ..., "tpm": ...} budgets from RATE_LIMITS_PATH."""
+    global _model_limits
+    if _model_limits is not None:
+        return _model_limits
+
+    _model_limits = {}
+    if RATE_LIMITS_PATH:
+        try:
+            with open(RATE_LIMITS_PATH, "r") as limits_file:
+                _model_limits = json.load(limits_file)
+            logger.info(
+                f"Loaded rate limits for {len(_model_limits)} models from {RATE_LIMITS_PATH}"
+            )
+        except Exception as exc:
+            logger.warning(f"Unable to load rate limits {RATE_LIMITS_PATH}: {exc}")
+    return _model_limits
+
+
+def get_rate_limiter(model: str) -> rate_limiter:
+    """Return the shared limiter for ``model``, creating it on first use."""
+    limiter = _limiters.get(model)
+    if limiter is not None:
+        return limiter
+
+    with _registry_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limits = load_model_limits().get(model, {})
+            limiter = rate_limiter(
+                model,
+                rpm=limits.get("rpm", RATE_LIMIT_RPM),
+                tpm=limits.get("tpm", RATE_LIMIT_TPM),
+            )
+            _limiters[model] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> List[Dict]:
+    """Per-model throttling statistics for the folder summary."""
+    return [asdict(limiter.stats) for limiter in _limiters.values()]
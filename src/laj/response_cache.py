@@ -0,0 +1,222 @@
+"""
+Content-addressed, SQLite-backed cache of LLM judge responses.
+
+Entries are keyed by a SHA-256 of the full request (model, temperature,
+reasoning effort, token budget and rendered messages), so any change to the
+prompt template, guidelines, ticket or Gherkin is a different key. Repeated
+samples of the same request carry their sample ordinal in the key, so
+self-consistency sampling gets independent answers back. The cache is
+bounded by total size and entry age; least recently used entries go first.
+
+Cache modes:
+
+- ``off``: never read or write
+- ``read``: serve hits, never store new responses
+- ``write``: always call the model, store successful responses
+- ``readwrite``: serve hits and store misses
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional
+
+from coverage_config import LLM_CACHE_PATH, LLM_CACHE_MAX_MB, LLM_CACHE_MAX_AGE_DAYS
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+CACHE_MODES = ("off", "read", "write", "readwrite")
+
+# Fields of the completion request that determine the response
+KEY_FIELDS = (
+    "model",
+    "messages",
+    "temperature",
+    "max_tokens",
+    "max_completion_tokens",
+    "reasoning_effort",
+    "response_format",
+    "n",
+)
+
+
+def compute_cache_key(request_kwargs: Dict, sample: int = 0) -> str:
+    """Hash the response-determining fields of a chat completion request.
+
+    ``sample`` is the ordinal of a repeated sample of the same request; the
+    first sample keeps the plain request key.
+    """
+    material = {field: request_kwargs.get(field) for field in KEY_FIELDS}
+    if sample:
+        material["sample"] = sample
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def can_read(mode: str) -> bool:
+    return mode in ("read", "readwrite")
+
+
+def can_write(mode: str) -> bool:
+    return mode in ("write", "readwrite")
+
+
+@dataclass
+class cache_stats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+
+class response_cache:
+    """Thread-safe SQLite store of successful judge responses."""
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024),
+        max_age_seconds: float = LLM_CACHE_MAX_AGE_DAYS * 86400,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.stats = cache_stats()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached payload for ``key``, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and self.max_age_seconds > 0 and now - row[1] > self.max_age_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.expired += 1
+                row = None
+
+            if not row:
+                self.stats.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.stats.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, payload: Dict) -> None:
+        """Store ``payload`` under ``key`` and evict to stay within the limits."""
+        encoded = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, encoded, len(encoded), now, now),
+            )
+            self.stats.writes += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.max_age_seconds > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.max_age_seconds,),
+            )
+            self.stats.expired += max(cursor.rowcount, 0)
+
+        if self.max_bytes <= 0:
+            return
+
+        total_size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total_size -= size
+            self.stats.evictions += 1
+
+    def summary(self) -> Dict:
+        with self._lock:
+            entries, total_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        data = asdict(self.stats)
+        data.update({"path": self.path, "entries": entries, "size_bytes": total_size})
+        return data
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, response_cache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_response_cache(path: str = LLM_CACHE_PATH) -> response_cache:
+    """Return the process-wide cache stored at ``path``."""
+    with _registry_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = response_cache(path)
+            _caches[path] = cache
+    return cache
+
+
+def get_cache_stats() -> Optional[Dict]:
+    """Statistics of every cache opened in this process, or None if none was used."""
+    with _registry_lock:
+        caches = list(_caches.values())
+    if not caches:
+        return None
+    if len(caches) == 1:
+        return caches[0].summary()
+    return {"caches": [cache.summary() for cache in caches]}
@@ -0,0 +1,64 @@
+"""
+Retry policies for judge calls.
+
+Failures are grouped into three classes, each with its own backoff:
+
+- ``parse``: the model answered but the output could not be parsed
+- ``timeout``: the request timed out
+- ``server``: 5xx, 429 and connection errors from the provider
+
+Anything else (bad request, authentication, missing files) is not retried.
+"""
+
+import random
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from coverage_config import (
+    RETRY_MAX_DELAY,
+    RETRY_BASE_DELAY_PARSE,
+    RETRY_BASE_DELAY_TIMEOUT,
+    RETRY_BASE_DELAY_SERVER,
+)
+
+PARSE_FAILURE = "parse"
+TIMEOUT_FAILURE = "timeout"
+SERVER_FAILURE = "server"
+
+
+@dataclass
+class retry_policy:
+    base_delay: float
+    max_delay: float = RETRY_MAX_DELAY
+    multiplier: float = 2.0
+    jitter: float = 0.5
+
+    def delay(self, retry_index: int) -> float:
+        """Exponential backoff for the given retry (0-based), with random jitter."""
+        if self.base_delay <= 0:
+            return 0.0
+        delay = min(self.max_delay, self.base_delay * self.multiplier**retry_index)
+        return delay * (1 - self.jitter + self.jitter * random.random())
+
+
+RETRY_POLICIES: Dict[str, retry_policy] = {
+    PARSE_FAILURE: retry_policy(base_delay=RETRY_BASE_DELAY_PARSE),
+    TIMEOUT_FAILURE: retry_policy(base_delay=RETRY_BASE_DELAY_TIMEOUT),
+    SERVER_FAILURE: retry_policy(base_delay=RETRY_BASE_DELAY_SERVER),
+}
+
+
+def classify_failure(error: Exception) -> Optional[str]:
+    """Map an exception from the judge call to a retryable failure class."""
+    openai = sys.modules.get("openai")
+    if openai is None:
+        # Never imported, so no call was made and the error is not the client's
+        return None
+    if isinstance(error, openai.APITimeoutError):
+        return TIMEOUT_FAILURE
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return SERVER_FAILURE
+    if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+        return SERVER_FAILURE
+    return None
@@ -0,0 +1,253 @@
+"""
+Append-only manifest of the judgments stored in an output folder.
+
+Each benchmark report written by ``analyze_gherkin_folder`` gets one row in
+``.run_manifest.sqlite`` next to it, committed right after the report. Rows
+are keyed by an input hash, the Jira ID and a hash of the judge
+configuration (model, temperature, max tokens and the settings that change
+the verdict, such as sampling, cascade and scenario budget), and carry the
+folder summary entry of the file. Files down-tiered by static triage are
+keyed by the model that judged them; files whose judge call static triage
+skipped hold no judgment and are not recorded. The input hash covers everything
+the judge sees: the normalized Gherkin (comments and layout whitespace
+ignored), the Jira story and the prompt version. A file copied unchanged, or
+only re-indented, is reused; an edit to the file, its story or the prompts
+is judged again. Rows are only ever appended; a lookup returns the latest
+completed judgment for a key.
+
+Deciding what is already done is then one indexed lookup per file, instead
+of re-reading every ``benchmark_result_*.json`` of the folder's history.
+Folders written before the manifest existed are imported from their reports
+(``analyze_gherkin_folder.py --rebuild-manifest``, or automatically on the
+first run).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+MANIFEST_FILE_NAME = ".run_manifest.sqlite"
+
+# Manifests of an older schema are recreated (and re-imported from the reports)
+SCHEMA_VERSION = 4
+
+
+# Settings besides model, temperature and max tokens that change the verdict,
+# with the values of reports that do not record them
+VERDICT_DEFAULTS = {
+    "reasoning_effort": None,
+    "samples": 1,
+    "sample_reducer": "mean",
+    "cascade_models": [],
+    "scenario_budget": 0,
+    "structured_output": False,
+    "prompt_layout": "legacy",
+    "batch_size": 1,
+}
+
+
+def verdict_settings(config: Dict) -> Dict:
+    """The VERDICT_DEFAULTS settings of ``config``, unset ones at their default"""
+    settings = {}
+    for name, default in VERDICT_DEFAULTS.items():
+        value = config.get(name)
+        settings[name] = default if value is None else value
+    settings["samples"] = int(settings["samples"] or 1)
+    settings["cascade_models"] = list(settings["cascade_models"] or [])
+    settings["scenario_budget"] = int(settings["scenario_budget"] or 0)
+    settings["structured_output"] = bool(settings["structured_output"])
+    settings["batch_size"] = max(1, int(settings["batch_size"] or 1))
+    if settings["samples"] <= 1:
+        # The reducer of a single sample does not change it
+        settings["sample_reducer"] = VERDICT_DEFAULTS["sample_reducer"]
+    return settings
+
+
+def config_key(config: Dict) -> str:
+    """Hash of the judge settings a judgment depends on
+
+    ``config`` is a model config, or a report's ``llm_config`` merged with its
+    ``judge_settings``: model, temperature and max tokens, plus the sampling,
+    cascade, scenario budget, structured output, prompt layout and tickets per
+    prompt settings when they differ from the defaults (so default runs keep
+    their keys).
+    """
+    material = [
+        config.get("model"),
+        float(config.get("temperature") or 0),
+        int(config.get("max_tokens") or 0),
+    ]
+    settings = verdict_settings(config)
+    if settings != VERDICT_DEFAULTS:
+        material.append(settings)
+    return hashlib.sha256(
+        json.dumps(material, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+
+
+def input_hash(gherkin_hash: str, jira_story: Optional[Dict], prompt_version: str) -> str:
+    """Hash of what the judge is given: normalized Gherkin, story and prompts"""
+    material = [
+        gherkin_hash,
+        json.dumps(jira_story or {}, sort_keys=True, ensure_ascii=False, default=str),
+        prompt_version,
+    ]
+    return hashlib.sha256(json.dumps(material).encode("utf-8")).hexdigest()
+
+
+def manifest_key(judgment_input_hash: str, jira_id, judge_config_key: str) -> str:
+    return f"{judgment_input_hash}:{jira_id}:{judge_config_key}"
+
+
+class run_manifest:
+    """Thread-safe, append-only SQLite index of the judgments in one folder."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {"lookups": 0, "hits": 0, "records": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS judgments")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS judgments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL,
+                input_hash TEXT NOT NULL,
+                jira_id TEXT,
+                config_key TEXT NOT NULL,
+                file_path TEXT,
+                status TEXT NOT NULL,
+                report_path TEXT,
+                result TEXT NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_judgments_key ON judgments(key, status)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_judgments_story ON judgments(jira_id, config_key)"
+        )
+        self._conn.commit()
+
+    def record(
+        self,
+        judgment_input_hash: str,
+        jira_id,
+        judge_config_key: str,
+        file_path: str,
+        status: str,
+        report_path: Optional[str],
+        result: Dict,
+    ) -> None:
+        """Append one judgment and commit it."""
+        jira_id = None if jira_id is None else str(jira_id)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO judgments (key, input_hash, jira_id, config_key,
+                    file_path, status, report_path, result, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    manifest_key(judgment_input_hash, jira_id, judge_config_key),
+                    judgment_input_hash,
+                    jira_id,
+                    judge_config_key,
+                    file_path,
+                    status,
+                    report_path,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+            self.stats["records"] += 1
+
+    def lookup(
+        self, judgment_input_hash: str, jira_id, judge_config_key: str
+    ) -> Optional[Dict]:
+        """The summary entry of the latest completed judgment for the key, or None."""
+        key = manifest_key(
+            judgment_input_hash, None if jira_id is None else str(jira_id), judge_config_key
+        )
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT result FROM judgments
+                WHERE key = ? AND status = 'completed'
+                ORDER BY id DESC LIMIT 1
+                """,
+                (key,),
+            ).fetchone()
+            self.stats["lookups"] += 1
+            if row:
+                self.stats["hits"] += 1
+        return json.loads(row[0]) if row else None
+
+    def has_judgment(self, jira_id, judge_config_key: str) -> bool:
+        """Whether the story was judged with these settings, for any input"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT 1 FROM judgments
+                WHERE jira_id = ? AND config_key = ? AND status = 'completed'
+                LIMIT 1
+                """,
+                (None if jira_id is None else str(jira_id), judge_config_key),
+            ).fetchone()
+        return row is not None
+
+    def report_paths(self) -> Set[str]:
+        """Reports already recorded, so a rebuild only imports the others"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT report_path FROM judgments WHERE report_path IS NOT NULL"
+            ).fetchall()
+        return {os.path.abspath(path) for (path,) in rows}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM judgments").fetchone()[0]
+
+    def summary(self) -> Dict:
+        return dict(self.stats, path=self.path, rows=len(self))
+
+
+_manifests: Dict[str, run_manifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def manifest_path(output_dir: str) -> str:
+    return os.path.join(output_dir, MANIFEST_FILE_NAME)
+
+
+def get_run_manifest(output_dir: str) -> run_manifest:
+    """The process-wide manifest of ``output_dir``, opened on first use."""
+    path = os.path.abspath(manifest_path(output_dir))
+    with _manifests_lock:
+        manifest = _manifests.get(path)
+        if manifest is None:
+            manifest = run_manifest(path)
+            _manifests[path] = manifest
+        return manifest
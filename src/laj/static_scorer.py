@@ -0,0 +1,353 @@
+"""
+Deterministic coverage pre-scorer, without an LLM.
+
+The Jira stories list their acceptance criteria in a regular format: the
+HTTP method and path, path/query/header parameters with type, format, enum
+values and whether they are required, the request body and the expected
+response codes. This module extracts those criteria with a few regular
+expressions and checks which of them the parsed Gherkin scenarios reference,
+giving a coverage estimate and the list of uncovered items in microseconds.
+
+The folder analyzer uses it as a triage stage (skip the judge, or send the
+file to a cheaper model, when the static estimate is high) and as a sanity
+check reported next to the judge's percentages.
+"""
+
+import argparse
+import csv
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
+
+from coverage_config import JIRA_STORY_PATH
+from gherkin_parser import gherkin_document, load_gherkin_file
+from story_store import memory_story_store
+
+HTTP_METHODS = ("GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS")
+PARAMETER_SECTIONS = {
+    "path parameters": "path",
+    "query parameters": "query",
+    "header parameters": "header",
+    "form parameters": "form",
+}
+STRING_TYPES = ("string", "")
+
+# A scenario exercising a missing or an invalid value mentions one of these
+MISSING_WORDS = ("missing", "without", "omit", "absent", "empty", "not provided", "null")
+INVALID_WORDS = (
+    "invalid",
+    "malformed",
+    "wrong",
+    "incorrect",
+    "bad ",
+    "unsupported",
+    "not a valid",
+    "out of range",
+    "negative",
+    "exceed",
+)
+
+TRIAGE_MODES = ("off", "report", "skip", "downtier")
+
+_ENDPOINT = re.compile(
+    r"\b(" + "|".join(HTTP_METHODS) + r")\s+`?(?:\{\{baseUrl\}\})?(/[^\s`]+)"
+)
+_PARAMETER = re.compile(r"^-\s+`([^`]+)`\s+\((.*?)\):\s*(.*)$")
+_REQUIRED = re.compile(r"Required:\s*(true|false)", re.IGNORECASE)
+_TYPE = re.compile(r"^`([^`]+)`")
+_FORMAT = re.compile(r"format:?\s+`([^`]+)`")
+_ENUM = re.compile(r"enum:\s*`\[([^\]]*)\]`")
+_STATUS_CODE = re.compile(r"\b([1-5]\d\d)\b")
+
+
+@dataclass(frozen=True)
+class criterion:
+    """One checkable item of a story's acceptance criteria.
+
+    Covered when the Gherkin mentions every term; with qualifiers, a single
+    scenario must mention every term and at least one qualifier.
+    """
+
+    kind: str
+    label: str
+    terms: Tuple[str, ...]
+    qualifiers: Tuple[str, ...] = ()
+
+
+@dataclass
+class static_score:
+    coverage_percentage: int
+    covered: List[str]
+    uncovered: List[str]
+    criteria_count: int
+    scenario_count: int
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _parameter_criteria(kind: str, line: str) -> List[criterion]:
+    match = _PARAMETER.match(line)
+    if not match:
+        return []
+    name, spec, rest = match.groups()
+    term = name.lower()
+    criteria = [criterion("parameter", f"{kind} parameter {name}", (term,))]
+
+    required = _REQUIRED.search(rest)
+    if required and required.group(1).lower() == "true" and kind != "path":
+        criteria.append(
+            criterion("required", f"missing required {name}", (term,), MISSING_WORDS)
+        )
+
+    type_match = _TYPE.match(spec)
+    param_type = type_match.group(1).lower() if type_match else ""
+    if _FORMAT.search(spec) or "pattern:" in spec or param_type not in STRING_TYPES:
+        criteria.append(criterion("format", f"invalid {name}", (term,), INVALID_WORDS))
+
+    enum = _ENUM.search(spec)
+    if enum:
+        values = tuple(
+            value.strip().lower() for value in enum.group(1).split(",") if value.strip()
+        )
+        if values:
+            criteria.append(
+                criterion("enum", f"{name} values {', '.join(values).upper()}", values)
+            )
+    return criteria
+
+
+@functools.lru_cache(maxsize=4096)
+def extract_criteria(description: str) -> Tuple[criterion, ...]:
+    """Acceptance criteria of a story description, in order of appearance"""
+    criteria: List[criterion] = []
+    seen_codes = set()
+    section = None
+    body_required = False
+
+    endpoint = _ENDPOINT.search(description)
+    if endpoint:
+        method, path = endpoint.groups()
+        literal_segments = [
+            segment
+            for segment in path.strip("/").split("/")
+            if segment and not segment.startswith("{") and not segment[0].isdigit()
+        ]
+        terms = (method.lower(),) + (
+            (literal_segments[-1].lower(),) if literal_segments else ()
+        )
+        criteria.append(criterion("endpoint", f"endpoint {method} {path}", terms))
+
+    for raw_line in description.splitlines():
+        line = raw_line.strip()
+        lowered = line.lower()
+        if line.endswith(":") and not line.startswith("-"):
+            section = lowered[:-1]
+            continue
+
+        if section in PARAMETER_SECTIONS and line.startswith("- `"):
+            criteria.extend(_parameter_criteria(PARAMETER_SECTIONS[section], line))
+            continue
+
+        if section == "request body" and "required: true" in lowered:
+            body_required = True
+            continue
+
+        if "status" in lowered and not line.startswith("- `"):
+            for code in _STATUS_CODE.findall(line):
+                if code not in seen_codes:
+                    seen_codes.add(code)
+                    criteria.append(criterion("status", f"status {code}", (code,)))
+
+    if body_required:
+        criteria.append(
+            criterion(
+                "request_body",
+                "invalid request body",
+                ("body",),
+                INVALID_WORDS + MISSING_WORDS,
+            )
+        )
+    return tuple(criteria)
+
+
+def _scenario_texts(document: gherkin_document) -> List[str]:
+    texts = []
+    for scenario in document.scenarios:
+        parts = [scenario.name]
+        for step in scenario.steps:
+            parts.append(step.text)
+            parts.extend(" ".join(row) for row in step.table)
+            if step.doc_string:
+                parts.append(step.doc_string)
+        for examples in scenario.examples:
+            parts.append(" ".join(examples.header))
+            parts.extend(" ".join(row) for row in examples.rows)
+        texts.append(" ".join(parts).lower())
+    return texts
+
+
+# Lower-cased document and scenario texts by content hash
+_indexes: "OrderedDict[str, Tuple[str, Tuple[str, ...]]]" = OrderedDict()
+_indexes_lock = threading.Lock()
+INDEX_CACHE_SIZE = 4096
+
+
+def index_document(document: gherkin_document) -> Tuple[str, Tuple[str, ...]]:
+    """Searchable text of the whole file and of each scenario, built once per content"""
+    with _indexes_lock:
+        index = _indexes.get(document.content_hash)
+    if index is None:
+        index = (document.text.lower(), tuple(_scenario_texts(document)))
+        with _indexes_lock:
+            _indexes[document.content_hash] = index
+            while len(_indexes) > INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+    return index
+
+
+def is_covered(item: criterion, full_text: str, scenario_texts: Tuple[str, ...]) -> bool:
+    if not item.qualifiers:
+        return all(term in full_text for term in item.terms)
+    return any(
+        all(term in text for term in item.terms)
+        and any(word in text for word in item.qualifiers)
+        for text in scenario_texts
+    )
+
+
+def score_document(jira_story: Dict, document: gherkin_document) -> static_score:
+    """Static coverage of a story's acceptance criteria by a parsed feature file"""
+    criteria = extract_criteria(jira_story.get("description") or "")
+    full_text, scenario_texts = index_document(document)
+
+    covered, uncovered = [], []
+    for item in criteria:
+        (covered if is_covered(item, full_text, scenario_texts) else uncovered).append(
+            item.label
+        )
+
+    return static_score(
+        coverage_percentage=(
+            int(round(100 * len(covered) / len(criteria))) if criteria else 0
+        ),
+        covered=covered,
+        uncovered=uncovered,
+        criteria_count=len(criteria),
+        scenario_count=len(scenario_texts),
+    )
+
+
+def score_file(jira_story: Dict, file_path: str) -> static_score:
+    return score_document(jira_story, load_gherkin_file(file_path))
+
+
+def triage_action(score: static_score, mode: str, threshold: float) -> Optional[str]:
+    """"skip" or "downtier" when the static estimate clears ``threshold``"""
+    if mode not in ("skip", "downtier") or not score.criteria_count:
+        return None
+    return mode if score.coverage_percentage >= threshold else None
+
+
+def summarize_static_agreement(results: List[Dict], disagreement: float) -> Optional[Dict]:
+    """Compare static estimates with the judge's percentages across a run"""
+    pairs = []
+    for result in results:
+        static = result.get("static_score") if result else None
+        if not static or result.get("status") not in ("completed", "cached"):
+            continue
+        if (result.get("triage") or {}).get("action") == "skip":
+            continue
+        pairs.append(
+            (result.get("jira_id"), static["coverage_percentage"], result["coverage_percentage"])
+        )
+
+    if not pairs:
+        return None
+
+    differences = [abs(static - judged) for _, static, judged in pairs]
+    return {
+        "files": len(pairs),
+        "mean_absolute_difference": sum(differences) / len(differences),
+        "disagreement_threshold": disagreement,
+        "disagreements": [
+            {"jira_id": jira_id, "static": static, "judge": judged}
+            for jira_id, static, judged in pairs
+            if abs(static - judged) > disagreement
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score Gherkin files against their Jira acceptance criteria without an LLM"
+    )
+    parser.add_argument("--folder", required=True, help="Folder with *.feature files")
+    parser.add_argument(
+        "--stories",
+        default=JIRA_STORY_PATH,
+        help="Jira stories as JSON, JSON Lines or CSV (default: JIRA_STORY_PATH env var)",
+    )
+    parser.add_argument(
+        "--ground-truth",
+        help="CSV with jira_id,coverage_percentage to report the mean absolute error",
+    )
+    parser.add_argument("--output", help="Write the per-file scores as JSON")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Score the folder this many times for a throughput measurement",
+    )
+    args = parser.parse_args()
+
+    stories = memory_story_store.from_file(args.stories)
+
+    entries = []
+    for name in sorted(os.listdir(args.folder)):
+        if name.endswith(".feature"):
+            jira_id = name.split("_")[0]
+            if jira_id in stories:
+                entries.append((jira_id, os.path.join(args.folder, name)))
+
+    documents = [(jira_id, load_gherkin_file(path)) for jira_id, path in entries]
+    started = time.perf_counter()
+    for _ in range(max(1, args.repeat)):
+        scores = {
+            jira_id: score_document(stories.get(jira_id), document)
+            for jira_id, document in documents
+        }
+    elapsed = time.perf_counter() - started
+    scored = len(documents) * max(1, args.repeat)
+
+    for jira_id, score in scores.items():
+        print(
+            f"{jira_id:>5} {score.coverage_percentage:>4}% "
+            f"({len(score.covered)}/{score.criteria_count}) uncovered: {', '.join(score.uncovered)}"
+        )
+    print(f"\n{scored} files scored in {elapsed:.3f}s ({scored / max(elapsed, 1e-9):.0f} per second)")
+
+    if args.ground_truth:
+        with open(args.ground_truth, "r") as f:
+            truth = {row["jira_id"]: float(row["coverage_percentage"]) for row in csv.DictReader(f)}
+        errors = [
+            abs(score.coverage_percentage - truth[jira_id])
+            for jira_id, score in scores.items()
+            if jira_id in truth
+        ]
+        if errors:
+            print(f"Mean absolute error vs ground truth: {sum(errors) / len(errors):.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({jira_id: score.to_dict() for jira_id, score in scores.items()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
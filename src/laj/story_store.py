@@ -0,0 +1,320 @@
+"""
+Jira story stores with constant-time lookup by ID.
+
+Stories are read with streaming loaders: a JSON array is decoded one object
+at a time from fixed-size chunks, JSON Lines one line at a time, and CSV
+exports (``id,title,description,...``) row by row. Nothing holds the raw file
+in memory.
+
+- ``memory``: a dict keyed by the story ID as a string; fine for the
+  benchmark's hundreds of stories
+- ``sqlite``: the stories are streamed into an SQLite file once and looked up
+  by primary key, so tens of thousands of tickets cost neither startup time
+  nor memory. The store rebuilds itself when the source file changes.
+
+As with the previous linear lookup, the first story with a given ID wins.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from coverage_config import JIRA_STORY_PATH, STORY_STORE_PATH
+
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+STORY_STORES = ("memory", "sqlite")
+READ_CHUNK_SIZE = 1 << 16
+INSERT_BATCH_SIZE = 1000
+
+_DECODER = json.JSONDecoder()
+
+
+def iter_json_array(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield the elements of a top-level JSON array, reading the file in chunks"""
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        position = 0
+        started = False
+        eof = False
+        while True:
+            # Skip whitespace and separators between elements
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer):
+                if not started:
+                    if buffer[position] != "[":
+                        raise ValueError(f"{path} does not hold a JSON array")
+                    started = True
+                    position += 1
+                    continue
+                if buffer[position] == "]":
+                    return
+                try:
+                    value, end = _DECODER.raw_decode(buffer, position)
+                except ValueError:
+                    if eof:
+                        raise
+                    # The element continues in the next chunk
+                else:
+                    yield value
+                    position = end
+                    continue
+            elif eof:
+                if started:
+                    raise ValueError(f"{path}: unterminated JSON array")
+                return
+
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+
+
+def iter_json_lines(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv_stories(path: str) -> Iterator[Dict]:
+    """Rows of a CSV export as story dicts (all columns kept as strings)"""
+    # Descriptions can exceed the csv module's default field size limit
+    csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def iter_stories(path: str) -> Iterator[Dict]:
+    """Stream the stories of a JSON array, JSON Lines or CSV file"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return iter_csv_stories(path)
+    if extension in (".jsonl", ".ndjson"):
+        return iter_json_lines(path)
+    return iter_json_array(path)
+
+
+def story_id(story: Dict) -> Optional[str]:
+    value = story.get("id")
+    return None if value is None else str(value)
+
+
+class memory_story_store:
+    """Stories in a dict keyed by ID."""
+
+    name = "memory"
+
+    def __init__(self, stories=()):
+        self._stories: Dict[str, Dict] = {}
+        for story in stories:
+            key = story_id(story)
+            if key is not None:
+                self._stories.setdefault(key, story)
+
+    @classmethod
+    def from_file(cls, path: str) -> "memory_story_store":
+        try:
+            return cls(iter_stories(path))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading Jira stories at {path}: {e}")
+            return cls()
+
+    def get(self, jira_id) -> Optional[Dict]:
+        return self._stories.get(str(jira_id))
+
+    def __contains__(self, jira_id) -> bool:
+        return str(jira_id) in self._stories
+
+    def __len__(self) -> int:
+        return len(self._stories)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._stories.values())
+
+
+class sqlite_story_store:
+    """Stories in an SQLite file, looked up by primary key.
+
+    ``source_path`` is streamed into the database when the file's path, size
+    or modification time differ from the last build.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = STORY_STORE_PATH, source_path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stories (id TEXT PRIMARY KEY, story TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+        if source_path:
+            self.sync(source_path)
+
+    @staticmethod
+    def _signature(source_path: str) -> str:
+        stat = os.stat(source_path)
+        return json.dumps([os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns])
+
+    def sync(self, source_path: str) -> bool:
+        """Rebuild from ``source_path`` if it changed; True if rebuilt."""
+        try:
+            signature = self._signature(source_path)
+        except OSError as e:
+            logger.error(f"Error reading Jira stories at {source_path}: {e}")
+            return False
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'source'"
+            ).fetchone()
+        if row and row[0] == signature:
+            return False
+
+        started = time.perf_counter()
+        try:
+            count = self.load(iter_stories(source_path))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading Jira stories at {source_path}: {e}")
+            return False
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('source', ?)",
+                (signature,),
+            )
+            self._conn.commit()
+        logger.info(
+            f"Loaded {count} Jira stories from {source_path} into {self.path} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return True
+
+    def load(self, stories) -> int:
+        """Replace the stored stories with ``stories``, inserting in batches."""
+        count = 0
+        batch: List[tuple] = []
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM stories")
+                for story in stories:
+                    key = story_id(story)
+                    if key is None:
+                        continue
+                    batch.append((key, json.dumps(story, ensure_ascii=False)))
+                    if len(batch) >= INSERT_BATCH_SIZE:
+                        count += self._insert(batch)
+                        batch = []
+                count += self._insert(batch)
+            except Exception:
+                # Keep the previous build rather than a partial one
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+        return count
+
+    def _insert(self, batch: List[tuple]) -> int:
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO stories (id, story) VALUES (?, ?)", batch
+        )
+        return self._conn.total_changes - before
+
+    def get(self, jira_id) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT story FROM stories WHERE id = ?", (str(jira_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT story FROM stories ORDER BY rowid").fetchall()
+        for (story,) in rows:
+            yield json.loads(story)
+
+
+def open_story_store(
+    kind: str, source_path: str, store_path: str = STORY_STORE_PATH
+):
+    """The ``memory`` or ``sqlite`` store of the stories in ``source_path``"""
+    if kind == "sqlite":
+        return sqlite_story_store(store_path, source_path)
+    if kind == "memory":
+        return memory_story_store.from_file(source_path)
+    raise ValueError(f"Unknown story store: {kind} (expected one of {STORY_STORES})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build a Jira story store and time lookups against a linear scan"
+    )
+    parser.add_argument(
+        "--source",
+        default=JIRA_STORY_PATH,
+        help="Stories as a JSON array, JSON Lines or CSV (default: JIRA_STORY_PATH env var)",
+    )
+    parser.add_argument("--store", choices=STORY_STORES, default="sqlite")
+    parser.add_argument(
+        "--db", default=STORY_STORE_PATH, help="SQLite file (default: STORY_STORE_PATH env var)"
+    )
+    parser.add_argument(
+        "--lookups", type=int, default=10000, help="Lookups to time (default: 10000)"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    store = open_story_store(args.store, args.source, args.db)
+    print(f"{args.store} store with {len(store)} stories ready in {time.perf_counter() - started:.3f}s")
+
+    ids = [story_id(story) for story in iter_stories(args.source)]
+    if not ids:
+        return
+    rng = random.Random(0)
+    lookups = [rng.choice(ids) for _ in range(args.lookups)]
+
+    started = time.perf_counter()
+    for jira_id in lookups:
+        store.get(jira_id)
+    indexed = time.perf_counter() - started
+
+    stories = list(iter_stories(args.source))
+    started = time.perf_counter()
+    for jira_id in lookups:
+        next((story for story in stories if str(story.get("id")) == str(jira_id)), None)
+    linear = time.perf_counter() - started
+
+    print(
+        f"{args.lookups} lookups: store {indexed * 1e6 / args.lookups:.1f} us each, "
+        f"linear scan {linear * 1e6 / args.lookups:.1f} us each"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Multi-model benchmark sweep in one process.
+
+``scripts/bench_laaj-all.sh`` used to start one Python process per (run,
+model, reasoning effort) and run them one after another, each re-importing
+the modules and re-reading the stories and feature files. A sweep runs the
+whole matrix of models x reasoning efforts x runs from one event loop: the
+dataset and prompts are loaded once, Gherkin files are parsed once, and the
+judge calls of every configuration share one concurrency budget, with
+optional caps per provider.
+
+Results keep the ``results/rN/<model><effort>/`` layout, so
+``src/analysis/eval_laj_run.py`` reads them unchanged. As with the shell
+script, configurations whose latest summary is complete are skipped.
+
+    python src/laj/sweep.py --runs 5
+    python src/laj/sweep.py --runs 2 --models gpt-4.1-mini,gpt-5-mini --efforts low,high
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from analyze_gherkin_folder import analyze_folder, install_stop_handlers, stop_requested
+from coverage_config import (
+    BASE_PATH,
+    SWEEP_CONCURRENCY,
+    SWEEP_PROVIDER_LIMITS,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+if os.getenv("DEBUG"):
+    logger.setLevel(logging.DEBUG)
+
+# The matrix of scripts/bench_laaj-all.sh
+DEFAULT_MODELS = [
+    "gpt-4o-mini",
+    "gpt-4o",
+    "gpt-4.1-nano",
+    "gpt-4.1-mini",
+    "gpt-4.1",
+    "gpt-5-nano",
+    "gpt-5-mini",
+    "gpt-5",
+]
+DEFAULT_EFFORTS = ["low", "medium", "high"]
+# bench_laaj.sh ran every model at temperature 0, whatever OPEN_AI_TEMPERATURE was
+BENCHMARK_TEMPERATURE = 0.0
+REPO_ROOT = os.path.dirname(os.path.dirname(BASE_PATH))
+DEFAULT_FOLDER = os.path.join(REPO_ROOT, "dataset", "benchmark_feautures")
+DEFAULT_RESULTS = os.path.join(REPO_ROOT, "results")
+
+
+@dataclass
+class sweep_config:
+    run: int
+    model: str
+    reasoning_effort: str
+    output_path: str
+
+    @property
+    def label(self) -> str:
+        return f"r{self.run}/{self.model}{self.reasoning_effort}"
+
+
+def takes_reasoning_effort(model: str) -> bool:
+    """Reasoning models: GPT-5 and GPT-OSS"""
+    return "gpt-5" in model or "gpt-oss" in model
+
+
+def model_provider(model: str) -> str:
+    """Provider whose limits apply: namespaced models go through OpenRouter"""
+    return "openrouter" if "/" in model else "openai"
+
+
+def parse_provider_limits(value: str) -> Dict[str, int]:
+    """``"openai=8,openrouter=4"`` as a dict"""
+    limits = {}
+    for part in (value or "").split(","):
+        if not part.strip():
+            continue
+        provider, _, limit = part.partition("=")
+        try:
+            limits[provider.strip()] = int(limit)
+        except ValueError:
+            raise ValueError(f"Invalid provider limit {part!r} (expected provider=N)")
+    return limits
+
+
+def build_matrix(
+    models: List[str],
+    efforts: List[str],
+    runs: List[int],
+    results_path: str,
+) -> List[sweep_config]:
+    """One configuration per run, model and reasoning effort (models without
+    reasoning effort get a single configuration per run)"""
+    configs = []
+    for run in runs:
+        for model in models:
+            for effort in efforts if takes_reasoning_effort(model) and efforts else [""]:
+                output_path = os.path.join(
+                    results_path, f"r{run}", f"{model}{effort}".replace(":", "-")
+                )
+                configs.append(sweep_config(run, model, effort, output_path))
+    return configs
+
+
+def latest_summary(output_path: str) -> Optional[Dict]:
+    summaries = sorted(
+        glob.glob(os.path.join(output_path, "folder_coverage_summary_*.json"))
+    )
+    if not summaries:
+        return None
+    try:
+        with open(summaries[-1], "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as exc:
+        logger.warning(f"Unable to read {summaries[-1]}: {exc}")
+        return None
+
+
+def is_complete(output_path: str) -> bool:
+    """Every file analyzed and none failed in the latest summary"""
+    summary = latest_summary(output_path)
+    return bool(
+        summary
+        and summary.get("analyzed_files", 0) == summary.get("total_files", 0)
+        and summary.get("failed_files", -1) == 0
+    )
+
+
+class provider_slot:
+    """Holds a slot of the provider's cap (if any), then one of the shared budget."""
+
+    def __init__(self, shared: asyncio.Semaphore, provider: Optional[asyncio.Semaphore]):
+        self.shared = shared
+        self.provider = provider
+
+    async def __aenter__(self):
+        if self.provider:
+            await self.provider.acquire()
+        try:
+            await self.shared.acquire()
+        except BaseException:
+            if self.provider:
+                self.provider.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.shared.release()
+        if self.provider:
+            self.provider.release()
+        return False
+
+
+async def run_sweep(
+    configs: List[sweep_config],
+    folder_path: str,
+    temperature: float,
+    concurrency: int = SWEEP_CONCURRENCY,
+    provider_limits: Optional[Dict[str, int]] = None,
+    force: bool = False,
+    resume: bool = False,
+) -> List[Dict]:
+    """Analyze ``folder_path`` for every configuration, sharing one budget"""
+    concurrency = max(1, concurrency)
+    shared = asyncio.Semaphore(concurrency)
+    provider_semaphores = {
+        provider: asyncio.Semaphore(max(1, limit))
+        for provider, limit in (provider_limits or {}).items()
+    }
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def run_config(config: sweep_config) -> Dict:
+        if not force and is_complete(config.output_path):
+            logger.info(f"Skipping {config.label} - already complete")
+            return {"config": config.label, "status": "skipped"}
+        if stop_requested():
+            return {"config": config.label, "status": "interrupted"}
+
+        os.makedirs(config.output_path, exist_ok=True)
+        slot = provider_slot(
+            shared, provider_semaphores.get(model_provider(config.model))
+        )
+        started = time.perf_counter()
+        try:
+            summary = await analyze_folder(
+                {
+                    "folder_path": folder_path,
+                    "output_path": config.output_path,
+                    "file_pattern": "*.feature",
+                    "recursive": False,
+                    "jira_mapping_file": None,
+                    "model": config.model,
+                    "temperature": temperature,
+                    "reasoning_effort": config.reasoning_effort or None,
+                    "concurrency": concurrency,
+                    "resume": resume,
+                },
+                slot=slot,
+                executor=executor,
+            )
+        except Exception as exc:
+            logger.error(f"Sweep configuration {config.label} failed: {exc}")
+            return {"config": config.label, "status": "failed", "error": str(exc)}
+
+        return {
+            "config": config.label,
+            "status": "interrupted" if summary.get("interrupted") else "completed",
+            "analyzed_files": summary.get("analyzed_files", 0),
+            "total_files": summary.get("total_files", 0),
+            "failed_files": summary.get("failed_files", 0),
+            "cache_hits": summary.get("cache_hits", 0),
+            "average_coverage": summary.get("average_coverage", 0),
+            "elapsed_seconds": time.perf_counter() - started,
+        }
+
+    try:
+        return await asyncio.gather(*(run_config(config) for config in configs))
+    finally:
+        executor.shutdown(wait=True)
+
+
+def split_list(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Run the LLM-as-a-Judge benchmark for a matrix of models, reasoning efforts and runs in one process"
+    )
+    parser.add_argument("--runs", type=int, required=True, help="Last run number (rN)")
+    parser.add_argument("--start-run", type=int, default=1, help="First run number (default: 1)")
+    parser.add_argument(
+        "--models",
+        default=",".join(DEFAULT_MODELS),
+        help="Comma-separated models (default: the bench_laaj-all.sh models)",
+    )
+    parser.add_argument(
+        "--efforts",
+        default=",".join(DEFAULT_EFFORTS),
+        help="Comma-separated reasoning efforts for GPT-5/GPT-OSS models (default: low,medium,high)",
+    )
+    parser.add_argument("--folder", default=DEFAULT_FOLDER, help="Folder with the Gherkin files")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="Results root (default: ./results)")
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=BENCHMARK_TEMPERATURE,
+        help="Temperature for non-reasoning models (default: 0, as bench_laaj.sh)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=SWEEP_CONCURRENCY,
+        help="Judge calls in flight across all configurations (default: SWEEP_CONCURRENCY env var or 8)",
+    )
+    parser.add_argument(
+        "--provider-limits",
+        default=SWEEP_PROVIDER_LIMITS,
+        help='Per-provider caps such as "openai=8,openrouter=4" (default: SWEEP_PROVIDER_LIMITS env var)',
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue interrupted configurations from their progress journals",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also run configurations whose latest summary is complete",
+    )
+    args = parser.parse_args()
+
+    configs = build_matrix(
+        split_list(args.models),
+        split_list(args.efforts),
+        list(range(args.start_run, args.runs + 1)),
+        args.results,
+    )
+    logger.info(
+        f"Sweeping {len(configs)} configurations over {args.folder} "
+        f"(concurrency {args.concurrency}, provider limits: {args.provider_limits or 'none'})"
+    )
+
+    started = time.perf_counter()
+    # SIGINT/SIGTERM: judge calls in flight finish, then every configuration stops
+    install_stop_handlers(asyncio.get_running_loop())
+    outcomes = await run_sweep(
+        configs,
+        args.folder,
+        args.temperature,
+        args.concurrency,
+        parse_provider_limits(args.provider_limits),
+        args.force,
+        args.resume,
+    )
+
+    logger.info("=== Sweep Summary ===")
+    for outcome in outcomes:
+        if outcome["status"] not in ("completed", "interrupted"):
+            logger.info(f"{outcome['config']}: {outcome['status']} {outcome.get('error', '')}")
+            continue
+        logger.info(
+            f"{outcome['config']}: {outcome['analyzed_files']}/{outcome['total_files']} analyzed, "
+            f"{outcome['failed_files']} failed, {outcome['cache_hits']} cache hits, "
+            f"average {outcome['average_coverage']:.2f}% in {outcome['elapsed_seconds']:.1f}s"
+            + (" (interrupted)" if outcome["status"] == "interrupted" else "")
+        )
+    logger.info(f"Sweep finished in {time.perf_counter() - started:.1f}s")
+    if stop_requested():
+        logger.warning("Sweep interrupted; rerun with --resume to continue")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+# The judge modules read their settings when imported: point them at the
+# bundled benchmark inputs, keep batch jobs and the response cache out of the
+# source tree, and never reach a real endpoint
+SCRATCH_DIR = tempfile.mkdtemp(prefix="laj-tests-")
+for name, value in {
+    "OPEN_AI_API_KEY": "test",
+    "OPEN_AI_MODEL": "gpt-4o-mini",
+    "OPEN_AI_TEMPERATURE": "0",
+    "OPEN_AI_MAX_TOKEN": "1000",
+    "API_STANDARD_GUIDELINE_FILE_PATH": "/benchmark/guideline/api_standard_testing_guideline.txt",
+    "JIRA_STORY_PATH": "/benchmark/input/synthetic-jira-tickets-expanded.json",
+    "GHERKIN_FILES_BASE_PATH": "/benchmark/output",
+    "LLM_PROMPTS": "/coverage_llm_prompt.yaml",
+    "COVERAGE_REPORT_BASE_PATH": "/benchmark/output/coverage",
+    "COVERAGE_REPORT_EXAMPLE_OUTPUT_FILE_PATH": "/benchmark/example_outputs/benchmark_output_example.json",
+    "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+    "LLM_CACHE_PATH": os.path.join(SCRATCH_DIR, "cache.sqlite"),
+    "BATCH_LOCAL_DIR": os.path.join(SCRATCH_DIR, "batch_jobs"),
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "laj"))
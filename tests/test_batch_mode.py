@@ -0,0 +1,129 @@
+import asyncio
+import glob
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+import analyze_gherkin_folder
+from batch_jobs import load_job
+
+DATASET_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "dataset", "benchmark_feautures"
+)
+FEATURE_FILES = [
+    "1_qe_sup-gpt4.1_agent-gpt4.1_1748915835.feature",
+    "2_qe_sup-gpt4.1_agent-gpt4.1_1748915914.feature",
+    "3_qe_sup-gpt4.1_agent-gpt4.1_1748915976.feature",
+]
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-run"""
+
+
+@pytest.fixture
+def folder(tmp_path):
+    features = tmp_path / "features"
+    features.mkdir()
+    for name in FEATURE_FILES:
+        shutil.copy(os.path.join(DATASET_DIR, name), features / name)
+    return features
+
+
+@pytest.fixture
+def run_folder(monkeypatch, folder, tmp_path):
+    """Run a local-backend --mode batch analysis of ``folder``"""
+    output = tmp_path / "output"
+
+    def run(*extra):
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "analyze_gherkin_folder.py",
+                "--folder", str(folder),
+                "--output", str(output),
+                "--model", "gpt-4o",
+                "--mode", "batch",
+                "--batch-backend", "local",
+                "--poll-interval", "0.01",
+                *extra,
+            ],
+        )
+        return asyncio.run(
+            analyze_gherkin_folder.analyze_folder(
+                analyze_gherkin_folder.get_folder_configuration()
+            )
+        )
+
+    run.output = str(output)
+    yield run
+    analyze_gherkin_folder._stop_requested.clear()
+
+
+def reports(output):
+    return glob.glob(os.path.join(output, "benchmark_result_*.json"))
+
+
+def test_stop_leaves_the_job_for_resume(run_folder):
+    analyze_gherkin_folder._stop_requested.set()
+    summary = run_folder()
+
+    job = load_job(run_folder.output)
+    assert summary["interrupted"]
+    assert job["status"] == "in_progress"
+    assert not reports(run_folder.output)
+
+    analyze_gherkin_folder._stop_requested.clear()
+    summary = run_folder("--resume")
+
+    resumed = load_job(run_folder.output)
+    assert resumed["batch_id"] == job["batch_id"]
+    assert resumed["status"] == "ingested"
+    assert summary["analyzed_files"] == len(FEATURE_FILES)
+    assert len(reports(run_folder.output)) == len(FEATURE_FILES)
+
+
+def test_crash_before_the_reports_resumes_the_job(run_folder, monkeypatch):
+    def crash(*args, **kwargs):
+        raise Crash()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(analyze_gherkin_folder, "build_file_result", crash)
+        with pytest.raises(Crash):
+            run_folder()
+
+    job = load_job(run_folder.output)
+    assert job["status"] == "completed"
+    assert not reports(run_folder.output)
+
+    submitted = []
+    monkeypatch.setattr(
+        analyze_gherkin_folder.get_batch_backend("local").__class__,
+        "submit",
+        lambda self, *args, **kwargs: submitted.append(args),
+    )
+    summary = run_folder()
+
+    assert not submitted
+    assert load_job(run_folder.output)["status"] == "ingested"
+    assert summary["failed_files"] == 0
+    assert len(reports(run_folder.output)) == len(FEATURE_FILES)
+
+
+def test_ingested_job_is_not_resumed(run_folder):
+    run_folder()
+    first = load_job(run_folder.output)
+
+    # Judged files come from the run manifest; nothing is submitted again
+    summary = run_folder()
+
+    assert load_job(run_folder.output)["batch_id"] == first["batch_id"]
+    assert summary["cache_hits"] == len(FEATURE_FILES)
+    with open(
+        glob.glob(os.path.join(run_folder.output, "folder_coverage_summary_*.json"))[0]
+    ) as f:
+        assert json.load(f)["analyzed_files"] == len(FEATURE_FILES)
@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "analysis"))
+
+from cost_benefit_analysis import (  # noqa: E402
+    DEFAULT_MODEL_PRICING,
+    CsvTable,
+    analyze_single_run,
+    calculate_cascade_cost,
+)
+
+
+def test_cascade_cost_prices_untiered_rows_at_the_run_model():
+    tier_usage = json.dumps(
+        [
+            {
+                "model": "gpt-4.1-nano",
+                "calls": 1,
+                "prompt_tokens": 1_000_000,
+                "completion_tokens": 0,
+            }
+        ]
+    )
+    table = CsvTable(
+        [
+            {"tier_usage": tier_usage, "prompt_tokens": 1_000_000, "completion_tokens": 0},
+            {"tier_usage": None, "prompt_tokens": 1_000_000, "completion_tokens": 0},
+        ],
+        ["tier_usage", "prompt_tokens", "completion_tokens"],
+    )
+
+    total_cost, tier_calls = calculate_cascade_cost(
+        table, DEFAULT_MODEL_PRICING, DEFAULT_MODEL_PRICING["GPT-4o"]
+    )
+
+    # 1M GPT-4.1 Nano prompt tokens ($0.10) plus 1M GPT-4o prompt tokens ($2.50)
+    assert abs(total_cost - 2.6) < 1e-9
+    assert tier_calls == {"gpt-4.1-nano": 1}
+
+
+def test_response_cache_hits_are_left_out_of_cost(tmp_path):
+    csv_path = tmp_path / "jira_coverage_gpt-4o.csv"
+    csv_path.write_text(
+        "jira_id,coverage_percentage,status,total_attempts,prompt_tokens,"
+        "completion_tokens,response_cache_hit\n"
+        "1,80,completed,1,1000000,0,False\n"
+        "2,60,completed,1,1000000,0,True\n"
+    )
+
+    result = analyze_single_run(
+        str(csv_path), "GPT-4o", {1: 80.0, 2: 60.0}, DEFAULT_MODEL_PRICING
+    )
+
+    # Only the first row was paid for: 1M GPT-4o prompt tokens ($2.50)
+    assert result["response_cache_rows"] == 1
+    assert result["prompt_tokens"] == 1_000_000
+    assert abs(result["avg_cost_per_eval"] - 2.5) < 1e-9
@@ -0,0 +1,37 @@
+from merge_shards import carry_earlier_attempts
+
+
+def summary(*results):
+    return {"results": [dict(result) for result in results]}
+
+
+def test_failed_earlier_rounds_are_carried_until_the_last_success():
+    earlier = [
+        summary(
+            {"jira_id": "1", "status": "failed", "total_attempts": 2},
+            {"jira_id": "2", "status": "completed", "total_attempts": 1},
+        ),
+        summary(
+            {"jira_id": "1", "status": "failed"},
+            {"jira_id": "2", "status": "failed", "total_attempts": 1},
+        ),
+    ]
+    results = [
+        {"jira_id": "1", "status": "completed", "total_attempts": 1},
+        {"jira_id": "2", "status": "completed", "total_attempts": 1},
+        {"jira_id": "3", "status": "completed"},
+    ]
+
+    carried = carry_earlier_attempts(results, earlier)
+
+    # 2 + 1 failed attempts before story 1 passed; story 2 passed in round 1
+    # and only its failed rerun counts; story 3 has no earlier round
+    assert [result.get("total_attempts") for result in results] == [4, 2, None]
+    assert carried == 4
+
+
+def test_nothing_is_carried_without_earlier_rounds():
+    results = [{"jira_id": "1", "status": "failed", "total_attempts": 3}]
+
+    assert carry_earlier_attempts(results, []) == 0
+    assert results[0]["total_attempts"] == 3
@@ -0,0 +1,57 @@
+import json
+
+from progress_journal import progress_journal
+
+RUN_KEY = {"folder_path": "/features", "model": "gpt-4o", "config_key": "abc", "shard": None}
+
+
+def file_result(name, status="completed"):
+    return {"file_path": f"/features/{name}", "jira_id": name, "status": status}
+
+
+def test_resume_ignores_a_torn_last_line(tmp_path):
+    path = str(tmp_path / ".progress_journal.jsonl")
+    journal = progress_journal(path)
+    journal.start(RUN_KEY)
+    journal.record(file_result("1"), "new")
+    journal.record(file_result("2", "failed"), "new")
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"event": "file", "result": {"file_path": "/features/3", "sta')
+
+    resumed = progress_journal(path)
+    done = resumed.resume(RUN_KEY)
+
+    # Failed files are judged again; the torn entry never completed
+    assert list(done) == ["/features/1"]
+    assert done["/features/1"]["input_change"] == "new"
+
+    resumed.record(file_result("3"), "new")
+    resumed.close()
+    assert sorted(progress_journal(path).resume(RUN_KEY)) == ["/features/1", "/features/3"]
+
+    # The torn line was ended, so the events appended after it stay readable
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines[3].endswith('"sta')
+    assert [json.loads(line)["event"] for line in lines[4:]] == ["resume", "file", "resume"]
+
+
+def test_resume_starts_over_for_other_settings_or_a_finished_run(tmp_path):
+    path = str(tmp_path / ".progress_journal.jsonl")
+    journal = progress_journal(path)
+    journal.start(RUN_KEY)
+    journal.record(file_result("1"))
+    journal.close()
+
+    assert progress_journal(path).resume(dict(RUN_KEY, config_key="other")) == {}
+
+    journal = progress_journal(path)
+    journal.start(RUN_KEY)
+    journal.record(file_result("1"))
+    journal.finish("summary.json")
+    assert progress_journal(path).resume(RUN_KEY) == {}
+
+    with open(path) as f:
+        events = [json.loads(line) for line in f]
+    assert [event["event"] for event in events] == ["start"]
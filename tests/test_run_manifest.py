@@ -0,0 +1,59 @@
+from run_manifest import config_key, run_manifest
+
+BASE_CONFIG = {"model": "gpt-4o", "temperature": 0.0, "max_tokens": 1000}
+
+
+def test_default_verdict_settings_keep_the_legacy_key():
+    defaults = dict(
+        BASE_CONFIG,
+        reasoning_effort=None,
+        samples=1,
+        sample_reducer="median",
+        cascade_models=None,
+        scenario_budget=0,
+        structured_output=False,
+        prompt_layout="legacy",
+        batch_size=1,
+    )
+
+    assert config_key(defaults) == config_key(BASE_CONFIG)
+    # Settings the judge does not see are no part of the key
+    assert config_key(dict(BASE_CONFIG, mode="batch", concurrency=8)) == config_key(
+        BASE_CONFIG
+    )
+
+
+def test_verdict_settings_change_the_key():
+    key = config_key(BASE_CONFIG)
+    for changed in (
+        {"model": "gpt-4.1"},
+        {"temperature": 0.7},
+        {"reasoning_effort": "high"},
+        {"samples": 3},
+        {"cascade_models": ["gpt-4.1-nano", "gpt-4o"]},
+        {"scenario_budget": 800},
+        {"structured_output": True},
+        {"prompt_layout": "cached"},
+        {"batch_size": 4},
+    ):
+        assert config_key(dict(BASE_CONFIG, **changed)) != key, changed
+
+    assert config_key(dict(BASE_CONFIG, samples=3, sample_reducer="median")) != config_key(
+        dict(BASE_CONFIG, samples=3)
+    )
+
+
+def test_lookup_reuses_only_the_same_inputs_and_settings(tmp_path):
+    manifest = run_manifest(str(tmp_path / "manifest.sqlite"))
+    key = config_key(BASE_CONFIG)
+    result = {"jira_id": "7", "status": "completed", "coverage_percentage": 80}
+    manifest.record("input-a", "7", key, "7.feature", "completed", "report.json", result)
+    manifest.record("input-b", "7", key, "7.feature", "failed", None, {"status": "failed"})
+
+    assert manifest.lookup("input-a", 7, key) == result
+    assert manifest.lookup("input-a", "7", config_key(dict(BASE_CONFIG, batch_size=4))) is None
+    assert manifest.lookup("input-a", "8", key) is None
+    # Failed judgments are never reused
+    assert manifest.lookup("input-b", "7", key) is None
+    assert manifest.has_judgment("7", key)
+    assert not manifest.has_judgment("7", config_key(dict(BASE_CONFIG, samples=3)))